@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+import scenarios
+import simulation.config_reader as cr
+from simulation.io.camera2d import Camera2D
+
+pytest.importorskip('pytest_benchmark')
+
+CONFIG = os.path.join(os.path.dirname(__file__), os.pardir, 'simulation', 'config.ini')
+
+
+@pytest.fixture(scope='module')
+def world():
+    world = scenarios.create_highway(500)
+    world.update(scenarios.TIME_STEP)
+    return world
+
+
+def test_apply_transform(benchmark, world):
+    camera = Camera2D()
+    objects = [lane for road in world.roads for lane in road.lanes]
+    objects += [vehicle for vehicle in world.vehicles if vehicle.active]
+
+    def transform():
+        for obj in objects:
+            camera.apply_transform(obj)
+
+    benchmark.pedantic(transform, rounds=20, iterations=1)
+
+
+def test_transform_meshes(benchmark, world):
+    camera = Camera2D()
+    vehicles = [vehicle for vehicle in world.vehicles if vehicle.active]
+    vertices = np.array([[(v.x, v.y) for v in vehicle.mesh] for vehicle in vehicles])
+
+    def transform():
+        camera.transform_meshes(vertices, [vehicle.orientation for vehicle in vehicles],
+                                [(vehicle.position.x, vehicle.position.y) for vehicle in vehicles])
+
+    benchmark.pedantic(transform, rounds=20, iterations=1)
+
+
+def test_render_surfaces(benchmark, world):
+    pytest.importorskip('cv2')
+    from simulation.io.simple_renderer import SimpleRenderer
+    cr.initialize(CONFIG)
+    cr.CONFIG.set('renderer', 'interactive', 'False')
+    renderer = SimpleRenderer(Camera2D())
+    benchmark.pedantic(renderer.render_surfaces, args=(world,), rounds=20, iterations=1)
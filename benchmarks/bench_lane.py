@@ -0,0 +1,44 @@
+import pytest
+
+import scenarios
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def chain():
+    roads = scenarios.create_chain()
+    return roads, scenarios.random_positions(roads, 1000)
+
+
+def query(lane, positions, function):
+    def run():
+        lane.projection_cache.clear()
+        for position in positions:
+            function(position)
+    return run
+
+
+def test_find_closest_node(benchmark, chain):
+    roads, positions = chain
+    lane = roads[len(roads) // 2].lanes[1]
+    benchmark(query(lane, positions, lane.find_closest_node))
+
+
+def test_find_closest_segment(benchmark, chain):
+    roads, positions = chain
+    lane = roads[len(roads) // 2].lanes[1]
+    benchmark(query(lane, positions, lane.find_closest_segment))
+
+
+def test_find_closest_segment_cached(benchmark, chain):
+    roads, positions = chain
+    lane = roads[len(roads) // 2].lanes[1]
+    for position in positions:
+        lane.find_closest_segment(position)
+
+    def run():
+        for position in positions:
+            lane.find_closest_segment(position)
+
+    benchmark(run)
@@ -0,0 +1,44 @@
+import pytest
+
+import scenarios
+
+pytest.importorskip('pytest_benchmark')
+
+ROUNDS = {50: 100, 500: 20, 5000: 5}
+
+
+@pytest.mark.parametrize('mode', ['object', 'vectorized', 'frenet', 'vectorized-frenet'])
+@pytest.mark.parametrize('vehicles', [50, 500, 5000])
+def test_world_update(benchmark, vehicles, mode):
+    world = scenarios.create_highway(vehicles, vectorized='vectorized' in mode, frenet='frenet' in mode)
+    world.update(scenarios.TIME_STEP)  # fill the projection cache
+    benchmark.group = 'world_update-%s' % vehicles  # modes of one size side by side
+    benchmark.extra_info['active_vehicles'] = sum(1 for vehicle in world.vehicles if vehicle.active)
+    benchmark.pedantic(world.update, args=(scenarios.TIME_STEP,), rounds=ROUNDS[vehicles], iterations=1)
+
+
+@pytest.mark.parametrize('mode', ['frenet', 'vectorized-frenet'])
+def test_idm_and_integration(benchmark, mode):
+    """IDM and integration phases only, lane changes and spawners are not part of the measured time."""
+    world = scenarios.create_highway(5000, vectorized='vectorized' in mode, frenet=True)
+    world.update(scenarios.TIME_STEP)
+    benchmark.group = 'idm_and_integration'
+
+    def step():
+        world._update_idm(scenarios.TIME_STEP)
+        world._update_vehicles(scenarios.TIME_STEP)
+
+    benchmark.pedantic(step, rounds=20, iterations=1)
+
+
+def test_apply_mobil(benchmark):
+    world = scenarios.create_highway(500)
+    world.update(scenarios.TIME_STEP)
+    pairs = [(vehicle, lane) for vehicle in world.vehicles if vehicle.active
+             for lane in vehicle.lane.neighboring_lanes]
+
+    def apply_mobil():
+        for vehicle, lane in pairs:
+            vehicle.apply_mobil(lane)
+
+    benchmark.pedantic(apply_mobil, rounds=20, iterations=1)
@@ -0,0 +1,86 @@
+"""Seeded scenarios for the benchmarks."""
+import math
+import random
+
+import simulation.examples.highway as highway
+from simulation.agent.vehicle_types import Minivan, Sportscar, Truck
+from simulation.layout.road import Road
+from simulation.layout.spawner import Spawner
+from simulation.layout.world import World
+from simulation.vector2 import Vector2
+
+SEED = 42
+TIME_STEP = 0.125
+SPACING = 30.0
+
+
+def create_highway(vehicles: int, vectorized: bool = False, frenet: bool = False, seed: int = SEED) -> World:
+    """Create a world of independent copies of 'examples.highway' with the given number of vehicles.
+
+    The copies lie on top of each other, which does not matter since vehicles only see the lanes they are on.
+    Vehicles are placed on the lanes right away instead of waiting for the spawners.
+    """
+    world = None
+    for _ in range(max(1, int(math.ceil(vehicles / 50.0)))):
+        copy = highway.create_world(vectorized=vectorized, frenet=frenet, sportscars=0, trucks=0, minivans=0)
+        if world is None:
+            world = copy
+            continue
+        for road in copy.roads:
+            world.add_road(road)
+        for spawner in copy.spawners:
+            world.add_spawner(spawner)
+    for i in range(vehicles):
+        # same mix as the example
+        mix = i % 50
+        vehicle_type = Sportscar if mix < 12 else Truck if mix < 18 else Minivan
+        world.add_vehicle(vehicle_type())
+    seed_world(world, seed)
+    populate(world, random.Random(seed))
+    return world
+
+
+def seed_world(world: World, seed: int = SEED) -> None:
+    for i, spawner in enumerate(world.spawners):
+        spawner.rng.seed(seed + i)
+    world.context.rng.seed(seed)
+
+
+def populate(world: World, rng: random.Random) -> None:
+    """Place pool vehicles along all lanes, 'SPACING' meters apart."""
+    pool = world.context.vehicle_pool
+    for road in world.roads:
+        for lane in road.lanes:
+            distance = lane.accumulated_distance[0] + SPACING / 2.0
+            while pool and distance < lane.accumulated_distance[-1] - SPACING / 2.0:
+                vehicle = pool.pop(rng.randint(0, len(pool) - 1))
+                _, first = lane.locate(distance)
+                position, _ = lane.position_at(distance)
+                Spawner._reinit_vehicle(lane, vehicle, position, lane.center[first + 1])
+                lane.add_vehicle(vehicle)
+                vehicle.velocity = vehicle.max_velocity / 2.0
+                distance += SPACING
+
+
+def create_chain(roads: int = 50, num_lanes: int = 3):
+    """Create a long, winding chain of connected roads.
+
+    :return: list of roads
+    """
+    result = []
+    for r in range(roads):
+        offset = r * 200.0
+        path = [Vector2(offset - 10.0, 0.0)]
+        for i in range(11):
+            path.append(Vector2(offset + i * 19.0, 15.0 * math.sin(i * math.pi / 5.0)))
+        path.append(Vector2(offset + 200.0, 0.0))
+        result.append(Road(path, num_lanes))
+    for pred, succ in zip(result, result[1:]):
+        pred.connect(succ, [(i, i) for i in range(num_lanes)])
+    return result
+
+
+def random_positions(roads, count: int, seed: int = SEED):
+    rng = random.Random(seed)
+    end = len(roads) * 200.0
+    return [Vector2(rng.uniform(0.0, end), rng.uniform(-20.0, 30.0)) for _ in range(count)]
@@ -1,10 +1,19 @@
 import abc
+from typing import Dict, List
+
+import numpy as np
+
 from simulation.simulation_object import SimulationObject
 
 
 class Driver:
     __metaclass__ = abc.ABCMeta
 
+    # whether the model implements 'decide_accelerations'
+    BATCHED = False
+    # names of the driver attributes passed to 'decide_accelerations'
+    PARAMETERS = ()
+
     def __init__(self, politeness=0.5, b_safe=3.0, thresh=0.4):
         # MOBIL parameters
         self.politeness = politeness
@@ -15,3 +24,68 @@ class Driver:
     def decide_acceleration(self, ego: SimulationObject, front: SimulationObject,
                             bumper_distance: float, v_delta: float):
         return
+
+    @staticmethod
+    def decide_accelerations(parameters: Dict[str, np.ndarray], velocity: np.ndarray, max_velocity: np.ndarray,
+                             max_acceleration: np.ndarray, has_front: np.ndarray, bumper_distance: np.ndarray,
+                             v_delta: np.ndarray) -> np.ndarray:
+        """Batched 'decide_acceleration' for many egos driven by this model.
+
+        Models with a batched kernel override this, set 'BATCHED' and list the driver attributes they need
+        in 'PARAMETERS'. Results agree with the scalar method up to floating point rounding.
+
+        :param parameters: driver attribute name -> value per ego
+        :param velocity: velocity per ego
+        :param max_velocity: maximum velocity per ego
+        :param max_acceleration: maximum acceleration per ego
+        :param has_front: whether the ego has a vehicle in front
+        :param bumper_distance: bumper distance to the front vehicle, ignored without front vehicle
+        :param v_delta: approaching velocity towards the front vehicle, ignored without front vehicle
+        :return: acceleration per ego
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def batched(cls) -> bool:
+        """Check whether this model has a batched kernel, see 'BATCHED'."""
+        return cls.BATCHED
+
+
+def decide_accelerations(egos: List[SimulationObject], fronts: List[SimulationObject],
+                         bumper_distances: List[float], v_deltas: List[float]) -> np.ndarray:
+    """Evaluate 'Driver.decide_acceleration' for many ego and front pairs.
+
+    Pairs are grouped by the driver model of the ego, each group with a batched kernel is a single kernel call.
+    Other drivers decide per pair and pairs without ego result in 0.
+
+    :param egos: deciding vehicles or None
+    :param fronts: vehicles in front or None
+    :param bumper_distances: bumper distances, ignored without front vehicle
+    :param v_deltas: approaching velocities, ignored without front vehicle
+    :return: acceleration per pair
+    """
+    result = np.zeros(len(egos))
+    groups = {}
+    for i, (ego, front) in enumerate(zip(egos, fronts)):
+        if ego is None:
+            continue
+        model = type(ego.driver)
+        if model.batched():
+            groups.setdefault(model, []).append(i)
+        else:
+            if front is None:
+                result[i] = ego.driver.decide_acceleration(ego, None, None, None)
+            else:
+                result[i] = ego.driver.decide_acceleration(ego, front, bumper_distances[i], v_deltas[i])
+    for model, indices in groups.items():
+        drivers = [egos[i].driver for i in indices]
+        has_front = np.array([fronts[i] is not None for i in indices], dtype=bool)
+        result[indices] = model.decide_accelerations(
+            {name: np.array([getattr(driver, name) for driver in drivers], dtype=float) for name in model.PARAMETERS},
+            np.array([egos[i].velocity for i in indices], dtype=float),
+            np.array([egos[i].max_velocity for i in indices], dtype=float),
+            np.array([egos[i].max_acceleration for i in indices], dtype=float),
+            has_front,
+            np.array([bumper_distances[i] if fronts[i] is not None else 0.0 for i in indices], dtype=float),
+            np.array([v_deltas[i] if fronts[i] is not None else 0.0 for i in indices], dtype=float))
+    return result
@@ -0,0 +1,80 @@
+import heapq
+from typing import Dict, List
+
+
+class EventScheduler:
+    """Discrete event scheduler of a world.
+
+    Timed events wait in a heap keyed by their fire time, so only due events are touched.
+    Events with a trigger fire as soon as the trigger fired, no matter in which order they were scheduled.
+    Events without timer and trigger (e.g. 'BlockLaneEvent') are updated every tick until they are triggered.
+    Events that are already triggered, e.g. because they were cancelled, are skipped.
+    """
+
+    def __init__(self):
+        self.time = 0.0  # type: float
+        self.queue = []  # type: List[tuple]
+        self.dependents = {}  # type: Dict[object, list]
+        self.continuous = []  # type: list
+        self._counter = 0  # type: int
+
+    def schedule(self, event) -> None:
+        """Schedule an event.
+
+        A timer counts from the start of the current tick, like the timers polled by 'Event.update'.
+
+        :param event: event with an optional timer and trigger
+        :return: None
+        """
+        if event.timer is None and event.trigger is None:
+            self.continuous.append(event)
+            return
+        if event.timer is not None:
+            self._push(self.time + event.timer, event)
+        if event.trigger is not None:
+            if event.trigger.triggered:
+                self._push(self.time, event)
+            else:
+                self.dependents.setdefault(event.trigger, []).append(event)
+
+    def update(self, delta_time: float) -> None:
+        """Advance the clock and fire all events that are due."""
+        self.time += delta_time
+        if self.continuous:
+            continuous = self.continuous
+            self.continuous = []
+            for event in continuous:
+                if not event.triggered:
+                    event.update(delta_time)
+                if event.triggered:
+                    self._resolve(event)
+                else:
+                    self.continuous.append(event)
+        queue = self.queue
+        while queue and queue[0][0] <= self.time:
+            _, _, event = heapq.heappop(queue)
+            self._fire(event)
+
+    def cancel(self, event) -> None:
+        """Cancel an event that has not fired yet, together with all events waiting for it as their trigger."""
+        event.triggered = True
+        for dependent in self.dependents.pop(event, ()):
+            self.cancel(dependent)
+
+    def __len__(self):
+        return len(self.queue) + len(self.continuous) + sum(len(events) for events in self.dependents.values())
+
+    def _push(self, time: float, event) -> None:
+        heapq.heappush(self.queue, (time, self._counter, event))
+        self._counter += 1
+
+    def _fire(self, event) -> None:
+        if event.triggered:
+            return
+        event.process()
+        event.triggered = True
+        self._resolve(event)
+
+    def _resolve(self, trigger) -> None:
+        for event in self.dependents.pop(trigger, ()):
+            self._fire(event)
@@ -1,6 +1,6 @@
 import abc
 
-from simulation.agent import vehicle_types
+from simulation.layout.lane_reservation import LaneReservation
 
 
 class Event:
@@ -52,27 +52,22 @@ class ChangePermitEvent(Event):
 
 
 class BlockLaneEvent(Event):
+    """Keep the spot of a vehicle on the lane it leaves until it reached the target of its lane change."""
 
     def __init__(self, vehicle, target):
         super(BlockLaneEvent, self).__init__(timer=None, trigger=None)
         self.vehicle = vehicle
         self.target = target
-        self.blocker = vehicle_types.Volatile(vehicle)
+        self.reservation = LaneReservation(vehicle, vehicle.lane, vehicle.travelled_distance)
 
     def update(self, delta_time):
         if self.triggered:
             return
-        self.blocker.update_idm()
-        self.blocker.update_vehicle(delta_time)
-        if not self.blocker.active:  # blocker may have finished and removed from lane after update
-            self.process()
-            self.triggered = True
-            return
-        self.blocker.update_lane()
-        if self.target != self.vehicle.target:
+        self.reservation.advance(delta_time * self.vehicle.velocity)
+        if not self.reservation.active or self.target != self.vehicle.target:
             self.process()
             self.triggered = True
 
     def process(self):
         self.vehicle.turn_signal = 0  # no access to Vehicle.TURN_SIGNAL_NONE
-        self.blocker.vanish()
+        self.reservation.release()
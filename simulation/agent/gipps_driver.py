@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+
+from simulation.agent.driver import Driver
+from simulation.simulation_object import SimulationObject
+
+
+class GippsDriver(Driver):
+    """Car following model by Gipps (1981).
+
+    The next velocity is the lower one of a free road velocity and a safe velocity, which allows to stop behind
+    the front vehicle if it brakes with 'front_break'. The acceleration reaches it within the reaction time.
+    """
+
+    BATCHED = True
+    PARAMETERS = ('min_spacing', 'reaction_time', 'comf_break', 'front_break')
+
+    def __init__(self, min_spacing: float = 2.0, reaction_time: float = 0.67, comf_break: float = 3.0,
+                 front_break: float = 3.0, politeness: float = 0.5, b_safe: float = 3.0, thresh: float = 0.4):
+        super(GippsDriver, self).__init__(politeness, b_safe, thresh)
+        self.min_spacing = min_spacing
+        self.reaction_time = reaction_time
+        self.comf_break = comf_break
+        self.front_break = front_break  # estimated braking of the front vehicle
+
+    def decide_acceleration(self, ego: SimulationObject, front: SimulationObject,
+                            bumper_distance: float, v_delta: float):
+        v = ego.velocity
+        tau = self.reaction_time
+        ratio = v / ego.max_velocity
+        v_free = v + 2.5 * ego.max_acceleration * tau * (1 - ratio) * math.sqrt(0.025 + ratio)
+        if front is None:
+            return (v_free - v) / tau
+        if bumper_distance <= 0:
+            return -float('inf')
+        b = self.comf_break
+        v_front = v - v_delta
+        radicand = b * b * tau * tau + b * (2 * (bumper_distance - self.min_spacing) - v * tau +
+                                            v_front * v_front / self.front_break)
+        v_safe = -b * tau + math.sqrt(max(radicand, 0.0))
+        return (min(v_free, v_safe) - v) / tau
+
+    @staticmethod
+    def decide_accelerations(parameters, velocity, max_velocity, max_acceleration, has_front, bumper_distance,
+                             v_delta):
+        v = velocity
+        tau = parameters['reaction_time']
+        ratio = v / max_velocity
+        v_free = v + 2.5 * max_acceleration * tau * (1 - ratio) * np.sqrt(0.025 + ratio)
+        b = parameters['comf_break']
+        v_front = v - v_delta
+        radicand = b * b * tau * tau + b * (2 * (bumper_distance - parameters['min_spacing']) - v * tau +
+                                            v_front * v_front / parameters['front_break'])
+        v_safe = -b * tau + np.sqrt(np.maximum(radicand, 0.0))
+        acceleration = (np.where(has_front, np.minimum(v_free, v_safe), v_free) - v) / tau
+        acceleration[has_front & (bumper_distance <= 0)] = -float('inf')
+        return acceleration
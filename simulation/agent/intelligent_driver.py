@@ -1,10 +1,16 @@
 import math
+
+import numpy as np
+
 from simulation.agent.driver import Driver
 from simulation.simulation_object import SimulationObject
 
 
 class IntelligentDriver(Driver):
 
+    BATCHED = True
+    PARAMETERS = ('min_spacing', 'time_headway', 'comf_break', 'delta')
+
     def __init__(self, min_spacing: float =12.0, time_headway: float =1.0, comf_break: float =3.0, delta: float=4.0,
                  politeness: float =0.5, b_safe: float =3.0, thresh: float =0.4):
         super(IntelligentDriver, self).__init__(politeness, b_safe, thresh)
@@ -25,3 +31,18 @@ class IntelligentDriver(Driver):
         acceleration = ego.max_acceleration * (1 - (ego.velocity / ego.max_velocity)**self.delta - (s_star / bumper_distance)**2)
 
         return acceleration
+
+    @staticmethod
+    def decide_accelerations(parameters, velocity, max_velocity, max_acceleration, has_front, bumper_distance,
+                             v_delta):
+        acceleration = max_acceleration.copy()
+        following = has_front & (bumper_distance > 0)
+        if np.any(following):
+            a = max_acceleration[following]
+            v = velocity[following]
+            s_star = (parameters['min_spacing'][following] + v * parameters['time_headway'][following] +
+                      (v * v_delta[following] / (2 * np.sqrt(a * parameters['comf_break'][following]))))
+            acceleration[following] = a * (1 - (v / max_velocity[following]) ** parameters['delta'][following] -
+                                           (s_star / bumper_distance[following]) ** 2)
+        acceleration[has_front & ~following] = -float('inf')
+        return acceleration
@@ -0,0 +1,49 @@
+import numpy as np
+
+from simulation.agent.driver import Driver
+from simulation.simulation_object import SimulationObject
+
+
+class KraussDriver(Driver):
+    """Car following model by Krauss (1998) without the random dawdling, as used by SUMO.
+
+    The safe velocity keeps the front vehicle reachable with 'comf_break' within the reaction time,
+    the acceleration reaches the lowest of the safe, the maximum and the accelerated velocity within it.
+    """
+
+    BATCHED = True
+    PARAMETERS = ('min_spacing', 'reaction_time', 'comf_break')
+
+    def __init__(self, min_spacing: float = 2.5, reaction_time: float = 1.0, comf_break: float = 4.5,
+                 politeness: float = 0.5, b_safe: float = 3.0, thresh: float = 0.4):
+        super(KraussDriver, self).__init__(politeness, b_safe, thresh)
+        self.min_spacing = min_spacing
+        self.reaction_time = reaction_time
+        self.comf_break = comf_break
+
+    def decide_acceleration(self, ego: SimulationObject, front: SimulationObject,
+                            bumper_distance: float, v_delta: float):
+        v = ego.velocity
+        tau = self.reaction_time
+        acceleration = min(ego.max_acceleration, (ego.max_velocity - v) / tau)
+        if front is None:
+            return acceleration
+        if bumper_distance <= 0:
+            return -float('inf')
+        v_front = v - v_delta
+        gap = bumper_distance - self.min_spacing
+        v_safe = v_front + (gap - v_front * tau) / ((v + v_front) / (2 * self.comf_break) + tau)
+        return min(acceleration, (v_safe - v) / tau)
+
+    @staticmethod
+    def decide_accelerations(parameters, velocity, max_velocity, max_acceleration, has_front, bumper_distance,
+                             v_delta):
+        v = velocity
+        tau = parameters['reaction_time']
+        acceleration = np.minimum(max_acceleration, (max_velocity - v) / tau)
+        v_front = v - v_delta
+        gap = bumper_distance - parameters['min_spacing']
+        v_safe = v_front + (gap - v_front * tau) / ((v + v_front) / (2 * parameters['comf_break']) + tau)
+        acceleration = np.where(has_front, np.minimum(acceleration, (v_safe - v) / tau), acceleration)
+        acceleration[has_front & (bumper_distance <= 0)] = -float('inf')
+        return acceleration
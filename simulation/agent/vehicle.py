@@ -1,6 +1,5 @@
 import logging
-import random
-import sys
+import math
 from typing import List, Tuple
 
 import simulation.agent.events as events
@@ -8,20 +7,27 @@ from simulation.simulation_object import SimulationObject
 from simulation.vector2 import Vector2
 from simulation.agent.intelligent_driver import IntelligentDriver
 from simulation.layout.lane import Lane
+from simulation.simulation_context import SimulationContext
 
 
 class Vehicle(SimulationObject):
 
-    SEED = random.randint(0, sys.maxsize)
-    RNG = random.Random(SEED)
-
-    vehicle_logger = logging.getLogger('simulation.agent')
-    vehicle_logger.info('Seed for vehicles: ' + str(SEED))
-
     TURN_SIGNAL_NONE = 0
     TURN_SIGNAL_LEFT = 1
     TURN_SIGNAL_RIGHT = 2
 
+    LANE_CHANGE_DISTANCE = 10.0  # TODO: magic number
+
+    # entries of lane vehicle indices which only reserve a spot set this, see 'LaneReservation'
+    reservation = False  # type: bool
+
+    # context of the world the vehicle belongs to, set by 'World.add_vehicle'
+    context = None  # type: SimulationContext
+
+    # lane-relative (frenet) state is canonical, world state is derived on demand
+    frenet = False  # type: bool
+    _world_state_dirty = False  # type: bool
+
     def __init__(self,
                  position: Vector2 = Vector2(0, 0),
                  orientation: float = 90.0,
@@ -43,41 +49,98 @@ class Vehicle(SimulationObject):
         self.turn_signal = Vehicle.TURN_SIGNAL_NONE
         self.events = []
         self.lane = None  # type: Lane
+        self.travelled_distance = 0.0  # type: float
+        self.lateral_offset = 0.0  # type: float
+        self.lane_change_distance = 0.0  # type: float
         self.change_permit = False
         self.respawn = True
         self.blocker = None
         self.logger = logging.getLogger('simulation.agent.Vehicle')
 
-    def update_events(self, delta_time: float) -> None:
+    def add_event(self, event) -> None:
+        """Keep track of an event of this vehicle and hand it to the event scheduler of the world."""
+        self.events.append(event)
+        self.context.scheduler.schedule(event)
+
+    def cancel_events(self) -> None:
+        """Cancel all pending events of this vehicle, e.g. when it is removed from the world.
+
+        The lane reservations of pending lane changes are released.
+        """
         for event in self.events:
-            if event.triggered:
-                continue
-            event.update(delta_time)
+            if not event.triggered:
+                reservation = getattr(event, 'reservation', None)
+                if reservation is not None:
+                    reservation.release()
+                self.context.scheduler.cancel(event)
+        self.events = []
 
     def update_idm(self):
         self.apply_idm()
 
     def update_vehicle(self, delta_time: float) -> None:
+        if self.frenet:
+            self.velocity += delta_time * self.acceleration
+            self.move_along_lane(delta_time * self.velocity)
+            return
         self.velocity += delta_time * self.acceleration
-        heading = Vector2(0, 1)
-        heading.rotate(self.orientation)
-        self.position += delta_time * self.velocity * heading
-        direction = self.position - self.target
-        direction.normalize()
-        angle = Vector2(0, 1).distance_angular_signed(direction)
+        heading_x, heading_y = Vector2.rotated(0, 1, self.orientation)
+        step = delta_time * self.velocity
+        position, target = self.position, self.target
+        position.x += heading_x * step
+        position.y += heading_y * step
+        x, y = position.x - target.x, position.y - target.y
+        length = math.sqrt(x * x + y * y)
+        angle = Vector2.angle(x / length, y / length)
         # check if agent passed its target
         if abs(angle - self.orientation) < Lane.EPSILON:
             self.lane.fix_vehicle_position(self)
+        if self.lane is not None:
+            self.lane.update_vehicle_distance(self)
+
+    def move_along_lane(self, distance: float) -> None:
+        """Advance the lane-relative state of a frenet vehicle by the given distance.
+
+        Lane changes reduce the lateral offset linearly over the lane change distance.
+        Vehicles are handed over to connected lanes or removed at the end of the last lane.
+
+        :param distance: distance to travel along the lane
+        :return: None
+        """
+        self._world_state_dirty = True
+        if self.lane_change_distance > 0.0:
+            if distance >= self.lane_change_distance:
+                self.lateral_offset = 0.0
+                self.lane_change_distance = 0.0
+                self.target = None
+            else:
+                self.lateral_offset *= 1.0 - distance / self.lane_change_distance
+                self.lane_change_distance -= distance
+        travelled_distance = self.travelled_distance + distance
+        lane = self.lane
+        while travelled_distance > lane.accumulated_distance[-1]:
+            if lane.front_connection is None:
+                self.lane.remove_vehicle(self)
+                return
+            lane = lane.front_connection
+        if lane is self.lane:
+            lane.update_vehicle_distance(self, travelled_distance)
+        else:
+            self.lane.detach_vehicle(self)
+            self.lane = lane
+            lane.add_vehicle(self, travelled_distance)
 
     def update_lane(self):
+        if self.frenet:
+            return
         first, second, closest_lane = self.lane.find_closest_segment(self.position)
         if closest_lane is not self.lane:
-            self.lane.vehicles.remove(self)
+            self.lane.detach_vehicle(self)
             self.lane = closest_lane
             self.lane.add_vehicle(self)
 
     def update_mobil(self):
-        if self.turn_signal != Vehicle.TURN_SIGNAL_NONE and not self.change_permit:
+        if not self.considers_lane_change():
             return
         value = 0.0
         new_lane = None
@@ -86,15 +149,27 @@ class Vehicle(SimulationObject):
             if value < change_value < float('infinity'):
                 value = change_value
                 new_lane = lane
+        self.decide_lane_change(value, new_lane)
+
+    def considers_lane_change(self) -> bool:
+        """Check whether MOBIL is evaluated for this vehicle, vehicles waiting for their change permit skip it."""
+        return self.turn_signal == Vehicle.TURN_SIGNAL_NONE or self.change_permit
+
+    def decide_lane_change(self, value: float, new_lane: Lane) -> None:
+        """Act on the best MOBIL incentive: signal, change lanes or abort a signalled change.
+
+        :param value: best incentive over the neighboring lanes, 0 if no lane is better
+        :param new_lane: lane with the best incentive or None
+        :return: None
+        """
         if value > 0:
             if self.change_permit:
                 self.initiate_lane_change(new_lane)
                 self.change_permit = False
             else:
-                t = Vehicle.RNG.uniform(0.5, 1.5)
+                t = self.context.rng.uniform(0.5, 1.5)
                 self.turn_signal = Vehicle.TURN_SIGNAL_LEFT if new_lane == self.lane.left_neighbor else Vehicle.TURN_SIGNAL_RIGHT
-                change_permit_event = events.ChangePermitEvent(vehicle=self, timer=t)
-                self.events.append(change_permit_event)
+                self.add_event(events.ChangePermitEvent(vehicle=self, timer=t))
         elif self.velocity >= self.max_velocity / 2.0:
             # if change is not viable anymore for a moving agent, abort change
             self.turn_signal = Vehicle.TURN_SIGNAL_NONE
@@ -115,24 +190,8 @@ class Vehicle(SimulationObject):
         :return: > 0 if the agent should change, <= 0 otherwise
         """
         ego = self
-        back = self.lane.find_back_vehicle(ego.position)
-        front = self.lane.find_front_vehicle(ego.position)
-        back_c = lane.find_back_vehicle(ego.position)
-        front_c = lane.find_front_vehicle(ego.position)
-
-        dist_be = self.lane.projected_bumper_distance(back, ego)
-        dist_ef = self.lane.projected_bumper_distance(ego, front)
-        dist_bf = self.lane.projected_bumper_distance(back, front)
-        dist_bce = lane.projected_bumper_distance(back_c, ego)
-        dist_efc = lane.projected_bumper_distance(ego, front_c)
-        dist_bcfc = lane.projected_bumper_distance(back_c, front_c)
-
-        vel_be = self.lane.approaching_velocity(back, ego)
-        vel_ef = self.lane.approaching_velocity(ego, front)
-        vel_bf = self.lane.approaching_velocity(back, front)
-        vel_bce = self.lane.approaching_velocity(back_c, ego)
-        vel_efc = self.lane.approaching_velocity(ego, front_c)
-        vel_bcfc = self.lane.approaching_velocity(back_c, front_c)
+        (back, front, back_c, front_c, dist_be, dist_ef, dist_bf, dist_bce, dist_efc, dist_bcfc,
+         vel_be, vel_ef, vel_bf, vel_bce, vel_efc, vel_bcfc) = self.observe_mobil(lane)
 
         acc_b = 0
         acc_b_change = 0
@@ -148,8 +207,70 @@ class Vehicle(SimulationObject):
             acc_bc = back_c.driver.decide_acceleration(back_c, front_c, dist_bcfc, vel_bcfc)
             acc_bc_change = back_c.driver.decide_acceleration(back_c, ego, dist_bce, vel_bce)
 
+        return self.mobil_incentive(lane, acc_e, acc_e_change, acc_b, acc_b_change, acc_bc, acc_bc_change)
+
+    def observe_mobil(self, lane: Lane) -> tuple:
+        """Find the vehicles around this vehicle on its lane and the given lane, see 'apply_mobil'.
+
+        :param lane: lane in question
+        :return: back, front, back_c, front_c, the bumper distances be, ef, bf, bce, efc, bcfc
+                 and the approaching velocities in the same order
+        """
+        ego = self
+        if self.frenet:
+            ego_dist = self.travelled_distance
+            ego_dist_c = self.lane.map_distance(ego_dist, lane)
+            back = self.lane.find_back_vehicle_at(ego_dist, ego)
+            front = self.lane.find_front_vehicle_at(ego_dist, ego)
+            back_c = lane.find_back_vehicle_at(ego_dist_c, ego)
+            front_c = lane.find_front_vehicle_at(ego_dist_c, ego)
+
+            dist_be = Vehicle.frenet_bumper_distance(back, back and back.travelled_distance, ego, ego_dist)
+            dist_ef = Vehicle.frenet_bumper_distance(ego, ego_dist, front, front and front.travelled_distance)
+            dist_bf = Vehicle.frenet_bumper_distance(back, back and back.travelled_distance,
+                                                     front, front and front.travelled_distance)
+            dist_bce = Vehicle.frenet_bumper_distance(back_c, back_c and back_c.travelled_distance, ego, ego_dist_c)
+            dist_efc = Vehicle.frenet_bumper_distance(ego, ego_dist_c, front_c, front_c and front_c.travelled_distance)
+            dist_bcfc = Vehicle.frenet_bumper_distance(back_c, back_c and back_c.travelled_distance,
+                                                       front_c, front_c and front_c.travelled_distance)
+
+            vel_be = Vehicle.frenet_approaching_velocity(back, ego)
+            vel_ef = Vehicle.frenet_approaching_velocity(ego, front)
+            vel_bf = Vehicle.frenet_approaching_velocity(back, front)
+            vel_bce = Vehicle.frenet_approaching_velocity(back_c, ego)
+            vel_efc = Vehicle.frenet_approaching_velocity(ego, front_c)
+            vel_bcfc = Vehicle.frenet_approaching_velocity(back_c, front_c)
+        else:
+            back = self.lane.find_back_vehicle(ego.position)
+            front = self.lane.find_front_vehicle(ego.position)
+            back_c = lane.find_back_vehicle(ego.position)
+            front_c = lane.find_front_vehicle(ego.position)
+
+            dist_be = self.lane.projected_bumper_distance(back, ego)
+            dist_ef = self.lane.projected_bumper_distance(ego, front)
+            dist_bf = self.lane.projected_bumper_distance(back, front)
+            dist_bce = lane.projected_bumper_distance(back_c, ego)
+            dist_efc = lane.projected_bumper_distance(ego, front_c)
+            dist_bcfc = lane.projected_bumper_distance(back_c, front_c)
+
+            vel_be = self.lane.approaching_velocity(back, ego)
+            vel_ef = self.lane.approaching_velocity(ego, front)
+            vel_bf = self.lane.approaching_velocity(back, front)
+            vel_bce = self.lane.approaching_velocity(back_c, ego)
+            vel_efc = self.lane.approaching_velocity(ego, front_c)
+            vel_bcfc = self.lane.approaching_velocity(back_c, front_c)
+
+        return (back, front, back_c, front_c, dist_be, dist_ef, dist_bf, dist_bce, dist_efc, dist_bcfc,
+                vel_be, vel_ef, vel_bf, vel_bce, vel_efc, vel_bcfc)
+
+    def mobil_incentive(self, lane: Lane, acc_e: float, acc_e_change: float, acc_b: float, acc_b_change: float,
+                        acc_bc: float, acc_bc_change: float) -> float:
+        """Combine the accelerations before and after a change to the given lane into the MOBIL incentive.
+
+        :return: > 0 if the agent should change, <= 0 otherwise
+        """
         b_safe = self.driver.b_safe
-        p = ego.driver.politeness
+        p = self.driver.politeness
         thresh = self.driver.thresh
 
         if self.change_permit:
@@ -171,9 +292,7 @@ class Vehicle(SimulationObject):
 
         Drivers do not necessarily have to implement IDM.
         """
-        front_vehicle = self.lane.find_front_vehicle(self.position)
-        bumper_distance = self.lane.projected_bumper_distance(self, front_vehicle)
-        approach_vel = self.lane.approaching_velocity(self, front_vehicle)
+        front_vehicle, bumper_distance, approach_vel = self.observe_front()
         idm_acceleration = self.driver.decide_acceleration(self, front_vehicle, bumper_distance, approach_vel)
         if bumper_distance is not None and bumper_distance <= 0:
             self.logger.error('Negative bumper distance occured: %s%s - %s%s distance: %s',
@@ -181,19 +300,118 @@ class Vehicle(SimulationObject):
             idm_acceleration = 0
         self.acceleration = idm_acceleration
 
+    def observe_front(self):
+        """Find the vehicle in front together with the bumper distance and approaching velocity towards it.
+
+        :return: front vehicle, bumper distance, approaching velocity (all None if there is no front vehicle)
+        """
+        if self.frenet:
+            front_vehicle = self.lane.find_front_vehicle_at(self.travelled_distance, self)
+            if front_vehicle is None:
+                return None, None, None
+            bumper_distance = Vehicle.frenet_bumper_distance(self, self.travelled_distance,
+                                                             front_vehicle, front_vehicle.travelled_distance)
+            return front_vehicle, bumper_distance, Vehicle.frenet_approaching_velocity(self, front_vehicle)
+        front_vehicle = self.lane.find_front_vehicle(self.position)
+        bumper_distance = self.lane.projected_bumper_distance(self, front_vehicle)
+        approach_vel = self.lane.approaching_velocity(self, front_vehicle)
+        return front_vehicle, bumper_distance, approach_vel
+
+    @staticmethod
+    def frenet_bumper_distance(v1, distance1, v2, distance2):
+        if v1 is None or v2 is None:
+            return None
+        return abs(distance1 - distance2) - v1.length/2.0 - v2.length/2.0
+
+    @staticmethod
+    def frenet_approaching_velocity(v1, v2):
+        if v1 is None or v2 is None:
+            return None
+        return v1.velocity - v2.velocity
+
     def initiate_lane_change(self, lane: Lane) -> None:
+        if self.frenet:
+            self._initiate_frenet_lane_change(lane)
+            return
         self.change_permit = False
-        target = lane.traverse(lane.projected_position(self.position), self.velocity * 0.5 + 10.0)  # TODO: magic number
-        if target is None:
+        located = lane.traverse_distance(lane.projected_travelled_distance(self.position),
+                                         self.velocity * 0.5 + Vehicle.LANE_CHANGE_DISTANCE)
+        if located is None:
             self.turn_signal = Vehicle.TURN_SIGNAL_NONE
             return
-        self.target = target
-        block_lane_event = events.BlockLaneEvent(vehicle=self, target=self.target)
-        self.events.append(block_lane_event)
-        self.lane.vehicles.remove(self)
+        self.target = located[0]
+        self.add_event(events.BlockLaneEvent(vehicle=self, target=self.target))
+        self.lane.detach_vehicle(self)
         self.lane = lane
         lane.add_vehicle(self)
 
+    def _initiate_frenet_lane_change(self, lane: Lane) -> None:
+        self.change_permit = False
+        distance = self.velocity * 0.5 + Vehicle.LANE_CHANGE_DISTANCE
+        travelled_distance = self.lane.map_distance(self.travelled_distance, lane)
+        target = lane.position_at(travelled_distance + distance)
+        if target is None:
+            self.turn_signal = Vehicle.TURN_SIGNAL_NONE
+            return
+        position = self.position
+        point, direction = lane.position_at(travelled_distance)
+        self.target = target[0]
+        self.add_event(events.BlockLaneEvent(vehicle=self, target=self.target))
+        self.lane.detach_vehicle(self)
+        self.lane = lane
+        lane.add_vehicle(self, travelled_distance)
+        self.lateral_offset = direction.perp(position - point)
+        self.lane_change_distance = distance
+        self._world_state_dirty = True
+
+    def _update_world_state(self) -> None:
+        """Derive position and orientation of a frenet vehicle from its lane-relative state."""
+        self._world_state_dirty = False
+        if self.lane is None:
+            return
+        located = self.lane.position_at(self.travelled_distance)
+        if located is None:
+            return
+        point, direction = located
+        normal = Vector2(-direction.y, direction.x)
+        self.__position = point + self.lateral_offset * normal
+        heading = direction
+        if self.lane_change_distance > 0.0:
+            heading = direction - (self.lateral_offset / self.lane_change_distance) * normal
+        self.__orientation = Vector2(0, 1).distance_angular_signed(heading)
+
+    @property
+    def position(self):
+        if self._world_state_dirty:
+            self._update_world_state()
+        return self.__position
+
+    @position.setter
+    def position(self, position):
+        self._world_state_dirty = False
+        self.__position = position
+
+    @property
+    def orientation(self):
+        if self._world_state_dirty:
+            self._update_world_state()
+        return self.__orientation
+
+    @orientation.setter
+    def orientation(self, orientation):
+        self._world_state_dirty = False
+        self.__orientation = orientation
+
+    @property
+    def active(self):
+        return self.__active
+
+    @active.setter
+    def active(self, active):
+        self.__active = active
+        if self.context is not None:
+            self.context.vehicle_pool.set_active(self, active)
+
     @property
     def target(self):
         return self.__target
@@ -201,7 +419,8 @@ class Vehicle(SimulationObject):
     @target.setter
     def target(self, target):
         self.__target = target
-        direction = target - self.position
-        direction.normalize()
-        angle = Vector2(0, 1).distance_angular_signed(direction)
-        self.orientation = angle
+        if self.frenet or target is None:
+            return
+        x, y = target.x - self.position.x, target.y - self.position.y
+        length = math.sqrt(x * x + y * y)
+        self.orientation = Vector2.angle(x / length, y / length)
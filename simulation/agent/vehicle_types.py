@@ -57,34 +57,3 @@ class Obstacle(Vehicle):
     def update_mobil(self):
         pass
 
-
-class Volatile(Vehicle):
-
-    def __init__(self, vehicle: Vehicle):
-        super(Volatile, self).__init__(position=vehicle.position,
-                                       velocity=vehicle.velocity,
-                                       max_velocity=vehicle.max_velocity,
-                                       acceleration=vehicle.acceleration,
-                                       max_acceleration=vehicle.max_acceleration,
-                                       mesh=vehicle.mesh)
-        self.vehicle = vehicle
-        self.lane = vehicle.lane
-        self.lane.add_vehicle(self)
-        self.target = vehicle.target
-        self.active = True
-        self.respawn = False
-
-    def update_vehicle(self, delta_time: float) -> None:
-        if not self.active:
-            return
-        self.acceleration = min(self.acceleration, self.vehicle.acceleration)
-        super(Volatile, self).update_vehicle(delta_time)
-
-    def update_mobil(self) -> None:
-        pass
-
-    def vanish(self) -> None:
-        self.active = False
-        if self.lane is not None and self in self.lane.vehicles:
-            self.lane.vehicles.remove(self)
-        self.lane = None
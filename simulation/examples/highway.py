@@ -5,8 +5,9 @@ import simulation.agent.vehicle_types as vehicle_types
 from simulation.vector2 import Vector2
 
 
-def create_world():
-    world = World()
+def create_world(vectorized: bool = False, frenet: bool = False,
+                 sportscars: int = 12, trucks: int = 6, minivans: int = 32):
+    world = World(vectorized=vectorized, frenet=frenet)
 
     spawn = [Vector2(-500.0, -23.0), Vector2(-490.0, -23.0), Vector2(-360.0, -23.0), Vector2(-350.0, -23.0)]
     road_spawn = Road(spawn, 3)
@@ -68,11 +69,8 @@ def create_world():
     world.add_spawner(Spawner(road_spawn))
     world.add_spawner(Spawner(road_side))
 
-    for i in range(12):
-        world.add_vehicle(vehicle_types.Sportscar())
-    for i in range(6):
-        world.add_vehicle(vehicle_types.Truck())
-    for i in range(32):
-        world.add_vehicle(vehicle_types.Minivan())
+    world.add_vehicles(vehicle_types.Sportscar, sportscars)
+    world.add_vehicles(vehicle_types.Truck, trucks)
+    world.add_vehicles(vehicle_types.Minivan, minivans)
 
     return world
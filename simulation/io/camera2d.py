@@ -1,10 +1,15 @@
+import math
+
 from simulation.simulation_object import SimulationObject
 from simulation.vector2 import Vector2
+import simulation.vector_array as vector_array
 import numpy as np
 
 
 class Camera2D(SimulationObject):
 
+    BATCH_SIZE = 16  # meshes with more vertices are transformed with array operations
+
     def __init__(self, width: int = 512, height: int = 256, zoom: float = 2.0, target: SimulationObject = None):
         super(Camera2D, self).__init__()
         self.__viewport = Vector2(width, height)  # type: Vector2
@@ -12,6 +17,8 @@ class Camera2D(SimulationObject):
         self.zoom = zoom  # type: float
         self.target = target  # type: SimulationObject
         self.distance_threshold = 0.05  # type: float
+        self._view_matrix = None  # type: np.ndarray
+        self._view_key = None  # type: tuple
 
     def update(self, delta_time: float):
         """Follow the camera's target"""
@@ -21,23 +28,77 @@ class Camera2D(SimulationObject):
                 self.position.x, self.position.y = self.target.position.x, self.target.position.y
             self.orientation = self.target.orientation - 90.0
 
+    def view_matrix(self) -> np.ndarray:
+        """Affine 2 x 3 matrix from world coordinates to pixel coordinates.
+
+        The matrix is computed once per camera pose and reused until the camera moves, rotates or zooms.
+        """
+        key = (self.position.x, self.position.y, self.orientation, self.zoom, self.viewport.x, self.viewport.y)
+        if key != self._view_key:
+            radians = -self.orientation * Vector2.DEG_2_RAD
+            c, s = math.cos(radians), math.sin(radians)
+            zoom = self.zoom
+            cx, cy = self.position.x, self.position.y
+            self._view_matrix = np.array([
+                [zoom * c, zoom * s, self.__offset.x - zoom * (c * cx + s * cy)],
+                [zoom * s, -zoom * c, self.viewport.y - self.__offset.y + zoom * (-s * cx + c * cy)]])
+            self._view_key = key
+        return self._view_matrix
+
     def apply_transform(self, obj: SimulationObject) -> np.ndarray:
         """Transform a simulation object from it's local coordinate system to this camera's coordinate system"""
+        if len(obj.mesh) > Camera2D.BATCH_SIZE:
+            return self.transform_vertices(vector_array.to_array(obj.mesh), obj.orientation, obj.position)
+        (a, b, tx), (d, e, ty) = self.view_matrix().tolist()
+        radians = obj.orientation * Vector2.DEG_2_RAD
+        c, s = math.cos(radians), math.sin(radians)
+        px, py = obj.position.x, obj.position.y
         temp = []
         for vertex in obj.mesh:
-            temp.append(list(self.apply_view_transform(obj.apply_world_transform(vertex))))
+            x = c * vertex.x + s * vertex.y + px
+            y = -s * vertex.x + c * vertex.y + py
+            temp.append((a * x + b * y + tx, d * x + e * y + ty))
         poly = np.array(temp, np.int32)
         return poly
 
+    def transform_vertices(self, vertices: np.ndarray, orientation: float, position: Vector2) -> np.ndarray:
+        """Transform an N x 2 array of local vertices of an object with the given pose to camera coordinates.
+
+        :return: N x 2 array of pixel coordinates
+        """
+        return self.transform_meshes(vertices[None], [orientation], [(position.x, position.y)])[0]
+
+    def transform_meshes(self, vertices: np.ndarray, orientations, positions) -> np.ndarray:
+        """Transform the local vertices of many objects to camera coordinates in one pass.
+
+        World and view transform are combined into one affine transform per object.
+
+        :param vertices: N x K x 2 array of local vertices, K vertices for each of the N objects,
+                         or K x 2 if all objects share the same mesh
+        :param orientations: orientation per object
+        :param positions: N x 2 array of object positions
+        :return: N x K x 2 array of pixel coordinates
+        """
+        matrix = self.view_matrix()
+        radians = np.asarray(orientations, dtype=float) * Vector2.DEG_2_RAD
+        c, s = np.cos(radians), np.sin(radians)
+        # local -> world is [[c, s], [-s, c]], combined with the linear part of the view matrix
+        (a, b), (d, e) = matrix[:, :2].tolist()
+        linear = np.stack((np.stack((a * c - b * s, a * s + b * c), axis=-1),
+                           np.stack((d * c - e * s, d * s + e * c), axis=-1)), axis=-2)
+        offsets = np.asarray(positions, dtype=float) @ matrix[:, :2].T + matrix[:, 2]
+        result = np.matmul(np.asarray(vertices, dtype=float), np.swapaxes(linear, -1, -2)) + offsets[:, None, :]
+        return result.astype(np.int32)
+
+    def transform_points(self, points: np.ndarray) -> np.ndarray:
+        """Transform an N x 2 array of world coordinates to pixel coordinates."""
+        matrix = self.view_matrix()
+        return (np.asarray(points, dtype=float) @ matrix[:, :2].T + matrix[:, 2]).astype(np.int32)
+
     def apply_view_transform(self, vector: Vector2) -> Vector2:
         """Transform a vector from the world coordinate system to the camera coordinate system of this camera"""
-        result = vector.copy()
-        result -= self.position
-        result.rotate(-self.orientation)
-        result *= self.zoom
-        result += self.__offset
-        result.y = self.viewport.y - result.y
-        return result
+        (a, b, tx), (d, e, ty) = self.view_matrix().tolist()
+        return Vector2(a * vector.x + b * vector.y + tx, d * vector.x + e * vector.y + ty)
 
     def apply_inverse_view_transform(self, vector: Vector2) -> Vector2:
         """Transform a vector from the camera coordinate system of this camera to the world coordinate system"""
@@ -49,6 +110,17 @@ class Camera2D(SimulationObject):
         result += self.position
         return result
 
+    def world_bounds(self) -> (float, float, float, float):
+        """Axis aligned box in world coordinates which contains the whole viewport.
+
+        :return: xmin, ymin, xmax, ymax
+        """
+        corners = [self.apply_inverse_view_transform(Vector2(x, y))
+                   for x in (0, self.viewport.x) for y in (0, self.viewport.y)]
+        xs = [corner.x for corner in corners]
+        ys = [corner.y for corner in corners]
+        return min(xs), min(ys), max(xs), max(ys)
+
     def move(self, distance: Vector2) -> None:
         """Move the camera a given distance in the camera's perspective"""
         heading = Vector2(0, 1)
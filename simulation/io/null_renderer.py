@@ -0,0 +1,24 @@
+from simulation.io.camera2d import Camera2D
+from simulation.io.input_controller import InputController
+from simulation.io.renderer import Renderer
+from simulation.layout.world import World
+
+
+class NullRenderer(Renderer, InputController):
+    """Renderer and input controller for headless runs. Draws nothing and never asks to quit."""
+
+    def __init__(self, camera: Camera2D = None):
+        InputController.__init__(self)
+        self.camera = camera  # type: Camera2D
+        self.interactive = False  # type: bool
+        self.mode = Renderer.Mode.SURFACE  # type Enum
+        self.background_brightness = 1.0  # type: int
+
+    def render(self, world: World) -> None:
+        pass
+
+    def update(self, delta_time: float) -> None:
+        pass
+
+    def handle_input(self) -> None:
+        pass
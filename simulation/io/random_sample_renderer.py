@@ -34,14 +34,10 @@ class RandomSampleRenderer(Renderer):
         self.locations = [(self.camera.position, 0)]  # type: List[Tuple[Vector2, float]]
 
     def render(self, world: World) -> None:
-        for road in world.roads:
-            for lane in road.lanes:
-                poly = self.camera.apply_transform(lane)
-                cv2.fillPoly(self.data[0], pts=[poly], color=[1.0])
-        for vehicle in world.vehicles:
-            if not vehicle.active:
-                continue
-            poly = self.camera.apply_transform(vehicle)
+        lanes, vehicles = self.visible(world)
+        for lane in lanes:
+            cv2.fillPoly(self.data[0], pts=[self.transform_lane(lane)], color=[1.0])
+        for vehicle, poly in self.transform_vehicles(vehicles):
             color = [1.0, vehicle.velocity, vehicle.orientation]
             cv2.fillPoly(self.data[1:3], pts=[poly], color=color)
         for sensor_data in self.data:
@@ -1,8 +1,12 @@
 import abc
 from enum import Enum, unique
+
+import numpy as np
+
 from simulation.layout.world import World
 from simulation.vector2 import Vector2
 from simulation.io.camera2d import Camera2D
+from simulation.io.view_culling import ViewCulling
 import simulation.config_reader as cr
 
 
@@ -21,6 +25,58 @@ class Renderer:
         self.interactive = cr.CONFIG.getboolean('renderer', 'interactive')  # type: bool
         self.mode = Renderer.Mode.SURFACE  # type Enum
         self.background_brightness = 1.0  # type: int
+        self.meshes = {}  # type: {int: (list, np.ndarray)}  # local vertices per mesh, keyed by the id of the mesh
+        self.culling = None  # type: ViewCulling
+        self.culling_key = None  # type: tuple
+
+    def view_culling(self, world: World) -> ViewCulling:
+        """Spatial index of the lanes of the given world, rebuilt when the roads or their number change."""
+        key = id(world.roads), len(world.roads)
+        if key != self.culling_key:
+            self.culling = ViewCulling(world.roads)
+            self.culling_key = key
+        return self.culling
+
+    def visible(self, world) -> (list, list):
+        """Cull the lanes and active vehicles of the world against the camera's view.
+
+        :param world: 'World' or 'WorldSnapshot', vehicles of a snapshot are filtered by position only
+        :return: visible lanes, visible vehicles
+        """
+        culling = self.view_culling(world)
+        bounds = self.camera.world_bounds()
+        if isinstance(world, World):
+            vehicles = culling.visible_vehicles(bounds)
+        else:
+            vehicles = culling.contained(world.active_vehicles(), bounds)
+        return culling.visible_lanes(bounds), vehicles
+
+    def transform_lane(self, lane) -> np.ndarray:
+        """Transform the mesh of a lane, simplified for the camera's zoom, to pixel coordinates."""
+        return self.camera.transform_points(self.culling.lane_mesh(lane, self.camera.zoom))
+
+    def transform_vehicles(self, vehicles: list) -> list:
+        """Transform the meshes of the given vehicles with one 'Camera2D.transform_meshes' call per mesh size.
+
+        :return: (vehicle, pixel polygon) pairs
+        """
+        groups = {}
+        for vehicle in vehicles:
+            entry = self.meshes.get(id(vehicle.mesh))
+            if entry is None:
+                # the entry keeps the mesh alive, so its id is not reused
+                entry = self.meshes[id(vehicle.mesh)] = vehicle.mesh, np.array([(v.x, v.y) for v in vehicle.mesh],
+                                                                             dtype=float)
+            mesh = entry[1]
+            groups.setdefault(len(mesh), []).append((vehicle, mesh))
+        result = []
+        for group in groups.values():
+            vertices = np.stack([mesh for _, mesh in group])
+            orientations = [vehicle.orientation for vehicle, _ in group]
+            positions = [(vehicle.position.x, vehicle.position.y) for vehicle, _ in group]
+            result.extend(zip((vehicle for vehicle, _ in group),
+                              self.camera.transform_meshes(vertices, orientations, positions)))
+        return result
 
     @abc.abstractmethod
     def render(self, world: World):
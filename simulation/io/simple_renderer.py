@@ -20,35 +20,60 @@ class SimpleRenderer(Renderer, InputController):
         self.last_position = self.camera.position.copy()
         self.render_image = np.full((self.camera.viewport.y, self.camera.viewport.x, 3),
                                     self.background_brightness, np.float32)  # type: np.ndarray
+        self.road_layer = None  # type: np.ndarray  # lanes rendered for 'road_layer_key'
+        self.road_layer_key = None  # type: tuple
 
     def render_surfaces(self, world: World) -> None:
-        for road in world.roads:
-            for lane in road.lanes:
-                poly = self.camera.apply_transform(lane)
-                cv2.fillPoly(self.render_image, pts=[poly], color=lane.color)
-        for vehicle in world.vehicles:
-            if not vehicle.active:
-                continue
-            poly = self.camera.apply_transform(vehicle)
+        lanes, vehicles = self.visible(world)
+        np.copyto(self.render_image, self.render_road_layer(world, lanes))
+        self.render_vehicles(vehicles)
+
+    def render_road_layer(self, world: World, lanes: list) -> np.ndarray:
+        """Render the lanes into a background buffer, which is reused as long as the camera pose does not change.
+
+        Call 'invalidate_road_layer' after changing the road geometry.
+
+        :param lanes: visible lanes of the world, see 'Renderer.visible'
+
+        :return: background buffer with the lanes
+        """
+        camera = self.camera
+        key = (id(world.roads), len(world.roads), camera.position.x, camera.position.y, camera.orientation, camera.zoom,
+               camera.viewport.x, camera.viewport.y, self.background_brightness)
+        if key != self.road_layer_key:
+            self.road_layer = np.full((camera.viewport.y, camera.viewport.x, 3),
+                                      self.background_brightness, np.float32)
+            for lane in lanes:
+                cv2.fillPoly(self.road_layer, pts=[self.transform_lane(lane)], color=lane.color)
+            self.road_layer_key = key
+        return self.road_layer
+
+    def invalidate_road_layer(self) -> None:
+        self.road_layer_key = None
+        self.culling_key = None
+
+    def render_vehicles(self, vehicles: list) -> None:
+        """Transform the given vehicles in one pass and draw them in their order.
+
+        Every vehicle is filled with its own 'fillPoly' call, so overlapping vehicles do not cut holes into each other.
+        """
+        for vehicle, poly in self.transform_vehicles(vehicles):
             color = vehicle.color
             if vehicle.TURN_SIGNAL_NONE != vehicle.turn_signal:
-                color = [0, 0.7, 1.0]
+                color = (0, 0.7, 1.0)
             cv2.fillPoly(self.render_image, pts=[poly], color=color)
 
     def render_wireframes(self, world: World) -> None:
-        for road in world.roads:
-            for lane in road.lanes:
-                poly = self.camera.apply_transform(lane)
-                cv2.polylines(self.render_image, pts=[poly], isClosed=True, color=lane.color)
-                for node in poly:
-                    cv2.circle(self.render_image, center=(int(node[0]), int(node[1])), radius=3, color=lane.color)
-        for vehicle in world.vehicles:
-            if not vehicle.active:
-                continue
+        lanes, vehicles = self.visible(world)
+        for lane in lanes:
+            poly = self.transform_lane(lane)
+            cv2.polylines(self.render_image, pts=[poly], isClosed=True, color=lane.color)
+            for node in poly:
+                cv2.circle(self.render_image, center=(int(node[0]), int(node[1])), radius=3, color=lane.color)
+        for vehicle, poly in self.transform_vehicles(vehicles):
             color = vehicle.color
             if vehicle.TURN_SIGNAL_NONE != vehicle.turn_signal:
                 color = [0, 0.7, 1.0]
-            poly = self.camera.apply_transform(vehicle)
             cv2.polylines(self.render_image, pts=[poly], isClosed=True, color=color)
             for node in poly:
                 cv2.circle(self.render_image, center=(int(node[0]), int(node[1])), radius=3, color=color)
@@ -0,0 +1,272 @@
+import json
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+from simulation.layout.world_snapshot import VehicleSnapshot, WorldSnapshot
+from simulation.vector2 import Vector2
+
+MAGIC = b'TRJ1'
+ALIGNMENT = 8  # columns start at multiples of this many bytes, so uncompressed columns can be mapped directly
+# recorded state of every active vehicle per tick, the lane is the index in 'lane_table'
+COLUMNS = (('id', '<i4'), ('lane', '<i4'), ('distance', '<f4'), ('x', '<f4'), ('y', '<f4'),
+           ('orientation', '<f4'), ('velocity', '<f4'), ('acceleration', '<f4'), ('turn_signal', '<i1'))
+# per tick columns of a chunk, 'offsets' are the first row of every tick and the end of the last tick
+TICK_COLUMNS = (('time', '<f8'), ('offsets', '<i8'))
+
+
+def lane_table(roads: list) -> list:
+    """Lanes of the given roads in the order of the 'lane' column."""
+    return [lane for road in roads for lane in road.lanes]
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+class TrajectoryRecorder:
+    """Writes the state of all active vehicles after every tick into a compact columnar binary file.
+
+    The file starts with a header and continues with chunks of 'chunk_ticks' ticks. Every chunk is a JSON
+    header followed by one binary column per tick column and per vehicle column (see 'COLUMNS'),
+    optionally compressed with zlib. Chunks are written as soon as they are full, so the file of an
+    aborted run can still be replayed up to its last complete chunk. Read files with 'TrajectoryReplay'.
+
+    Set it as 'World.recorder' to record every 'World.update', or call 'record' directly.
+    """
+
+    CHUNK_TICKS = 256
+
+    def __init__(self, path: str, world, chunk_ticks: int = CHUNK_TICKS, compression: int = 0):
+        """Create the file and write its header.
+
+        :param path: file to write
+        :param world: recorded world, its lanes define the values of the 'lane' column
+        :param chunk_ticks: number of ticks per chunk
+        :param compression: zlib level from 1 to 9, 0 writes uncompressed chunks
+        """
+        self.path = path  # type: str
+        self.chunk_ticks = chunk_ticks  # type: int
+        self.compression = compression  # type: int
+        self.lanes = {lane: i for i, lane in enumerate(lane_table(world.roads))}  # type: Dict[Lane, int]
+        self.time = 0.0  # type: float
+        self.ticks = 0  # type: int  # number of recorded ticks
+        self.known = set()  # type: set  # vehicle ids whose color and mesh were written
+        self._first_tick = 0  # type: int
+        self._times = []  # type: List[float]
+        self._offsets = [0]  # type: List[int]
+        self._rows = {name: [] for name, _ in COLUMNS}  # type: Dict[str, list]
+        self._vehicles = {}  # type: Dict[str, dict]  # vehicles seen for the first time in the current chunk
+        self._file = open(path, 'wb')
+        header = json.dumps({'columns': COLUMNS, 'tick_columns': TICK_COLUMNS, 'lanes': len(self.lanes),
+                             'compression': compression}).encode()
+        self._file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    def record(self, world, delta_time: float = 0.0) -> None:
+        """Append the state of the active vehicles as the next tick.
+
+        :param world: recorded world
+        :param delta_time: simulation time passed since the last tick
+        """
+        self.time += delta_time
+        rows = self._rows
+        lanes = self.lanes
+        for vehicle in world.active_vehicles():
+            if vehicle.id not in self.known:
+                self.known.add(vehicle.id)
+                self._vehicles[str(vehicle.id)] = {'color': list(vehicle.color),
+                                                   'mesh': [(v.x, v.y) for v in vehicle.mesh]}
+            rows['id'].append(vehicle.id)
+            rows['lane'].append(lanes.get(vehicle.lane, -1))
+            rows['distance'].append(vehicle.travelled_distance)
+            rows['x'].append(vehicle.position.x)
+            rows['y'].append(vehicle.position.y)
+            rows['orientation'].append(vehicle.orientation)
+            rows['velocity'].append(vehicle.velocity)
+            rows['acceleration'].append(vehicle.acceleration)
+            rows['turn_signal'].append(vehicle.turn_signal)
+        self._times.append(self.time)
+        self._offsets.append(len(rows['id']))
+        self.ticks += 1
+        if len(self._times) >= self.chunk_ticks:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the recorded ticks as a chunk."""
+        if not self._times:
+            return
+        columns = [np.array(self._times, dtype=TICK_COLUMNS[0][1]), np.array(self._offsets, dtype=TICK_COLUMNS[1][1])]
+        columns += [np.array(self._rows[name], dtype=dtype) for name, dtype in COLUMNS]
+        data = [column.tobytes() for column in columns]
+        if self.compression:
+            data = [zlib.compress(column, self.compression) for column in data]
+        header = json.dumps({'first_tick': self._first_tick, 'ticks': len(self._times),
+                             'rows': self._offsets[-1], 'sizes': [len(column) for column in data],
+                             'vehicles': self._vehicles}).encode()
+        # pad the header with spaces, so the first column is aligned
+        header += b' ' * _padding(self._file.tell() + 4 + len(header))
+        self._file.write(struct.pack('<I', len(header)) + header)
+        for column in data:
+            self._file.write(column + b'\0' * _padding(len(column)))
+        self._file.flush()
+        self._first_tick = self.ticks
+        self._times = []
+        self._offsets = [0]
+        self._rows = {name: [] for name, _ in COLUMNS}
+        self._vehicles = {}
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryReplay:
+    """Memory mapped access to a file written by 'TrajectoryRecorder'.
+
+    Opening a file only reads the chunk headers. Uncompressed columns are views into the mapped file,
+    compressed chunks are decompressed on access and the last 'CACHE_CHUNKS' of them are kept.
+    Any tick range can be read as columns for analysis ('read') or as 'WorldSnapshot's for a renderer
+    ('snapshot', 'snapshots'), without stepping the world.
+    """
+
+    CACHE_CHUNKS = 8
+
+    def __init__(self, path: str):
+        self.path = path  # type: str
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')  # type: np.memmap
+        if bytes(self.data[:4]) != MAGIC:
+            raise ValueError('Not a trajectory file: ' + path)
+        size, = struct.unpack('<I', bytes(self.data[4:8]))
+        self.header = json.loads(bytes(self.data[8:8 + size]).decode())  # type: dict
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in self.header['tick_columns'] + self.header['columns']]
+        self.chunks = []  # type: List[dict]
+        self.vehicles = {}  # type: Dict[int, (tuple, list)]  # color and mesh per vehicle id
+        self.cache = OrderedDict()  # type: OrderedDict
+        offset = 8 + size
+        while offset + 4 <= len(self.data):
+            size, = struct.unpack('<I', bytes(self.data[offset:offset + 4]))
+            if offset + 4 + size > len(self.data):
+                break
+            chunk = json.loads(bytes(self.data[offset + 4:offset + 4 + size]).decode())
+            offset += 4 + size
+            chunk['offsets'] = []
+            for stored in chunk['sizes']:
+                chunk['offsets'].append(offset)
+                offset += stored + _padding(stored)
+            if offset > len(self.data):
+                break  # incomplete chunk of an aborted recording
+            self.chunks.append(chunk)
+            for vehicle_id, vehicle in chunk['vehicles'].items():
+                self.vehicles[int(vehicle_id)] = (tuple(vehicle['color']),
+                                                  [Vector2(x, y) for x, y in vehicle['mesh']])
+        self.first_ticks = np.array([chunk['first_tick'] for chunk in self.chunks], dtype=np.int64)
+
+    def __len__(self):
+        """:return: number of recorded ticks"""
+        if not self.chunks:
+            return 0
+        return self.chunks[-1]['first_tick'] + self.chunks[-1]['ticks']
+
+    def read(self, start: int = 0, stop: int = None) -> Dict[str, np.ndarray]:
+        """Read the rows of a range of ticks.
+
+        :param start: first tick
+        :param stop: tick after the last one, the end of the recording if None
+        :return: column name -> array of all rows in the range, with the additional columns 'tick' and 'time'
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        parts = {name: [] for name, _ in COLUMNS}
+        parts['tick'], parts['time'] = [], []
+        for index in range(max(0, int(np.searchsorted(self.first_ticks, start, side='right')) - 1), len(self.chunks)):
+            chunk = self.chunks[index]
+            if chunk['first_tick'] >= stop:
+                break
+            columns = self._chunk(index)
+            first = max(start - chunk['first_tick'], 0)
+            last = min(stop - chunk['first_tick'], chunk['ticks'])
+            if first >= last:
+                continue
+            offsets = columns['offsets']
+            rows = slice(offsets[first], offsets[last])
+            for name, _ in COLUMNS:
+                parts[name].append(columns[name][rows])
+            counts = np.diff(offsets[first:last + 1])
+            parts['tick'].append(np.repeat(np.arange(first, last, dtype=np.int64) + chunk['first_tick'], counts))
+            parts['time'].append(np.repeat(columns['time'][first:last], counts))
+        result = {}
+        for name, dtype in self.columns[len(TICK_COLUMNS):] + [('tick', np.dtype(np.int64)),
+                                                                ('time', np.dtype(np.float64))]:
+            result[name] = np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype)
+        return result
+
+    def times(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """:return: simulation time of every tick in the range"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        result = [self._chunk(index)['time'][max(start - chunk['first_tick'], 0):stop - chunk['first_tick']]
+                  for index, chunk in enumerate(self.chunks)
+                  if chunk['first_tick'] < stop and chunk['first_tick'] + chunk['ticks'] > start]
+        return np.concatenate(result) if result else np.empty(0)
+
+    def snapshot(self, tick: int, roads: list) -> WorldSnapshot:
+        """Vehicle states of one tick, e.g. for 'SimpleRenderer.render'.
+
+        :param tick: recorded tick
+        :param roads: roads of the recorded world
+        """
+        rows = self.read(tick, tick + 1)
+        vehicles = []
+        for vehicle_id, x, y, orientation, velocity, acceleration, turn_signal in zip(
+                rows['id'].tolist(), rows['x'].tolist(), rows['y'].tolist(), rows['orientation'].tolist(),
+                rows['velocity'].tolist(), rows['acceleration'].tolist(), rows['turn_signal'].tolist()):
+            color, mesh = self.vehicles[vehicle_id]
+            vehicles.append(VehicleSnapshot(vehicle_id, Vector2(x, y), orientation, velocity, acceleration,
+                                            turn_signal, color, mesh))
+        return WorldSnapshot(roads, float(self.times(tick, tick + 1)[0]), tick, vehicles)
+
+    def snapshots(self, roads: list, start: int = 0, stop: int = None):
+        """Generate the snapshots of a range of ticks, see 'snapshot'."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for tick in range(start, stop):
+            yield self.snapshot(tick, roads)
+
+    def _chunk(self, index: int) -> Dict[str, np.ndarray]:
+        columns = self.cache.get(index)
+        if columns is not None:
+            self.cache.move_to_end(index)
+            return columns
+        chunk = self.chunks[index]
+        compressed = self.header['compression'] > 0
+        columns = {}
+        for (name, dtype), offset, stored in zip(self.columns, chunk['offsets'], chunk['sizes']):
+            data = self.data[offset:offset + stored]
+            if compressed:
+                columns[name] = np.frombuffer(zlib.decompress(bytes(data)), dtype=dtype)
+            else:
+                columns[name] = data.view(dtype)
+        if compressed:
+            self.cache[index] = columns
+            if len(self.cache) > TrajectoryReplay.CACHE_CHUNKS:
+                self.cache.popitem(last=False)
+        return columns
+
+    def close(self) -> None:
+        self.cache.clear()
+        self.chunks = []
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+import simulation.vector_array as vector_array
+from simulation.layout.spatial_grid import SpatialGrid
+
+
+class ViewCulling:
+    """Spatial index over the lanes of a world to find the lanes and vehicles inside a camera's view.
+
+    Every lane segment is inserted with its bounding box into a 'SpatialGrid', so a query only visits the
+    cells overlapping the view. Vehicles are found through the vehicle index of the visible lanes.
+    Lane meshes are simplified for the zoom level of the camera (see 'lane_mesh').
+    """
+
+    CELL_SIZE = 50.0
+    TOLERANCE = 0.5  # maximal error of simplified lane meshes in pixels
+    MARGIN = 10.0  # vehicles up to this distance in meters outside of the view can still overlap it
+
+    def __init__(self, roads: list, cell_size: float = CELL_SIZE, tolerance: float = TOLERANCE,
+                 margin: float = MARGIN):
+        self.grid = SpatialGrid(cell_size)  # type: SpatialGrid
+        self.tolerance = tolerance  # type: float
+        self.margin = margin  # type: float
+        self.order = {}  # type: {Lane: int}  # lanes are drawn in the order of the world
+        self.meshes = {}  # type: {(Lane, int): np.ndarray}  # simplified lane meshes per zoom level
+        for road in roads:
+            for lane in road.lanes:
+                self.add_lane(lane)
+
+    def add_lane(self, lane) -> None:
+        self.order[lane] = len(self.order)
+        for right, left, next_right, next_left in zip(lane.right, lane.left, lane.right[1:], lane.left[1:]):
+            xs = right.x, left.x, next_right.x, next_left.x
+            ys = right.y, left.y, next_right.y, next_left.y
+            self.grid.insert_box(min(xs), min(ys), max(xs), max(ys), lane, owner=lane)
+
+    def visible_lanes(self, bounds: (float, float, float, float)) -> list:
+        """Find the lanes with a segment overlapping the given box, see 'Camera2D.world_bounds'.
+
+        :return: lanes in the order of the world
+        """
+        return sorted(self.grid.query(*bounds), key=self.order.get)
+
+    def visible_vehicles(self, bounds: (float, float, float, float)) -> list:
+        """Find the active vehicles on the lanes around the given box, see 'contained'.
+
+        Lane reservations in the vehicle index of a lane are skipped.
+        """
+        xmin, ymin, xmax, ymax = bounds
+        lanes = self.visible_lanes((xmin - self.margin, ymin - self.margin, xmax + self.margin, ymax + self.margin))
+        return self.contained([vehicle for lane in lanes for vehicle in lane.vehicles
+                               if not vehicle.reservation and vehicle.active], bounds)
+
+    def contained(self, vehicles: list, bounds: (float, float, float, float)) -> list:
+        """Filter the vehicles whose position is inside the given box widened by 'margin'."""
+        xmin, ymin, xmax, ymax = bounds
+        xmin, ymin, xmax, ymax = xmin - self.margin, ymin - self.margin, xmax + self.margin, ymax + self.margin
+        return [vehicle for vehicle in vehicles
+                if xmin <= vehicle.position.x <= xmax and ymin <= vehicle.position.y <= ymax]
+
+    def lane_mesh(self, lane, zoom: float) -> np.ndarray:
+        """Mesh of a lane in world coordinates, simplified for the given zoom.
+
+        Both borders of the lane are simplified with 'vector_array.simplify'. Zoom levels are powers of two,
+        the tolerance of a level keeps the error below 'tolerance' pixels for all zooms of that level.
+
+        :return: K x 2 array, the right border followed by the reversed left border like 'Lane.mesh'
+        """
+        level = int(math.floor(math.log2(zoom)))
+        key = lane, level
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            tolerance = self.tolerance / 2.0 ** (level + 1)
+            right, left = vector_array.to_array(lane.right), vector_array.to_array(lane.left)
+            right = right[vector_array.simplify(right, tolerance)]
+            left = left[vector_array.simplify(left, tolerance)]
+            mesh = self.meshes[key] = np.concatenate((right, left[::-1]))
+        return mesh
+
+    def clear_meshes(self) -> None:
+        self.meshes.clear()
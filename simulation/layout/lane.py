@@ -1,15 +1,17 @@
+import bisect
+import math
+
 from simulation.simulation_object import SimulationObject
 from simulation.vector2 import Vector2
 
-from simulation.layout.spawner import Spawner
+from simulation.layout.projection_cache import ProjectionCache
+from simulation.layout.spatial_grid import SpatialGrid
 
 
 class Lane(SimulationObject):
 
     EPSILON = 0.001
 
-    next_node_hash = {}
-
     def __init__(self, road):
         super(Lane, self).__init__(position=Vector2(0, 0),
                                    orientation=0,
@@ -20,37 +22,101 @@ class Lane(SimulationObject):
         self.center = []  # type: [Vector2]
         self.right = []  # type: [Vector2]
         self.accumulated_distance = []  # type: [Vector2]
+        # segment geometry, see 'index_geometry'
+        self.tangents = []  # type: [(float, float)]
+        self.segment_lengths = []  # type: [float]
+        self.headings = []  # type: [float]
+        self.curvature = []  # type: [float]
         self.vehicles = []  # type: [Vehicle]
+        self.vehicle_distances = []  # type: [float]
         self.neighboring_lanes = []  # type: [Lane]
         self.left_neighbor = None  # type: Lane
         self.right_neighbor = None  # type: Lane
         self.back_connection = None  # type: Lane
         self.front_connection = None  # type: Lane
+        self.feeding_lanes = []  # type: [Lane]  # all lanes whose front connection is this lane
         self.lane_change_threshold = 0.0
-        self.closest_node_hash = {}
-        self.closest_segment_hash = {}
-
-    def reset_hashes(self):
-        self.closest_node_hash = {}
-        self.closest_segment_hash = {}
+        self.node_grid = SpatialGrid()  # type: SpatialGrid
+        self.chain_index = 0  # type: int
+        self.chain_positions = {self: 0}  # type: {Lane: int}  # position of each lane of the chain of this lane
+        self.next_nodes = {}  # type: {(float, float): Vector2}
+        self.projection_cache = ProjectionCache()  # type: ProjectionCache
 
     def find_back_vehicle(self, position):
+        """Find the closest vehicle behind the given position.
+
+        Lanes keep their vehicles sorted by travelled distance,
+        so each lane along the back connections is searched by bisection.
+
+        :param position: position to search from
+        :return: closest vehicle behind or None
+        """
         _, lane = self.find_closest_node(position)
         travel_dist = lane.projected_travelled_distance(position)
         while lane is not None:
-            for vehicle in reversed(lane.vehicles):
-                if travel_dist >= lane.projected_travelled_distance(vehicle.position) and vehicle.position != position:
+            index = bisect.bisect_right(lane.vehicle_distances, travel_dist) - 1
+            while index >= 0:
+                vehicle = lane.vehicles[index]
+                if vehicle.position != position:
                     return vehicle
+                index -= 1
             lane = lane.back_connection
         return None
 
     def find_front_vehicle(self, position):
+        """Find the closest vehicle in front of the given position.
+
+        Lanes keep their vehicles sorted by travelled distance,
+        so each lane along the front connections is searched by bisection.
+
+        :param position: position to search from
+        :return: closest vehicle in front or None
+        """
         _, lane = self.find_closest_node(position)
         travel_dist = lane.projected_travelled_distance(position)
         while lane is not None:
-            for vehicle in lane.vehicles:
-                if travel_dist <= lane.projected_travelled_distance(vehicle.position) and vehicle.position != position:
+            index = bisect.bisect_left(lane.vehicle_distances, travel_dist)
+            while index < len(lane.vehicles):
+                vehicle = lane.vehicles[index]
+                if vehicle.position != position:
                     return vehicle
+                index += 1
+            lane = lane.front_connection
+        return None
+
+    def find_back_vehicle_at(self, travelled_distance, ignore=None):
+        """Find the closest vehicle behind the given travelled distance on this lane or the lanes behind.
+
+        :param travelled_distance: travelled distance on the chain of this lane
+        :param ignore: vehicle to skip, usually the asking vehicle itself
+        :return: closest vehicle behind or None
+        """
+        lane = self
+        while lane is not None:
+            index = bisect.bisect_right(lane.vehicle_distances, travelled_distance) - 1
+            while index >= 0:
+                vehicle = lane.vehicles[index]
+                if vehicle is not ignore:
+                    return vehicle
+                index -= 1
+            lane = lane.back_connection
+        return None
+
+    def find_front_vehicle_at(self, travelled_distance, ignore=None):
+        """Find the closest vehicle in front of the given travelled distance on this lane or the lanes in front.
+
+        :param travelled_distance: travelled distance on the chain of this lane
+        :param ignore: vehicle to skip, usually the asking vehicle itself
+        :return: closest vehicle in front or None
+        """
+        lane = self
+        while lane is not None:
+            index = bisect.bisect_left(lane.vehicle_distances, travelled_distance)
+            while index < len(lane.vehicles):
+                vehicle = lane.vehicles[index]
+                if vehicle is not ignore:
+                    return vehicle
+                index += 1
             lane = lane.front_connection
         return None
 
@@ -74,17 +140,18 @@ class Lane(SimulationObject):
             else:
                 vehicle.target = vehicle.trajectory[0]
         else:
-            fixed_pos = self.traverse(vehicle.target, distance)
-            if fixed_pos is None:
+            travelled_distance = self.projected_travelled_distance(vehicle.target)
+            located = self.traverse_distance(travelled_distance, distance)
+            if located is None:
                 self.remove_vehicle(vehicle)
                 return
-            vehicle.position = fixed_pos
-            target = self.find_next_node(vehicle.position)
-            if target is None:
-                print("target is None for " + str(vehicle.position))
+            fixed_pos, lane, first = located
+            if lane.front_connection is None and travelled_distance + distance >= lane.accumulated_distance[-1]:
+                # the end of the last lane has no next node to target
                 self.remove_vehicle(vehicle)
                 return
-            vehicle.target = target
+            vehicle.position = fixed_pos
+            vehicle.target = lane.center[first + 1]
 
     def traverse_trajectory(self, position, trajectory, distance):
         if not trajectory:
@@ -106,44 +173,101 @@ class Lane(SimulationObject):
     def traverse(self, position, distance):
         """Calculate a new position based on the given one, by traversing the lane.
 
-        Start at 'position' and travel 'distance' meters along the lane.
-        If the initial position is not on the lane, reach the lane before
-        continuing the traversal.
+        Start at the projection of 'position' on the lane and travel 'distance' meters along the lane.
 
         :param position: start position
         :param distance: travel distance
-        :return: new position after traversing
+        :return: new position after traversing or None if the end of the last lane is reached
         """
-        curr = position
-        succ = self.find_next_node(curr)
-        while succ is not None:
-            if curr == succ:
-                print("'find_next_node' returned same node again! " + str(succ))
-                exit(1)
-            succ_dist = (succ - curr).length()
-            if distance < succ_dist:
-                direction = succ - curr
-                direction.normalize()
-                return curr + distance * direction
-            distance -= succ_dist
-            curr = succ
-            succ = self.find_next_node(curr)
-        return None
+        located = self.traverse_distance(self.projected_travelled_distance(position), distance)
+        if located is None:
+            return None
+        return located[0]
+
+    def traverse_distance(self, travelled_distance, distance):
+        """Travel along the lane and its front connections, starting at the given travelled distance.
+
+        The reached segment is found with 'locate', so both agree on segment boundaries: a distance exactly
+        at a node belongs to the segment starting there, the end of a lane still belongs to that lane.
+
+        :param travelled_distance: start on the chain of this lane
+        :param distance: travel distance
+        :return: position, reached lane, index of the first node of the reached segment
+                 or None if the distance is beyond the end of the last lane
+        """
+        travelled_distance += distance
+        located = self.locate(travelled_distance)
+        if located is None:
+            return None
+        lane, first = located
+        x, y = lane.tangents[first]
+        node = lane.center[first]
+        offset = travelled_distance - lane.accumulated_distance[first]
+        return Vector2(node.x + offset * x, node.y + offset * y), lane, first
+
+    def locate(self, travelled_distance):
+        """Find the lane segment containing the given travelled distance.
+
+        The search follows the connections of this lane, travelled distances are continuous along them.
+
+        :param travelled_distance: travelled distance on the chain of this lane
+        :return: lane, index of the first node of the segment or None if the distance is beyond the last lane
+        """
+        lane = self
+        while travelled_distance > lane.accumulated_distance[-1]:
+            if lane.front_connection is None:
+                return None
+            lane = lane.front_connection
+        while travelled_distance < lane.accumulated_distance[0] and lane.back_connection is not None:
+            lane = lane.back_connection
+        index = bisect.bisect_right(lane.accumulated_distance, travelled_distance) - 1
+        return lane, min(max(index, 0), len(lane.center) - 2)
+
+    def position_at(self, travelled_distance):
+        """Calculate the position on the lane for the given travelled distance.
+
+        :param travelled_distance: travelled distance on the chain of this lane
+        :return: position, normalized lane direction or None if the distance is beyond the last lane
+        """
+        located = self.locate(travelled_distance)
+        if located is None:
+            return None
+        lane, first = located
+        direction = Vector2(*lane.tangents[first])
+        return lane.center[first] + (travelled_distance - lane.accumulated_distance[first]) * direction, direction
+
+    def map_distance(self, travelled_distance, lane):
+        """Map a travelled distance on this lane to the travelled distance at the same spot of a neighboring lane.
+
+        Lanes of the same road are built from the same path, so their nodes correspond by index.
+
+        :param travelled_distance: travelled distance on this lane
+        :param lane: neighboring lane
+        :return: travelled distance on the neighboring lane
+        """
+        last = min(len(self.center), len(lane.center)) - 2
+        first = bisect.bisect_right(self.accumulated_distance, travelled_distance) - 1
+        first = min(max(first, 0), last)
+        fraction = ((travelled_distance - self.accumulated_distance[first]) /
+                    (self.accumulated_distance[first + 1] - self.accumulated_distance[first]))
+        return lane.accumulated_distance[first] + fraction * (lane.accumulated_distance[first + 1] -
+                                                              lane.accumulated_distance[first])
 
     def remove_vehicle(self, vehicle):
         """Remove the given agent from this lane.
 
-        Removed vehicles are deactivated and returned to the spawnpool
+        Removed vehicles are deactivated, their pending events are cancelled and they are returned to the spawnpool
 
         :param vehicle: agent to remove
         :return: None
         """
-        if vehicle in self.vehicles:
+        if self.detach_vehicle(vehicle):
             vehicle.active = False
             vehicle.lane = None
-            self.vehicles.remove(vehicle)
-            if vehicle.respawn:
-                Spawner.add_vehicle(vehicle)
+            if vehicle.context is not None:
+                vehicle.cancel_events()
+            if vehicle.respawn and vehicle.context is not None:
+                vehicle.context.vehicle_pool.append(vehicle)
         else:
             print("Attempted to remove agent from wrong lane.")
 
@@ -201,12 +325,9 @@ class Lane(SimulationObject):
                 first, second = first - 1, first
         if first > second:
             first, second = second, first
-        direction = (lane.center[second] - lane.center[first])
-        direction.normalize()
-        heading = Vector2(0, 1)
-        heading.rotate(vehicle.orientation)
-        directed_velocity = vehicle.velocity * heading
-        projected_velocity = directed_velocity.dot(direction)
+        x, y = lane.tangents[first]
+        heading_x, heading_y = Vector2.rotated(0, 1, vehicle.orientation)
+        projected_velocity = (vehicle.velocity * heading_x) * x + (vehicle.velocity * heading_y) * y
         if projected_velocity < 0.0:
             projected_velocity *= -1
         return projected_velocity
@@ -231,27 +352,28 @@ class Lane(SimulationObject):
         :param position: given position
         :return: first_node, second_node, closest_lane
         """
-        if position in self.closest_segment_hash:
-            return self.closest_segment_hash[position]
+        key = self.projection_cache.key('segment', self, position)
+        closest = self.projection_cache.get(key)
+        if closest is None:
+            closest = self._find_closest_segment(position)
+            self.projection_cache.put(key, closest)
+        return closest
+
+    def _find_closest_segment(self, position):
         closest_node, closest_lane = self.find_closest_node(position)
         if closest_node > 0:
             if position.check_projection(closest_lane.center[closest_node - 1], closest_lane.center[closest_node]):
-                self.closest_segment_hash[position] = closest_node - 1, closest_node, closest_lane
                 return closest_node - 1, closest_node, closest_lane
         elif closest_lane.back_connection is not None:
             if position.check_projection(closest_lane.back_connection.center[-2], closest_lane.back_connection.center[-1]):
                 length = len(closest_lane.back_connection.center)
-                self.closest_segment_hash[position] = length - 2, length - 1, closest_lane.back_connection
                 return length - 2, length - 1, closest_lane.back_connection
         if closest_node < len(closest_lane.center) - 1:
             if position.check_projection(closest_lane.center[closest_node], closest_lane.center[closest_node + 1]):
-                self.closest_segment_hash[position] = closest_node, closest_node + 1, closest_lane
                 return closest_node, closest_node + 1, closest_lane
         elif closest_lane.front_connection is not None:
             if position.check_projection(closest_lane.front_connection.center[0], closest_lane.front_connection.center[1]):
-                self.closest_segment_hash[position] = 0, 1, closest_lane.front_connection
                 return 0, 1, closest_lane.front_connection
-        self.closest_segment_hash[position] = closest_node, None, closest_lane
         return closest_node, None, closest_lane
 
     def init_accumulated_distances(self):
@@ -262,34 +384,149 @@ class Lane(SimulationObject):
             dist += self.center[i].distance(self.center[i-1])
             self.accumulated_distance.append(dist)
 
+    def index_geometry(self):
+        """Precompute the geometry of the center line.
+
+        Stores per segment the unit tangent, length and heading (orientation in degrees like 'Vector2.angle')
+        and per node the signed curvature in 1/m, positive for left turns and 0 at both ends.
+        Call this whenever center nodes change.
+
+        :return: None
+        """
+        self.tangents = []
+        self.segment_lengths = []
+        self.headings = []
+        for first, second in zip(self.center, self.center[1:]):
+            x, y = second.x - first.x, second.y - first.y
+            length = math.sqrt(x * x + y * y)
+            self.tangents.append((x / length, y / length))
+            self.segment_lengths.append(length)
+            self.headings.append(Vector2.angle(x / length, y / length))
+        self.curvature = [0.0] * len(self.center)
+        for i in range(1, len(self.center) - 1):
+            change = (self.headings[i] - self.headings[i - 1] + 180.0) % 360.0 - 180.0
+            mean_length = (self.segment_lengths[i - 1] + self.segment_lengths[i]) / 2.0
+            self.curvature[i] = -change * Vector2.DEG_2_RAD / mean_length
+
     def find_closest_node(self, position):
         """Find the closest node on the closest lane to the given position.
         Use euclidean distance metric.
 
+        The lanes behind this lane along 'back_connection' and in front of it along 'front_connection'
+        are searched, using the spatial grid of this chain (see 'index_chain'). On equal distances nodes of this lane win, followed by lanes in front and lanes behind.
+
         :param position: position to find closest node from
         :return: closest_node, closest_lane
         """
-        if position in self.closest_node_hash:
-            return self.closest_node_hash[position]
-        closest = None, None
-        dist = float("inf")
-        lane = self
-        while lane is not None:
-            for i, node in enumerate(lane.center):
-                if position.distance(node) < dist:
-                    dist = position.distance(node)
-                    closest = i, lane
-            lane = lane.front_connection
-        lane = self
-        while lane is not None:
-            for i, node in enumerate(lane.center):
-                if position.distance(node) < dist:
-                    dist = position.distance(node)
-                    closest = i, lane
-            lane = lane.back_connection
-        self.closest_node_hash[position] = closest
+        key = self.projection_cache.key('node', self, position)
+        closest = self.projection_cache.get(key)
+        if closest is None:
+            closest = self.node_grid.nearest(position, self._chain_rank)
+            if closest is None:
+                closest = None, None
+            self.projection_cache.put(key, closest)
         return closest
 
+    def _chain_rank(self, item):
+        node, lane = item
+        offset = self.chain_positions[lane] - self.chain_index
+        if offset >= 0:
+            return 0, offset, node
+        return 1, -offset, node
+
+    def index_nodes(self):
+        """(Re-)insert the center nodes of this lane into all spatial grids containing this lane."""
+        grids = []
+        for lane in self.connected_lanes():
+            if self in lane.chain_positions and all(lane.node_grid is not grid for grid in grids):
+                grids.append(lane.node_grid)
+        for grid in grids:
+            grid.remove_owner(self)
+            for i, node in enumerate(self.center):
+                grid.insert(node, (i, self), self)
+
+    def connected_lanes(self):
+        """All lanes connected to this lane by front and back connections, directly or indirectly."""
+        component = [self]
+        seen = {self}
+        for lane in component:
+            for other in [lane.back_connection, lane.front_connection] + lane.feeding_lanes:
+                if other is not None and other not in seen:
+                    seen.add(other)
+                    component.append(other)
+        return component
+
+    def chain(self):
+        """Lanes searched by the closest node queries of this lane.
+
+        :return: lanes behind this lane along 'back_connection', this lane and lanes in front of it along
+                 'front_connection', in driving order
+        """
+        backs = []
+        seen = {self}
+        lane = self.back_connection
+        while lane is not None and lane not in seen:
+            seen.add(lane)
+            backs.append(lane)
+            lane = lane.back_connection
+        fronts = []
+        lane = self.front_connection
+        while lane is not None and lane not in seen:
+            seen.add(lane)
+            fronts.append(lane)
+            lane = lane.front_connection
+        return backs[::-1] + [self] + fronts
+
+    def index_chain(self):
+        """Let lanes with the same chain (see 'chain') share one spatial grid and all connected lanes one next node table.
+
+        Lanes merging into the same lane have different chains, so they get grids of their own and
+        only find nodes of the lanes they are connected to. Existing grids are extended where possible.
+
+        :return: None
+        """
+        component = self.connected_lanes()
+        chains = []
+        assigned = set()
+        for lane in component:
+            if lane in assigned:
+                continue
+            chain = lane.chain()
+            # the neighbours in the chain have the same chain as long as their connections point along it
+            first = last = chain.index(lane)
+            while first > 0 and chain[first - 1].front_connection is chain[first]:
+                first -= 1
+            while last < len(chain) - 1 and chain[last + 1].back_connection is chain[last]:
+                last += 1
+            chains.append((chain, chain[first:last + 1]))
+            assigned.update(chain[first:last + 1])
+        claimed = []
+        for chain, members in chains:
+            positions = {lane: i for i, lane in enumerate(chain)}
+            candidates = {}
+            for lane in members:
+                if lane.node_grid not in candidates and all(lane.node_grid is not grid for grid in claimed):
+                    candidates[lane.node_grid] = lane.chain_positions
+            candidates = [(grid, old) for grid, old in candidates.items() if all(other in positions for other in old)]
+            if candidates:
+                grid, old = max(candidates, key=lambda candidate: candidate[0].size)
+            else:
+                grid, old = SpatialGrid(), {}
+            claimed.append(grid)
+            for lane in chain:
+                if lane not in old:
+                    for i, node in enumerate(lane.center):
+                        grid.insert(node, (i, lane), lane)
+            for lane in members:
+                lane.node_grid = grid
+                lane.chain_positions = positions
+                lane.chain_index = positions[lane]
+        next_nodes = max((lane.next_nodes for lane in component), key=len)
+        for lane in component:
+            if lane.next_nodes is not next_nodes:
+                next_nodes.update(lane.next_nodes)
+                lane.next_nodes = next_nodes
+
     def find_next_node(self, position):
         """Find the closest node which lies ahead of the given position
         in terms of travelled distance.
@@ -299,8 +536,9 @@ class Lane(SimulationObject):
         :param position: position to find next node from
         :return: closest node ahead of given position
         """
-        if position in Lane.next_node_hash:
-            return Lane.next_node_hash[position]
+        next_node = self.next_nodes.get((position.x, position.y))
+        if next_node is not None:
+            return next_node
         travel_dist = self.projected_travelled_distance(position)
         closest_node, closest_lane = self.find_closest_node(position)
         if closest_lane.accumulated_distance[closest_node] - Lane.EPSILON > travel_dist:
@@ -311,14 +549,79 @@ class Lane(SimulationObject):
             return closest_lane.front_connection.center[1]
         return None
 
-    def add_vehicle(self, vehicle):
-        back = self.find_back_vehicle(vehicle.position)
-        if back is None or back not in self.vehicles:
-            self.vehicles.insert(0, vehicle)
+    def add_vehicle(self, vehicle, travelled_distance=None):
+        """Insert the given agent into this lane's index of vehicles sorted by travelled distance.
+
+        :param vehicle: agent to insert
+        :param travelled_distance: known travelled distance of the agent, projected from its position if None
+        :return: None
+        """
+        if travelled_distance is None:
+            travelled_distance = self.projected_travelled_distance(vehicle.position)
+        vehicle.travelled_distance = travelled_distance
+        index = bisect.bisect_right(self.vehicle_distances, travelled_distance)
+        self.vehicles.insert(index, vehicle)
+        self.vehicle_distances.insert(index, travelled_distance)
+
+    def detach_vehicle(self, vehicle):
+        """Remove the given agent from this lane's index without deactivating it.
+
+        :param vehicle: agent to remove
+        :return: 'True' if the agent was part of this lane, 'False' otherwise
+        """
+        index = self._vehicle_index(vehicle)
+        if index is None:
+            return False
+        del self.vehicles[index]
+        del self.vehicle_distances[index]
+        return True
+
+    def update_vehicle_distance(self, vehicle, distance=None):
+        """Refresh the cached travelled distance of the given agent after it moved.
+
+        The agent is moved to its new place in the index, which usually is the old one.
+
+        :param vehicle: agent of this lane that moved
+        :param distance: new travelled distance of the agent, projected from its position if None
+        :return: None
+        """
+        index = self._vehicle_index(vehicle)
+        if index is None:
             return
-        index = self.vehicles.index(back)
-        self.vehicles.insert(index + 1, vehicle)
+        if distance is None:
+            distance = self.projected_travelled_distance(vehicle.position)
+        vehicle.travelled_distance = distance
+        vehicles, distances = self.vehicles, self.vehicle_distances
+        distances[index] = distance
+        while index > 0 and distances[index - 1] > distance:
+            vehicles[index - 1], vehicles[index] = vehicles[index], vehicles[index - 1]
+            distances[index - 1], distances[index] = distances[index], distances[index - 1]
+            index -= 1
+        while index < len(distances) - 1 and distances[index + 1] < distance:
+            vehicles[index + 1], vehicles[index] = vehicles[index], vehicles[index + 1]
+            distances[index + 1], distances[index] = distances[index], distances[index + 1]
+            index += 1
+
+    def rebuild_vehicle_index(self):
+        """Recalculate all cached travelled distances, e.g. after the lane geometry changed."""
+        vehicles = self.vehicles
+        self.vehicles = []
+        self.vehicle_distances = []
+        for vehicle in vehicles:
+            self.add_vehicle(vehicle)
+
+    def _vehicle_index(self, vehicle):
+        index = bisect.bisect_left(self.vehicle_distances, vehicle.travelled_distance)
+        while index < len(self.vehicles) and self.vehicle_distances[index] == vehicle.travelled_distance:
+            if self.vehicles[index] is vehicle:
+                return index
+            index += 1
+        for index, other in enumerate(self.vehicles):
+            if other is vehicle:
+                return index
+        return None
 
-    def set_up_hashes(self):
+    def index_next_nodes(self):
+        """Store the successor of each center node in the table shared by the chain of this lane."""
         for i in range(len(self.center) - 1):
-            Lane.next_node_hash[self.center[i]] = self.center[i+1]
+            self.next_nodes[(self.center[i].x, self.center[i].y)] = self.center[i+1]
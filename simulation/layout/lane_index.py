@@ -0,0 +1,196 @@
+import numpy as np
+
+
+class LaneIndex:
+    """Vehicle indices of many lanes merged into one sorted array for batched neighbour queries.
+
+    Entries are ordered by lane and by travelled distance like 'Lane.vehicles'. The key of an entry is the
+    complex number 'rank + 1j * distance' of the rank of its lane and its travelled distance. NumPy orders
+    complex numbers lexicographically, so one 'searchsorted' finds the place of every query among the entries
+    of its lane. All lanes connected to the given lanes are indexed, so queries can continue along the
+    connections like the lane queries do.
+
+    The index is a snapshot, create a new one after vehicles moved unless they were moved with 'store'.
+    """
+
+    def __init__(self, lanes: list, frenet: bool = False):
+        """Index the given lanes and the lanes connected to them by back and front connections.
+
+        :param lanes: lanes to index, duplicates are indexed once
+        :param frenet: skip asking vehicles by identity like the frenet queries of 'Lane',
+                       otherwise every vehicle at the position of the asking vehicle is skipped
+        """
+        self.frenet = frenet  # type: bool
+        self.lanes = []  # type: [Lane]
+        self.ranks = {}  # type: {Lane: int}
+        stack = list(dict.fromkeys(lanes))
+        while stack:
+            lane = stack.pop()
+            if lane is None or lane in self.ranks:
+                continue
+            self.ranks[lane] = len(self.lanes)
+            self.lanes.append(lane)
+            stack.append(lane.back_connection)
+            stack.append(lane.front_connection)
+        self.entries = []  # type: list  # vehicles and lane reservations
+        distances = []
+        for lane in self.lanes:
+            self.entries.extend(lane.vehicles)
+            distances.extend(lane.vehicle_distances)
+        counts = np.array([len(lane.vehicles) for lane in self.lanes], dtype=np.intp)
+        self.end = np.cumsum(counts)  # type: np.ndarray  # end of the entries per lane rank
+        self.start = self.end - counts  # type: np.ndarray
+        self.distances = np.array(distances, dtype=float)  # type: np.ndarray
+        self.stored = distances  # type: [float]  # 'distances' as written to the lanes
+        self.entry_ranks = np.repeat(np.arange(len(self.lanes)), counts)  # type: np.ndarray
+        self.keys = LaneIndex.keys(self.entry_ranks, self.distances)  # type: np.ndarray
+        self.lengths = np.array([entry.length for entry in self.entries], dtype=float)  # type: np.ndarray
+        self.velocities = np.array([entry.velocity for entry in self.entries], dtype=float)  # type: np.ndarray
+        self.identities = np.fromiter(map(id, self.entries), dtype=np.int64, count=len(self.entries))  # type: np.ndarray
+        if not frenet:
+            self.positions = np.array([(entry.position.x, entry.position.y) for entry in self.entries],
+                                      dtype=float).reshape(-1, 2)  # type: np.ndarray
+
+    @staticmethod
+    def keys(ranks: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        keys = np.empty(len(ranks), dtype=complex)
+        keys.real = ranks
+        keys.imag = distances
+        return keys
+
+    def neighbors(self, lanes: list, distances, asking: list) -> (np.ndarray, np.ndarray, dict):
+        """Find the closest entries behind and in front of many travelled distances.
+
+        The results are the ones of 'Lane.find_back_vehicle_at' and 'Lane.find_front_vehicle_at' in frenet mode.
+        Otherwise they are the ones of 'Lane.find_back_vehicle' and 'Lane.find_front_vehicle', if the lanes and
+        distances are the closest lanes and projected travelled distances of the positions of the asking vehicles.
+
+        :param lanes: lane of each query, connected lanes are searched if it has no entry in the direction
+        :param distances: travelled distance of each query on its lane
+        :param asking: vehicle of each query, which is skipped
+        :return: entry index of the back and of the front entry per query (-1 if there is none)
+                 and the lanes searched besides their own lane per query index
+        """
+        ranks = np.array([self.ranks[lane] for lane in lanes], dtype=np.intp)
+        distances = np.asarray(distances, dtype=float)
+        skipped = self._skipped(asking)
+        searched = {}
+        back = self._search(ranks, distances, skipped, -1, searched)
+        front = self._search(ranks, distances, skipped, 1, searched)
+        return back, front, searched
+
+    def fronts(self, lanes: list, distances, asking: list) -> np.ndarray:
+        """Find the closest entries in front of many travelled distances, see 'neighbors'.
+
+        :return: entry index of the front entry per query (-1 if there is none)
+        """
+        ranks = np.array([self.ranks[lane] for lane in lanes], dtype=np.intp)
+        return self._search(ranks, np.asarray(distances, dtype=float), self._skipped(asking), 1, {})
+
+    def successors(self, index: np.ndarray) -> np.ndarray:
+        """Find the closest entries in front of the given entries, skipping the entries themselves.
+
+        The results are the ones of 'fronts' at the lanes and travelled distances of the entries in frenet mode,
+        but only entries at the end of their lane need a search.
+
+        :param index: entry indices
+        :return: entry index of the front entry per given entry (-1 if there is none)
+        """
+        # a query stops at the first entry of its lane at the same distance, which may be the skipped entry itself
+        first = np.arange(len(self.entries))
+        first[1:][(self.distances[1:] == self.distances[:-1]) & (self.entry_ranks[1:] == self.entry_ranks[:-1])] = 0
+        first = np.maximum.accumulate(first) if len(first) else first
+        result = first[index]
+        result[result == index] += 1
+        ranks = self.entry_ranks[index]
+        rows = np.flatnonzero(result >= self.end[ranks])
+        if rows.size:
+            result[rows] = self._search(ranks[rows], self.distances[index[rows]], self.identities[index[rows]], 1, {})
+        return result
+
+    def entry_indices(self, vehicles: list) -> np.ndarray:
+        """Find the entries of the given vehicles.
+
+        :return: entry index per vehicle
+        """
+        identities = np.fromiter(map(id, vehicles), dtype=np.int64, count=len(vehicles))
+        order = np.argsort(self.identities)
+        index = order[np.minimum(np.searchsorted(self.identities, identities, sorter=order), len(order) - 1)]
+        if len(vehicles) and (len(order) == 0 or (self.identities[index] != identities).any()):
+            raise ValueError('Vehicle is not in the index of its lane')
+        return index
+
+    def store(self, distances: np.ndarray) -> None:
+        """Move the entries to the given travelled distances and write the vehicle indices of all indexed lanes.
+
+        Entries are sorted by their new distance within their lane, entries at equal distances keep their order.
+        The travelled distances of the entries themselves are not changed.
+
+        :param distances: new travelled distance per entry
+        :return: None
+        """
+        order = np.lexsort((distances, self.entry_ranks))
+        self.entries = [self.entries[i] for i in order.tolist()]
+        self.distances = distances[order]
+        self.keys = LaneIndex.keys(self.entry_ranks, self.distances)
+        self.lengths = self.lengths[order]
+        self.velocities = self.velocities[order]
+        self.identities = self.identities[order]
+        if not self.frenet:
+            self.positions = self.positions[order]
+        self.stored = stored = self.distances.tolist()
+        for lane, start, end in zip(self.lanes, self.start.tolist(), self.end.tolist()):
+            lane.vehicles = self.entries[start:end]
+            lane.vehicle_distances = stored[start:end]
+
+    def current(self) -> bool:
+        """Check whether the vehicle indices of all indexed lanes are unchanged since the index was created or stored."""
+        stored = self.stored
+        for lane, start, end in zip(self.lanes, self.start.tolist(), self.end.tolist()):
+            if lane.vehicles != self.entries[start:end] or lane.vehicle_distances != stored[start:end]:
+                return False
+        return True
+
+    def _skipped(self, asking: list) -> np.ndarray:
+        if self.frenet:
+            return np.array([id(vehicle) for vehicle in asking], dtype=np.int64)
+        return np.array([(vehicle.position.x, vehicle.position.y) for vehicle in asking], dtype=float).reshape(-1, 2)
+
+    def _search(self, ranks: np.ndarray, distances: np.ndarray, skipped: np.ndarray, step: int,
+                searched: dict) -> np.ndarray:
+        result = np.full(len(ranks), -1, dtype=np.intp)
+        rows = np.arange(len(ranks))
+        current = ranks
+        while rows.size:
+            # bisect_left for the front and bisect_right - 1 for the back entry, like the lane queries
+            index = np.searchsorted(self.keys, LaneIndex.keys(current, distances[rows]),
+                                    side='left' if step > 0 else 'right')
+            if step < 0:
+                index -= 1
+            start, end = self.start[current], self.end[current]
+            while True:
+                inside = (index >= start) & (index < end)
+                hit = np.zeros(len(rows), dtype=bool)
+                hit[inside] = self._matches(index[inside], skipped[rows[inside]])
+                if not hit.any():
+                    break
+                index[hit] += step
+            result[rows[inside]] = index[inside]
+            # the same travelled distance is searched on the connected lane
+            next_rows, next_ranks = [], []
+            for row, rank in zip(rows[~inside].tolist(), current[~inside].tolist()):
+                lane = self.lanes[rank]
+                lane = lane.front_connection if step > 0 else lane.back_connection
+                if lane is None or self.ranks[lane] == ranks[row]:
+                    continue
+                searched.setdefault(row, []).append(lane)
+                next_rows.append(row)
+                next_ranks.append(self.ranks[lane])
+            rows = np.array(next_rows, dtype=np.intp)
+            current = np.array(next_ranks, dtype=np.intp)
+        return result
+
+    def _matches(self, index: np.ndarray, skipped: np.ndarray) -> np.ndarray:
+        if self.frenet:
+            return self.identities[index] == skipped
+        return np.all(self.positions[index] == skipped, axis=1)
@@ -0,0 +1,107 @@
+from simulation.vector2 import Vector2
+
+
+class LaneReservation:
+    """Occupancy record of a vehicle which is changing away from a lane.
+
+    A reservation is stored in the vehicle index of a lane like a vehicle, so the leader and follower queries
+    of 'Lane' see it without further checks. It is not an agent: speed, size and driver are the ones of
+    the changing vehicle and it is only moved along the lane and its front connections by 'advance'.
+    """
+
+    reservation = True  # type: bool  # marks entries of the vehicle index which are not vehicles
+
+    def __init__(self, vehicle, lane, travelled_distance: float):
+        """Reserve the spot of the given vehicle on the given lane.
+
+        :param vehicle: changing vehicle
+        :param lane: lane the vehicle leaves
+        :param travelled_distance: travelled distance of the reserved spot on the lane
+        """
+        self.vehicle = vehicle
+        self.id = vehicle.id
+        self.length = vehicle.length  # type: float
+        self.width = vehicle.width  # type: float
+        self.frenet = vehicle.frenet  # type: bool
+        self.lane = lane  # type: Lane
+        self.active = True  # type: bool
+        self.travelled_distance = travelled_distance  # type: float
+        self._position = None  # type: Vector2
+        self._orientation = 0.0  # type: float
+        lane.add_vehicle(self, travelled_distance)
+
+    @property
+    def velocity(self) -> float:
+        return self.vehicle.velocity
+
+    @property
+    def acceleration(self) -> float:
+        return self.vehicle.acceleration
+
+    @property
+    def max_velocity(self) -> float:
+        return self.vehicle.max_velocity
+
+    @property
+    def max_acceleration(self) -> float:
+        return self.vehicle.max_acceleration
+
+    @property
+    def driver(self):
+        return self.vehicle.driver
+
+    @property
+    def position(self) -> Vector2:
+        if self._position is None:
+            self._locate()
+        return self._position
+
+    @property
+    def orientation(self) -> float:
+        if self._position is None:
+            self._locate()
+        return self._orientation
+
+    def advance(self, distance: float) -> None:
+        """Move the reservation along the lane, it is released at the end of the last lane.
+
+        The reservation does not move into the vehicle in front of it.
+
+        :param distance: distance to move
+        :return: None
+        """
+        if not self.active:
+            return
+        travelled_distance = self.travelled_distance + distance
+        front = self.lane.find_front_vehicle_at(self.travelled_distance, self)
+        if front is not None:
+            limit = front.travelled_distance - (front.length + self.length) / 2.0
+            travelled_distance = max(self.travelled_distance, min(travelled_distance, limit))
+        lane = self.lane
+        while travelled_distance > lane.accumulated_distance[-1]:
+            if lane.front_connection is None:
+                self.release()
+                return
+            lane = lane.front_connection
+        self._position = None
+        if lane is self.lane:
+            lane.update_vehicle_distance(self, travelled_distance)
+        else:
+            self.lane.detach_vehicle(self)
+            self.lane = lane
+            lane.add_vehicle(self, travelled_distance)
+
+    def release(self) -> None:
+        """Remove the reservation from its lane."""
+        self.active = False
+        if self.lane is not None:
+            self.lane.detach_vehicle(self)
+        self.lane = None
+
+    def _locate(self) -> None:
+        lane, first = self.lane.locate(self.travelled_distance)
+        x, y = lane.tangents[first]
+        node = lane.center[first]
+        offset = self.travelled_distance - lane.accumulated_distance[first]
+        self._position = Vector2(node.x + offset * x, node.y + offset * y)
+        self._orientation = lane.headings[first]
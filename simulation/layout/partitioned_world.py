@@ -0,0 +1,331 @@
+import multiprocessing
+import random
+import sys
+from collections import deque
+from typing import Callable, Dict, List
+
+from simulation.vector2 import Vector2
+from simulation.layout.road import Road
+from simulation.layout.world import World
+
+
+def connected_roads(road: Road) -> List[Road]:
+    """All roads that are connected to the given road by a lane connection, in either direction."""
+    result = []
+    for lane in road.lanes:
+        for connection in (lane.front_connection, lane.back_connection):
+            if connection is not None and connection.road is not road and connection.road not in result:
+                result.append(connection.road)
+    return result
+
+
+def next_roads(road: Road, front: bool) -> List[Road]:
+    """Roads that are connected to the given road by a front or by a back lane connection."""
+    result = []
+    for lane in road.lanes:
+        connection = lane.front_connection if front else lane.back_connection
+        if connection is not None and connection.road is not road and connection.road not in result:
+            result.append(connection.road)
+    return result
+
+
+def road_length(road: Road) -> float:
+    distances = road.lanes[0].accumulated_distance
+    return distances[-1] - distances[0]
+
+
+def partition_roads(roads: List[Road], regions: int) -> List[int]:
+    """Split the road graph into the given number of regions.
+
+    Roads are ordered by a breadth first search over the lane connections, which keeps
+    connected roads next to each other, and the order is cut into chunks of about the same number of lane nodes.
+
+    :param roads: roads of a world
+    :param regions: number of regions
+    :return: region of each road
+    """
+    order = []
+    visited = set()
+    for start in roads:
+        if start in visited:
+            continue
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            road = queue.popleft()
+            order.append(road)
+            for other in connected_roads(road):
+                if other not in visited and other in roads:
+                    visited.add(other)
+                    queue.append(other)
+    weights = [sum(len(lane.center) for lane in road.lanes) for road in order]
+    total = float(sum(weights))
+    region_of = {}
+    accumulated = 0.0
+    for road, weight in zip(order, weights):
+        region_of[road] = min(regions - 1, int(regions * (accumulated + weight / 2.0) / total))
+        accumulated += weight
+    return [region_of[road] for road in roads]
+
+
+def halo_recipients(roads: List[Road], assignment: List[int], halo: float) -> List[List[tuple]]:
+    """Find the foreign regions that need to see vehicles of each road, and up to which distance from its ends.
+
+    A region sees a vehicle if one of its roads can be reached from the vehicle along lane connections
+    within 'halo' meters. Front and back connections are followed separately, like the leader and follower
+    queries of 'Lane' do.
+
+    :return: recipients per road as (region, back, front), vehicles less than 'back' meters behind the start
+             or less than 'front' meters before the end of the road are mirrored into the region.
+             The region of the road itself is excluded
+    """
+    index = {road: i for i, road in enumerate(roads)}
+    result = []
+    for i, road in enumerate(roads):
+        reach = {}  # type: Dict[int, List[float]]  # back and front reach per region
+        for direction, front in enumerate((False, True)):
+            best = {road: 0.0}
+            queue = deque([road])
+            while queue:
+                current = queue.popleft()
+                distance = best[current] + (0.0 if current is road else road_length(current))
+                for other in next_roads(current, front):
+                    if other not in index or distance >= halo or best.get(other, float('inf')) <= distance:
+                        continue
+                    best[other] = distance
+                    queue.append(other)
+                    region = assignment[index[other]]
+                    if region != assignment[i]:
+                        region_reach = reach.setdefault(region, [0.0, 0.0])
+                        region_reach[direction] = max(region_reach[direction], halo - distance)
+        result.append([(region, back, front) for region, (back, front) in reach.items()])
+    return result
+
+
+class PartitionedWorld:
+    """Step a large road network in parallel worker processes, one per region.
+
+    Every worker builds its own replica of the world with the given factory, so the factory has to
+    create roads and vehicles in a deterministic order. The road graph is partitioned into regions
+    (see 'partition_roads') and each worker only steps the vehicles on the roads of its region.
+    After every tick the workers exchange
+
+    * handoffs: vehicles that moved onto a road of another region change their owner,
+    * ghosts: vehicles within the halo distance of a region border, measured along the lane connections,
+      are mirrored as inactive vehicles into the lanes of the neighbouring regions,
+      so 'find_front_vehicle' and 'find_back_vehicle' see them,
+    * pool: the vehicle pool is kept here, every tick each region gets up to one random pool vehicle
+      per spawner and returns the vehicles it did not spawn together with the vehicles that despawned.
+
+    Ghosts are sent after every tick, so a vehicle is missed for one tick before the first exchange and by its
+    old region right after a handoff. Pending lane change events are dropped on handoff, so results are close to
+    but not identical with a single 'World'.
+    """
+
+    HALO = 150.0
+
+    def __init__(self, factory: Callable[..., World], regions: int, seed: int = 0, halo: float = HALO,
+                 factory_kwargs: dict = None):
+        """Partition the world created by the factory and start the workers.
+
+        :param factory: picklable function which creates the world
+        :param regions: number of regions and worker processes
+        :param seed: seed of the spawners and of the vehicle decisions in all regions
+        :param halo: distance in meters up to which vehicles are mirrored into neighbouring regions
+        :param factory_kwargs: keyword arguments for the factory
+        """
+        factory_kwargs = factory_kwargs or {}
+        self.world = factory(**factory_kwargs)  # type: World
+        self.regions = regions  # type: int
+        self.assignment = partition_roads(self.world.roads, regions)  # type: List[int]
+        recipients = halo_recipients(self.world.roads, self.assignment, halo)
+        rng = random.Random(seed)
+        spawner_seeds = [rng.randint(0, sys.maxsize) for _ in self.world.spawners]
+        vehicle_seeds = [rng.randint(0, sys.maxsize) for _ in range(regions)]
+        self.rng = random.Random(rng.randint(0, sys.maxsize))  # type: random.Random
+        self.pool = [self.world.vehicles.index(vehicle)
+                     for vehicle in self.world.context.vehicle_pool]  # type: List[int]
+        self.spawners = [0] * regions  # type: List[int]
+        for spawner in self.world.spawners:
+            self.spawners[self.assignment[self.world.roads.index(spawner.road)]] += 1
+        self.connections = []
+        self.processes = []
+        for region in range(regions):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_worker,
+                                              args=(child, factory, factory_kwargs, region, self.assignment,
+                                                    recipients, spawner_seeds, vehicle_seeds[region]),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self._inbox = [[] for _ in range(regions)]  # type: List[list]
+
+    def update(self, delta_time: float) -> None:
+        """Step all regions by one tick and route the messages between them."""
+        for region, inbox in enumerate(self._inbox):
+            for _ in range(min(self.spawners[region], len(self.pool))):
+                index = self.pool.pop(self.rng.randint(0, len(self.pool) - 1))
+                inbox.append(('pool', (index,)))
+        for connection, inbox in zip(self.connections, self._inbox):
+            connection.send(('update', delta_time, inbox))
+        self._inbox = [[] for _ in range(self.regions)]
+        for connection in self.connections:
+            for region, messages in connection.recv().items():
+                if region is None:
+                    self.pool.extend(messages)
+                else:
+                    self._inbox[region].extend(messages)
+
+    def vehicle_states(self) -> Dict[int, tuple]:
+        """Collect the state of all vehicles which are active in one of the regions.
+
+        :return: vehicle index in 'World.vehicles' -> state as created by 'vehicle_state'
+        """
+        result = {}
+        for connection in self.connections:
+            connection.send(('states',))
+        for connection in self.connections:
+            for state in connection.recv():
+                result[state[0]] = state
+        return result
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(('close',))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def vehicle_state(index: int, vehicle, road_index: int) -> tuple:
+    lane = vehicle.lane
+    target = vehicle.target
+    return (index, road_index, lane.road.lanes.index(lane), vehicle.position.x, vehicle.position.y,
+            vehicle.orientation, None if target is None else (target.x, target.y),
+            vehicle.velocity, vehicle.acceleration, vehicle.travelled_distance, vehicle.lateral_offset,
+            vehicle.lane_change_distance, vehicle.turn_signal, vehicle.change_permit)
+
+
+class _RegionWorker:
+    """Replica of the world inside a worker process, stepping the vehicles of one region."""
+
+    def __init__(self, world: World, region: int, assignment: List[int], recipients: List[List[int]],
+                 spawner_seeds: List[int], vehicle_seed: int):
+        self.world = world  # type: World
+        self.region = region  # type: int
+        self.region_of = {road: assignment[i] for i, road in enumerate(world.roads)}  # type: Dict[Road, int]
+        self.road_index = {road: i for i, road in enumerate(world.roads)}  # type: Dict[Road, int]
+        self.recipients = {road: recipients[i] for i, road in enumerate(world.roads)}  # type: Dict[Road, List[tuple]]
+        self.ghosts = []  # type: list
+        for spawner, seed in zip(world.spawners, spawner_seeds):
+            spawner.seed = seed
+            spawner.rng.seed(seed)
+        world.context.seed = vehicle_seed
+        world.context.rng.seed(vehicle_seed)
+        self.index = {vehicle: i for i, vehicle in enumerate(world.vehicles)}
+        world.spawners = [spawner for spawner in world.spawners if self.region_of[spawner.road] == region]
+        world.context.vehicle_pool.clear()  # the pool is kept by the 'PartitionedWorld'
+        for vehicle in world.active_vehicles():
+            if vehicle.lane is not None and self.region_of[vehicle.lane.road] != region:
+                self._release(vehicle)  # vehicles created active are stepped by the region of their road
+
+    def update(self, delta_time: float, inbox: list) -> Dict[int, list]:
+        self._apply(inbox)
+        self.world.update(delta_time)
+        return self._collect()
+
+    def states(self) -> List[tuple]:
+        return [vehicle_state(self.index[vehicle], vehicle, self.road_index[vehicle.lane.road])
+                for vehicle in self.world.vehicles if vehicle.active and vehicle.lane is not None]
+
+    def _apply(self, inbox: list) -> None:
+        for vehicle in self.ghosts:
+            if not vehicle.active and vehicle.lane is not None:
+                vehicle.lane.detach_vehicle(vehicle)
+                vehicle.lane = None
+        self.ghosts = []
+        vehicles = self.world.vehicles
+        for kind, state in inbox:
+            vehicle = vehicles[state[0]]
+            if kind == 'pool':
+                self.world.context.vehicle_pool.append(vehicle)
+            elif kind == 'handoff':
+                self._place(vehicle, state)
+                vehicle.active = True
+            else:
+                self._place(vehicle, state)
+                self.ghosts.append(vehicle)
+
+    def _place(self, vehicle, state: tuple) -> None:
+        (_, road, lane, x, y, orientation, target, velocity, acceleration, travelled_distance,
+         lateral_offset, lane_change_distance, turn_signal, change_permit) = state
+        lane = self.world.roads[road].lanes[lane]
+        vehicle.active = False
+        vehicle.events = []
+        vehicle.lane = lane
+        vehicle.position = Vector2(x, y)
+        vehicle.target = None if target is None else Vector2(target[0], target[1])
+        vehicle.orientation = orientation
+        vehicle.velocity = velocity
+        vehicle.acceleration = acceleration
+        vehicle.lateral_offset = lateral_offset
+        vehicle.lane_change_distance = lane_change_distance
+        vehicle.turn_signal = turn_signal
+        vehicle.change_permit = change_permit
+        if vehicle.frenet:
+            vehicle._world_state_dirty = True
+        lane.add_vehicle(vehicle, travelled_distance)
+
+    def _collect(self) -> Dict[int, list]:
+        pool = self.world.context.vehicle_pool
+        outbox = {None: [self.index[vehicle] for vehicle in pool]}
+        pool.clear()
+        for vehicle in self.world.active_vehicles():
+            if vehicle.lane is None:
+                continue
+            road = vehicle.lane.road
+            region = self.region_of[road]
+            if region != self.region:
+                state = vehicle_state(self.index[vehicle], vehicle, self.road_index[road])
+                outbox.setdefault(region, []).append(('handoff', state))
+                self._release(vehicle)
+                continue
+            state = None
+            lane = vehicle.lane
+            for recipient, back, front in self.recipients[road]:
+                if (vehicle.travelled_distance - lane.accumulated_distance[0] < back or
+                        lane.accumulated_distance[-1] - vehicle.travelled_distance < front):
+                    if state is None:
+                        state = vehicle_state(self.index[vehicle], vehicle, self.road_index[road])
+                    outbox.setdefault(recipient, []).append(('ghost', state))
+        return outbox
+
+    @staticmethod
+    def _release(vehicle) -> None:
+        vehicle.cancel_events()
+        vehicle.lane.detach_vehicle(vehicle)
+        vehicle.lane = None
+        vehicle.active = False
+
+
+def _run_worker(connection, factory, factory_kwargs, region, assignment, recipients, spawner_seeds, vehicle_seed):
+    worker = _RegionWorker(factory(**factory_kwargs), region, assignment, recipients, spawner_seeds, vehicle_seed)
+    while True:
+        message = connection.recv()
+        if message[0] == 'update':
+            connection.send(worker.update(message[1], message[2]))
+        elif message[0] == 'states':
+            connection.send(worker.states())
+        else:
+            break
+    connection.close()
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+from simulation.vector2 import Vector2
+
+
+class ProjectionCache:
+    """Size-bounded LRU cache for lane projection results.
+
+    Entries are keyed by the kind of lookup, the asking lane and the quantized position.
+    Results only depend on the static lane geometry, so entries stay valid across ticks
+    until the geometry changes (see 'Road.connect').
+    """
+
+    CAPACITY = 65536
+    QUANTUM = 1e-6
+
+    def __init__(self, capacity: int = CAPACITY, quantum: float = QUANTUM):
+        self.capacity = capacity  # type: int
+        self.quantum = quantum  # type: float
+        self.entries = OrderedDict()  # type: OrderedDict
+        self.hits = 0  # type: int
+        self.misses = 0  # type: int
+        self.lookups = {}  # type: {str: int}  # number of lookups per kind, only counted if 'count_lookups'
+        self.count_lookups = False  # type: bool  # enabled by 'TickProfiler'
+
+    def key(self, kind: str, lane, position: Vector2) -> tuple:
+        return kind, lane, round(position.x / self.quantum), round(position.y / self.quantum)
+
+    def get(self, key: tuple):
+        """Look up a cached result.
+
+        :param key: key created by 'key'
+        :return: cached result or None on a miss
+        """
+        if self.count_lookups:
+            self.lookups[key[0]] = self.lookups.get(key[0], 0) + 1
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value) -> None:
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.entries)
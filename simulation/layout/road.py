@@ -1,5 +1,6 @@
 from simulation.simulation_object import SimulationObject
 from simulation.vector2 import Vector2
+import simulation.vector_array as vector_array
 
 from simulation.layout.lane import Lane
 
@@ -20,9 +21,10 @@ class Road(SimulationObject):
         for node in reversed(self.lanes[-1].left):
             self.mesh.append(node)
 
-    def reset_hashes(self):
+    def set_projection_cache(self, cache):
+        """Let all lanes of this road share the given projection cache."""
         for lane in self.lanes:
-            lane.reset_hashes()
+            lane.projection_cache = cache
 
     def create_lanes(self, path, num_lanes):
         """Create lanes based on a single path, which represents the right most center(!) line
@@ -36,23 +38,20 @@ class Road(SimulationObject):
         """
         for i in range(num_lanes):
             self.lanes.append(Lane(self))
-        for i, node in enumerate(path):
-            if i == 0 or i == len(path)-1:
-                continue
-            pred = path[i - 1]
-            succ = path[i + 1]
-            direction = Road.calc_road_normal(pred, node, succ)
-            for j in range(num_lanes):
-                center = node + direction * Road.LANE_WIDTH * j
-                self.lanes[j].center.append(center)
-                left = center + direction * Road.LANE_WIDTH / 2.0
-                self.lanes[j].left.append(left)
-                right = center - direction * Road.LANE_WIDTH / 2.0
-                self.lanes[j].right.append(right)
+        self.set_projection_cache(self.lanes[0].projection_cache)
+        nodes = vector_array.to_array(path)
+        normals = vector_array.road_normals(nodes[:-2], nodes[1:-1], nodes[2:])
+        for j in range(num_lanes):
+            center = nodes[1:-1] + normals * Road.LANE_WIDTH * j
+            self.lanes[j].center.extend(vector_array.to_vectors(center))
+            self.lanes[j].left.extend(vector_array.to_vectors(center + normals * Road.LANE_WIDTH / 2.0))
+            self.lanes[j].right.extend(vector_array.to_vectors(center - normals * Road.LANE_WIDTH / 2.0))
         for i in range(num_lanes):
             self.lanes[i].init_accumulated_distances()
+            self.lanes[i].index_geometry()
             self.calc_neighboring_lanes(self.lanes[i])
-            self.lanes[i].set_up_hashes()
+            self.lanes[i].index_next_nodes()
+            self.lanes[i].index_nodes()
         self.create_lane_meshes()
 
     @staticmethod
@@ -121,7 +120,8 @@ class Road(SimulationObject):
 
     def connect(self, road, connections):
         """Connect this road with the given road according to the list of lane connections.
-        Update the lane meshes, accumulated distances and hashes afterwards.
+        Update the lane meshes, geometry, accumulated distances, next node tables and spatial grids afterwards.
+        Cached projections of both roads are dropped, since the lane geometry changed.
 
         :param road: road to connect to
         :param connections: list of lane connections
@@ -162,16 +162,29 @@ class Road(SimulationObject):
                 self.lanes[connection[0]].accumulated_distance[-1] + distance)
         self.create_lane_meshes()
         road.create_lane_meshes()
+        for lane in self.lanes + road.lanes:
+            lane.index_geometry()
         # perform the connection on a logical level
         for connection in connections:
             self.lanes[connection[0]].front_connection = road.lanes[connection[1]]
             road.lanes[connection[1]].back_connection = self.lanes[connection[0]]
-            self.lanes[connection[0]].set_up_hashes()
-            road.lanes[connection[1]].set_up_hashes()
+            if self.lanes[connection[0]] not in road.lanes[connection[1]].feeding_lanes:
+                road.lanes[connection[1]].feeding_lanes.append(self.lanes[connection[0]])
+            self.lanes[connection[0]].index_next_nodes()
+            road.lanes[connection[1]].index_next_nodes()
             Road.add_accumulated_distance(road.lanes[connection[1]], self.lanes[connection[0]].accumulated_distance[-1])
+        self.lanes[0].projection_cache.clear()
+        road.lanes[0].projection_cache.clear()
+        for connection in connections:
+            self.lanes[connection[0]].index_chain()
+            self.lanes[connection[0]].index_nodes()
+            road.lanes[connection[1]].index_nodes()
+        for lane in self.lanes:
+            lane.rebuild_vehicle_index()
 
     @staticmethod
     def add_accumulated_distance(lane, value):
         while lane is not None:
             lane.accumulated_distance = [x + value for x in lane.accumulated_distance]
+            lane.rebuild_vehicle_index()
             lane = lane.front_connection
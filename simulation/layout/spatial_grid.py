@@ -0,0 +1,128 @@
+import math
+
+from simulation.vector2 import Vector2
+
+
+class SpatialGrid:
+    """Uniform grid over 2D points for nearest neighbour queries.
+
+    Each entry is a point together with an arbitrary item. Entries can be grouped by an owner,
+    which allows to replace all entries of e.g. a lane after its geometry changed.
+    """
+
+    CELL_SIZE = 20.0
+
+    def __init__(self, cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size  # type: float
+        self.cells = {}  # type: {(int, int): [(Vector2, object)]}
+        self.owners = {}  # type: {object: [((int, int), (Vector2, object))]}
+        self.size = 0  # type: int
+        self.bounds = None  # type: (int, int, int, int)
+
+    def cell(self, x: float, y: float) -> (int, int):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, point: Vector2, item, owner=None) -> None:
+        self._add(self.cell(point.x, point.y), (point, item), owner)
+
+    def insert_box(self, xmin: float, ymin: float, xmax: float, ymax: float, item, owner=None) -> None:
+        """Insert an item into every cell overlapped by the given axis aligned box, e.g. a segment of a lane.
+
+        The entries store the center of the box as their point, so grids with boxes are meant for 'query',
+        'nearest' only sees the centers.
+        """
+        entry = Vector2((xmin + xmax) / 2.0, (ymin + ymax) / 2.0), item
+        x0, y0 = self.cell(xmin, ymin)
+        x1, y1 = self.cell(xmax, ymax)
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                self._add((i, j), entry, owner)
+
+    def _add(self, key: (int, int), entry: (Vector2, object), owner) -> None:
+        self.cells.setdefault(key, []).append(entry)
+        self.owners.setdefault(owner, []).append((key, entry))
+        self.size += 1
+        if self.bounds is None:
+            self.bounds = key[0], key[1], key[0], key[1]
+        else:
+            self.bounds = (min(self.bounds[0], key[0]), min(self.bounds[1], key[1]),
+                           max(self.bounds[2], key[0]), max(self.bounds[3], key[1]))
+
+    def query(self, xmin: float, ymin: float, xmax: float, ymax: float) -> list:
+        """Find the items of all cells overlapping the given axis aligned box.
+
+        :return: items without duplicates, in order of insertion within each cell
+        """
+        if self.bounds is None:
+            return []
+        x0, y0 = self.cell(xmin, ymin)
+        x1, y1 = self.cell(xmax, ymax)
+        x0, y0 = max(x0, self.bounds[0]), max(y0, self.bounds[1])
+        x1, y1 = min(x1, self.bounds[2]), min(y1, self.bounds[3])
+        result = []
+        seen = set()
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for _, item in self.cells.get((i, j), ()):
+                    if id(item) not in seen:
+                        seen.add(id(item))
+                        result.append(item)
+        return result
+
+    def remove_owner(self, owner) -> None:
+        """Remove all entries that were inserted for the given owner."""
+        for key, entry in self.owners.pop(owner, []):
+            cell = self.cells[key]
+            for i, other in enumerate(cell):
+                if other is entry:
+                    del cell[i]
+                    break
+            if not cell:
+                del self.cells[key]
+            self.size -= 1
+
+    def merge(self, other: 'SpatialGrid') -> None:
+        """Insert all entries of another grid into this grid, keeping their owners."""
+        for owner, entries in other.owners.items():
+            for _, (point, item) in entries:
+                self.insert(point, item, owner)
+
+    def nearest(self, position: Vector2, rank=None):
+        """Find the item closest to the given position using euclidean distance.
+
+        Cells are searched in rings around the position until no unvisited cell can contain a closer point.
+
+        :param position: query position
+        :param rank: optional function of an item, the item with the lowest rank wins on equal distances
+        :return: closest item or None if the grid is empty
+        """
+        if self.bounds is None:
+            return None
+        cx, cy = self.cell(position.x, position.y)
+        max_ring = max(cx - self.bounds[0], self.bounds[2] - cx, cy - self.bounds[1], self.bounds[3] - cy)
+        closest = None
+        dist = float("inf")
+        ring = 0
+        while ring <= max_ring:
+            for key in SpatialGrid._ring(cx, cy, ring):
+                for point, item in self.cells.get(key, ()):
+                    d = position.distance(point)
+                    if d < dist or (d == dist and rank is not None and rank(item) < rank(closest)):
+                        dist = d
+                        closest = item
+            if dist < ring * self.cell_size:
+                break
+            ring += 1
+        return closest
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield cx, cy
+            return
+        for i in range(cx - ring, cx + ring + 1):
+            yield i, cy - ring
+            yield i, cy + ring
+        for j in range(cy - ring + 1, cy + ring):
+            yield cx - ring, j
+            yield cx + ring, j
@@ -5,8 +5,6 @@ import logging
 
 class Spawner:
 
-    _vehicle_pool = []
-
     def __init__(self, road, lane=None, node=0, delay=0.0, seed=None):
         self.road = road
         self.lane = lane
@@ -19,6 +17,7 @@ class Spawner:
         self.logger = logging.getLogger('simulation.spawner.Spawner')
         self.logger.info('Seed for spawner: ' + str(self.seed))
         self.rng = random.Random(self.seed)
+        self.context = None  # type: SimulationContext  # set by 'World.add_spawner'
 
     def update(self, delta_time):
         self.timer += delta_time
@@ -26,15 +25,12 @@ class Spawner:
             if self._spawn_vehicle():
                 self.timer = 0.0
 
-    @staticmethod
-    def add_vehicle(vehicle):
-        Spawner._vehicle_pool.append(vehicle)
-
     def _spawn_vehicle(self):
-        if not Spawner._vehicle_pool:
+        vehicle_pool = self.context.vehicle_pool
+        if not vehicle_pool:
             return False
-        vehicle_index = self.rng.randint(0, len(Spawner._vehicle_pool) - 1)
-        vehicle = Spawner._vehicle_pool[vehicle_index]
+        vehicle_index = self.rng.randint(0, len(vehicle_pool) - 1)
+        vehicle = vehicle_pool[vehicle_index]
         lane_index = self.lane
         if lane_index is None:
             lane_index = self.rng.randint(0, len(self.road.lanes) - 1)
@@ -45,7 +41,7 @@ class Spawner:
         target_pos = lane.center[self.node + 1]
         Spawner._reinit_vehicle(lane, vehicle, start_pos, target_pos)
         lane.add_vehicle(vehicle)
-        Spawner._vehicle_pool.remove(vehicle)
+        vehicle_pool.remove(vehicle)
         return True
 
     def _check_spawn_area(self, vehicle, lane):
@@ -73,4 +69,7 @@ class Spawner:
         vehicle.velocity = 0
         vehicle.acceleration = 0
         vehicle.lane = lane
+        vehicle.lateral_offset = 0.0
+        vehicle.lane_change_distance = 0.0
         vehicle.turn_signal = 0
+        vehicle.change_permit = False
@@ -0,0 +1,101 @@
+import csv
+import json
+from typing import Dict, List
+
+
+class TickProfiler:
+    """Collects per tick statistics of 'World.update'.
+
+    Records the wall time of every update phase, the number of closest node and closest segment
+    (projection) lookups, the projection cache hit rate and the number of active vehicles.
+    Records can optionally be streamed to a CSV or JSON-lines file, chosen by the file extension.
+    """
+
+    PHASES = ('idm', 'integration', 'lane', 'mobil', 'events', 'spawners')
+
+    def __init__(self, path: str = None, keep: int = 1):
+        """Create a profiler.
+
+        :param path: file to stream the records to, '.jsonl' for JSON lines, CSV otherwise. Nothing is written if None
+        :param keep: number of recent records kept in 'records'
+        """
+        self.path = path  # type: str
+        self.keep = keep  # type: int
+        self.ticks = 0  # type: int
+        self.phase_time = {phase: 0.0 for phase in TickProfiler.PHASES}  # type: Dict[str, float]
+        self.records = []  # type: List[dict]
+        self._current = None  # type: dict
+        self._cache_state = None  # type: tuple
+        self._count_lookups = False  # type: bool  # 'count_lookups' of the cache before the current tick
+        self._file = None
+        self._writer = None
+        if path is not None:
+            self._file = open(path, 'w', newline='')
+            if not path.endswith('.jsonl'):
+                self._writer = csv.DictWriter(self._file, fieldnames=TickProfiler.fields())
+
+    @staticmethod
+    def fields() -> List[str]:
+        return (['tick', 'total'] + list(TickProfiler.PHASES) +
+                ['node_lookups', 'segment_lookups', 'cache_hits', 'cache_misses', 'cache_hit_rate', 'active_vehicles'])
+
+    def begin_tick(self, world) -> None:
+        cache = world.projection_cache
+        self._count_lookups = cache.count_lookups
+        cache.count_lookups = True
+        self._cache_state = (cache.lookups.get('node', 0), cache.lookups.get('segment', 0), cache.hits, cache.misses)
+        self._current = {'tick': self.ticks}
+
+    def record(self, phase: str, seconds: float) -> None:
+        self._current[phase] = seconds
+        self.phase_time[phase] += seconds
+
+    def end_tick(self, world) -> dict:
+        """Finish the record of the current tick.
+
+        :return: the record
+        """
+        cache = world.projection_cache
+        cache.count_lookups = self._count_lookups
+        nodes, segments, hits, misses = self._cache_state
+        record = self._current
+        record['total'] = sum(record[phase] for phase in TickProfiler.PHASES)
+        record['node_lookups'] = cache.lookups.get('node', 0) - nodes
+        record['segment_lookups'] = cache.lookups.get('segment', 0) - segments
+        record['cache_hits'] = cache.hits - hits
+        record['cache_misses'] = cache.misses - misses
+        lookups = record['cache_hits'] + record['cache_misses']
+        record['cache_hit_rate'] = record['cache_hits'] / lookups if lookups else 0.0
+        record['active_vehicles'] = len(world.context.vehicle_pool.active)
+        self.ticks += 1
+        self.records.append(record)
+        if len(self.records) > self.keep:
+            del self.records[0]
+        if self._file is not None:
+            if self._writer is None:
+                self._file.write(json.dumps(record) + '\n')
+            else:
+                if self.ticks == 1:
+                    self._writer.writeheader()
+                self._writer.writerow(record)
+        return record
+
+    @property
+    def last(self) -> dict:
+        """Record of the last tick or None."""
+        return self.records[-1] if self.records else None
+
+    def summary(self) -> Dict[str, float]:
+        """Mean wall time per tick and phase in milliseconds, and the overall ticks per second."""
+        result = {phase: 1000.0 * seconds / self.ticks if self.ticks else 0.0
+                  for phase, seconds in self.phase_time.items()}
+        total = sum(self.phase_time.values())
+        result['total'] = 1000.0 * total / self.ticks if self.ticks else 0.0
+        result['ticks_per_second'] = self.ticks / total if total > 0 else 0.0
+        return result
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
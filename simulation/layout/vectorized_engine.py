@@ -0,0 +1,549 @@
+import logging
+
+import numpy as np
+
+import simulation.vector_array as vector_array
+from simulation.agent.vehicle_types import Vehicle  # import through vehicle_types to resolve the events cycle
+from simulation.layout.lane import Lane
+from simulation.layout.lane_index import LaneIndex
+
+
+class VectorizedEngine:
+    """Structure-of-arrays vehicle state for batched driver models and kinematic integration.
+
+    Vehicles that use the default 'Vehicle' update methods and a driver model with a batched kernel
+    (see 'Driver.decide_accelerations') get a slot in contiguous arrays. Slots are grouped by driver model,
+    so each model is evaluated with one kernel call per tick. All other vehicles (e.g. obstacles) are kept on the per-object path.
+    Neighbours are found in one 'LaneIndex' over the vehicle indices of all lanes. The vehicle objects stay the
+    owners of the dynamic state, so the engine gathers it once per phase and writes the results back.
+    In frenet mode only the travelled distances are integrated and written back into the sorted lane indices,
+    world positions are derived on demand.
+    The engine only pays off in frenet mode with a few hundred vehicles or more, see the documentation.
+    """
+
+    def __init__(self, capacity: int = 64, frenet: bool = False):
+        self.frenet = frenet  # type: bool
+        self.vehicles = []  # type: [Vehicle]
+        self.slots = {}  # type: {Vehicle: int}
+        self.unmanaged = []  # type: [Vehicle]
+        self.capacity = 0  # type: int
+        self.logger = logging.getLogger('simulation.layout.VectorizedEngine')
+        # dynamic state
+        self.position = None  # type: np.ndarray
+        self.orientation = None  # type: np.ndarray
+        self.velocity = None  # type: np.ndarray
+        self.acceleration = None  # type: np.ndarray
+        # static vehicle parameters
+        self.max_velocity = None  # type: np.ndarray
+        self.max_acceleration = None  # type: np.ndarray
+        self.length = None  # type: np.ndarray
+        # driver model as index into 'models' and its parameters ('Driver.PARAMETERS') per slot
+        self.models = []  # type: [type]
+        self.model_ids = None  # type: np.ndarray
+        self.parameters = {}  # type: {str: np.ndarray}
+        self._index = None  # type: LaneIndex  # index of the latest 'update_idm'
+        self._resize(capacity)
+
+    @staticmethod
+    def supports(vehicle: Vehicle) -> bool:
+        """Check whether the given vehicle can be stepped by the batched kernels."""
+        cls = type(vehicle)
+        return (cls.update_idm is Vehicle.update_idm and
+                cls.update_vehicle is Vehicle.update_vehicle and
+                type(vehicle.driver).batched())
+
+    def add_vehicle(self, vehicle: Vehicle) -> bool:
+        """Register a vehicle with the engine.
+
+        :param vehicle: vehicle to register
+        :return: 'True' if the vehicle got a slot, 'False' if it stays on the per-object path
+        """
+        if not VectorizedEngine.supports(vehicle):
+            self.unmanaged.append(vehicle)
+            return False
+        slot = len(self.vehicles)
+        if slot >= self.capacity:
+            self._resize(max(1, 2 * self.capacity))
+        self.vehicles.append(vehicle)
+        self.slots[vehicle] = slot
+        self.sync_parameters(slot)
+        return True
+
+    def sync_parameters(self, slot: int = None) -> None:
+        """Copy the static vehicle and driver parameters into the arrays.
+
+        Call this after changing parameters of registered vehicles.
+
+        :param slot: slot to update, all slots if None
+        :return: None
+        """
+        slots = range(len(self.vehicles)) if slot is None else [slot]
+        for i in slots:
+            vehicle = self.vehicles[i]
+            self.max_velocity[i] = vehicle.max_velocity
+            self.max_acceleration[i] = vehicle.max_acceleration
+            self.length[i] = vehicle.length
+            model = type(vehicle.driver)
+            if model not in self.models:
+                self.models.append(model)
+            self.model_ids[i] = self.models.index(model)
+            for name in model.PARAMETERS:
+                if name not in self.parameters:
+                    self.parameters[name] = np.zeros(self.capacity)
+                self.parameters[name][i] = getattr(vehicle.driver, name)
+
+    def reserve(self, capacity: int) -> None:
+        """Preallocate the arrays for the given number of slots."""
+        if capacity > self.capacity:
+            self._resize(capacity)
+
+    def update_idm(self, vehicles: [Vehicle] = None) -> None:
+        """Batched equivalent of 'Vehicle.update_idm' for all active slots.
+
+        The front vehicles of all slots are found with one 'LaneIndex' query. In frenet mode the gaps are computed
+        from the travelled distances in the index, otherwise from the lane projections of 'Vehicle.observe_front'.
+
+        :param vehicles: active vehicles of the world, all registered vehicles are checked if None
+        :return: None
+        """
+        slots, vehicles = self._active_slots(vehicles)
+        if not vehicles:
+            return
+        self.velocity[slots] = [vehicle.velocity for vehicle in vehicles]
+        if self.frenet:
+            # vehicles are entries of the index of their own lane, their fronts follow them in the index
+            index = self._index = LaneIndex([vehicle.lane for vehicle in vehicles], frenet=True)
+            entries = index.entry_indices(vehicles)
+            distances = index.distances[entries]
+            front = index.successors(entries)
+        else:
+            lanes, distances = self._queries(vehicles, [vehicle.lane for vehicle in vehicles])
+            index = LaneIndex(lanes)
+            front = index.fronts(lanes, distances, vehicles)
+        has_front = front >= 0
+        if self.frenet:
+            found = np.where(has_front, front, 0)
+            # same steps as 'Vehicle.frenet_bumper_distance' and 'Vehicle.frenet_approaching_velocity'
+            bumper_distance = np.where(has_front, np.abs(distances - index.distances[found]) -
+                                       self.length[slots] / 2.0 - index.lengths[found] / 2.0, 0.0)
+            approach_velocity = np.where(has_front, self.velocity[slots] - index.velocities[found], 0.0)
+        else:
+            bumper_distance = np.zeros(len(vehicles))
+            approach_velocity = np.zeros(len(vehicles))
+            projections = _Projections(vehicles)
+            for i in np.flatnonzero(has_front).tolist():
+                vehicle = vehicles[i]
+                other = index.entries[front[i]]
+                bumper_distance[i] = projections.bumper_distance(vehicle.lane, vehicle, other)
+                approach_velocity[i] = projections.approaching_velocity(vehicle.lane, vehicle, other)
+        for i in np.flatnonzero(has_front & (bumper_distance <= 0)).tolist():
+            other = index.entries[front[i]]
+            self.logger.error('Negative bumper distance occured: %s%s - %s%s distance: %s', vehicles[i].id,
+                              vehicles[i].position, other.id, other.position, bumper_distance[i])
+        acceleration = self.decide_accelerations(slots, has_front, bumper_distance, approach_velocity)
+        acceleration[has_front & (bumper_distance <= 0)] = 0.0  # like in 'Vehicle.apply_idm'
+        self.acceleration[slots] = np.minimum(self.max_acceleration[slots], acceleration)
+        for vehicle, value in zip(vehicles, self.acceleration[slots].tolist()):
+            vehicle.acceleration = value
+
+    def _queries(self, vehicles: [Vehicle], lanes: list) -> (list, np.ndarray):
+        """Lanes and travelled distances at which the lane queries of the given vehicles on the given lanes search.
+
+        In frenet mode these are the lanes and the travelled distances mapped onto them, otherwise
+        the closest lanes and the projected travelled distances, like in 'Lane.find_front_vehicle'.
+        """
+        result, distances = [], []
+        for vehicle, lane in zip(vehicles, lanes):
+            if self.frenet:
+                distance = vehicle.travelled_distance
+                if lane is not vehicle.lane:
+                    distance = vehicle.lane.map_distance(distance, lane)
+            else:
+                _, lane = lane.find_closest_node(vehicle.position)
+                distance = lane.projected_travelled_distance(vehicle.position)
+            result.append(lane)
+            distances.append(distance)
+        return result, np.array(distances, dtype=float)
+
+    def decide_accelerations(self, slots: np.ndarray, has_front: np.ndarray,
+                             bumper_distance: np.ndarray, approach_velocity: np.ndarray) -> np.ndarray:
+        """Evaluate the driver models of the given slots with one kernel call per model.
+
+        :return: acceleration per slot like 'Driver.decide_acceleration'
+        """
+        velocity = self.velocity[slots]
+        model_ids = self.model_ids[slots]
+        acceleration = np.empty(len(slots))
+        for model_id in np.unique(model_ids).tolist():
+            model = self.models[model_id]
+            group = model_ids == model_id
+            group_slots = slots[group]
+            acceleration[group] = model.decide_accelerations(
+                {name: self.parameters[name][group_slots] for name in model.PARAMETERS},
+                velocity[group], self.max_velocity[group_slots], self.max_acceleration[group_slots],
+                has_front[group], bumper_distance[group], approach_velocity[group])
+        return acceleration
+
+    def update_vehicles(self, delta_time: float, vehicles: [Vehicle] = None) -> None:
+        """Batched equivalent of 'Vehicle.update_vehicle' for all active slots.
+
+        Vehicles which passed their target are fixed on the per-object path afterwards.
+
+        :param delta_time: time step
+        :param vehicles: active vehicles of the world, all registered vehicles are checked if None
+        :return: None
+        """
+        slots, vehicles = self._active_slots(vehicles)
+        if not vehicles:
+            return
+        if self.frenet:
+            self._update_frenet_vehicles(slots, vehicles, delta_time)
+            return
+        self.position[slots] = [(vehicle.position.x, vehicle.position.y) for vehicle in vehicles]
+        targets = np.array([(vehicle.target.x, vehicle.target.y) for vehicle in vehicles])
+        self.orientation[slots] = [vehicle.orientation for vehicle in vehicles]
+        self.velocity[slots] = np.minimum(self.max_velocity[slots],
+                                          np.maximum(0.0, self.velocity[slots] + delta_time * self.acceleration[slots]))
+        heading = vector_array.rotate(vector_array.UP, self.orientation[slots])
+        position = self.position[slots] + heading * (delta_time * self.velocity[slots])[:, None]
+        self.position[slots] = position
+        # same steps as the scalar target check in 'Vehicle.update_vehicle'
+        with np.errstate(divide='ignore', invalid='ignore'):
+            direction = vector_array.normalize(position - targets)
+        passed = np.abs(vector_array.angle(direction) - self.orientation[slots]) < Lane.EPSILON
+        for vehicle, (x, y), velocity in zip(vehicles, position.tolist(), self.velocity[slots].tolist()):
+            vehicle.position.x, vehicle.position.y = x, y
+            vehicle.velocity = velocity
+        for i in np.flatnonzero(passed):
+            vehicles[i].lane.fix_vehicle_position(vehicles[i])
+        for vehicle in vehicles:
+            if vehicle.lane is not None:
+                vehicle.lane.update_vehicle_distance(vehicle)
+
+    @staticmethod
+    def supports_mobil(vehicle: Vehicle) -> bool:
+        """Check whether the MOBIL evaluation of the given vehicle can be batched."""
+        cls = type(vehicle)
+        return (cls.update_mobil is Vehicle.update_mobil and
+                cls.apply_mobil is Vehicle.apply_mobil and
+                cls.observe_mobil is Vehicle.observe_mobil and
+                cls.mobil_incentive is Vehicle.mobil_incentive)
+
+    def update_mobil(self, vehicles: [Vehicle]) -> None:
+        """Batched equivalent of 'Vehicle.update_mobil' for the given vehicles, in their order.
+
+        The incentives of all candidate lanes are evaluated in one batch and the decisions are applied in order.
+        A lane change moves a vehicle between two lane indices, so the later vehicles which observed it, or whose
+        observed gap on one of both lanes it entered, are evaluated again before their decision is applied.
+        This keeps the results identical to the scalar path.
+
+        :param vehicles: active vehicles of the world
+        :return: None
+        """
+        decisions, observed = self._evaluate_mobil(vehicles)
+        stale = set()
+        for k, vehicle in enumerate(vehicles):
+            if not vehicle.active:
+                continue
+            if k in stale:
+                renewed = sorted(stale)
+                stale.clear()
+                renewed_decisions, renewed_observed = self._evaluate_mobil([vehicles[j] for j in renewed])
+                for j, decision in zip(renewed, renewed_decisions):
+                    decisions[j] = decision
+                keep = ~np.isin(observed['owner'], renewed)
+                renewed_observed['owner'] = np.array(renewed, dtype=np.intp)[renewed_observed['owner']]
+                observed = {name: np.concatenate((values[keep], renewed_observed[name]))
+                            for name, values in observed.items()}
+            lane, distance = vehicle.lane, vehicle.travelled_distance
+            if decisions[k] is None:
+                vehicle.update_mobil()
+            else:
+                vehicle.decide_lane_change(*decisions[k])
+            if vehicle.lane is lane:
+                continue
+            # the vehicle left its lane, possibly leaving a reservation at its spot, and entered the new lane
+            hit = (observed['back_id'] == id(vehicle)) | (observed['front_id'] == id(vehicle))
+            for changed, changed_distance in ((lane, distance), (vehicle.lane, vehicle.travelled_distance)):
+                hit |= ((observed['lane_id'] == id(changed)) & (observed['back'] <= changed_distance) &
+                        (changed_distance <= observed['front']))
+            stale.update(observed['owner'][hit & (observed['owner'] > k)].tolist())
+
+    def evaluate_mobil(self, vehicles: [Vehicle]) -> list:
+        """Evaluate MOBIL for all neighboring lanes of the given vehicles at once, see 'Vehicle.apply_mobil'.
+
+        :param vehicles: vehicles to evaluate
+        :return: best incentive and lane per vehicle like in 'Vehicle.update_mobil',
+                 None for vehicles that are not evaluated in the batch
+        """
+        return self._evaluate_mobil(vehicles)[0]
+
+    def _evaluate_mobil(self, vehicles: [Vehicle]) -> (list, dict):
+        """Evaluate MOBIL like 'evaluate_mobil' and report what the decisions depend on.
+
+        The neighbours on the own lane and on every candidate lane are found with one 'LaneIndex' query
+        for all vehicles, the accelerations of all pairs of 'Vehicle.apply_mobil' with one kernel call per model.
+
+        :return: decisions and the observed gaps, one row per searched lane with the position of the observing
+                 vehicle ('owner'), the lane ('lane_id'), the travelled distances of the back and front
+                 neighbour on it ('back', 'front', infinite if not found on it) and their identities
+        """
+        result = [None] * len(vehicles)
+        egos = [k for k, vehicle in enumerate(vehicles)
+                if vehicle.active and VectorizedEngine.supports_mobil(vehicle) and vehicle.considers_lane_change()]
+        rows = [(k, lane) for k in egos for lane in vehicles[k].lane.neighboring_lanes]
+        for k in egos:
+            result[k] = (0.0, None)
+        if not rows:
+            return result, {name: np.empty(0, dtype=dtype) for name, dtype in VectorizedEngine.OBSERVED}
+        # one query on the own lane per ego, followed by one query per candidate lane
+        owners = egos + [k for k, _ in rows]
+        lanes, distances = self._queries([vehicles[k] for k in owners],
+                                         [vehicles[k].lane for k in egos] + [lane for _, lane in rows])
+        index = LaneIndex(lanes, self.frenet)
+        back, front, searched = index.neighbors(lanes, distances, [vehicles[k] for k in owners])
+        own = np.repeat(np.arange(len(egos)), [len(vehicles[k].lane.neighboring_lanes) for k in egos])
+        neighbors = np.stack((back[own], front[own], back[len(egos):], front[len(egos):]))
+        mapped = distances[len(egos):]
+        egos = [vehicles[k] for k, _ in rows]
+        if self.frenet:
+            bumper_distance, approach_velocity = self._frenet_mobil_gaps(index, egos, mapped, neighbors)
+        else:
+            bumper_distance, approach_velocity = self._mobil_gaps(index, egos, [lane for _, lane in rows], neighbors)
+        acceleration = self._pair_accelerations(index, egos, neighbors, bumper_distance,
+                                                approach_velocity).reshape(6, -1)
+        permit = np.array([vehicle.change_permit for vehicle in egos], dtype=bool)
+        b_safe = np.array([vehicle.driver.b_safe for vehicle in egos], dtype=float)
+        politeness = np.array([vehicle.driver.politeness for vehicle in egos], dtype=float)
+        thresh = np.array([vehicle.driver.thresh for vehicle in egos], dtype=float)
+        lane_threshold = np.array([lane.lane_change_threshold for _, lane in rows], dtype=float)
+        # same steps as 'Vehicle.mobil_incentive'
+        b_safe = np.where(permit, b_safe * 4.0, b_safe)
+        politeness = np.where(permit, politeness / 5.0, politeness)
+        thresh = np.where(permit, 0.0, thresh)
+        acc_e, acc_e_change, acc_b, acc_b_change, acc_bc, acc_bc_change = acceleration
+        with np.errstate(invalid='ignore'):
+            value = ((acc_e_change - acc_e) - politeness * (acc_b + acc_bc - acc_b_change - acc_bc_change) -
+                     (thresh + lane_threshold))
+        value[acc_bc_change < -b_safe] = -float('infinity')
+        for (k, lane), change_value in zip(rows, value.tolist()):
+            best, _ = result[k]
+            if best < change_value < float('infinity'):
+                result[k] = (change_value, lane)
+        return result, VectorizedEngine._observed(index, owners, lanes, back, front, searched)
+
+    # columns of the observed gaps of '_evaluate_mobil'
+    OBSERVED = (('owner', np.intp), ('lane_id', np.int64), ('back', float), ('front', float),
+                ('back_id', np.int64), ('front_id', np.int64))
+
+    @staticmethod
+    def _observed(index: LaneIndex, owners: list, lanes: list, back: np.ndarray, front: np.ndarray,
+                  searched: dict) -> dict:
+        ranks = np.array([index.ranks[lane] for lane in lanes], dtype=np.intp)
+        identities = np.array([id(entry) for entry in index.entries] + [0], dtype=np.int64)  # -1 is no entry
+        observed = {'owner': np.array(owners, dtype=np.intp),
+                    'lane_id': np.array([id(lane) for lane in lanes], dtype=np.int64),
+                    'back_id': identities[back], 'front_id': identities[front]}
+        for name, found, missing in (('back', back, -float('inf')), ('front', front, float('inf'))):
+            # a neighbour on a connected lane bounds nothing on the own lane
+            on_lane = (found >= 0) & (index.entry_ranks[found] == ranks)
+            observed[name] = np.where(on_lane, index.distances[found], missing)
+        # any change on the connected lanes which were searched changes the result
+        queries = sorted(searched)
+        searched_lanes = [searched[i] for i in queries]
+        counts = [len(other) for other in searched_lanes]
+        extra = {'owner': np.repeat(observed['owner'][queries], counts).astype(np.intp),
+                 'lane_id': np.array([id(lane) for other in searched_lanes for lane in other], dtype=np.int64),
+                 'back': np.full(sum(counts), -float('inf')), 'front': np.full(sum(counts), float('inf')),
+                 'back_id': np.zeros(sum(counts), dtype=np.int64), 'front_id': np.zeros(sum(counts), dtype=np.int64)}
+        return {name: np.concatenate((observed[name], extra[name])) for name, _ in VectorizedEngine.OBSERVED}
+
+    @staticmethod
+    def _frenet_mobil_gaps(index: LaneIndex, egos: [Vehicle], mapped: np.ndarray,
+                           neighbors: np.ndarray) -> (np.ndarray, np.ndarray):
+        """Frenet bumper distances and approaching velocities of 'Vehicle.observe_mobil'.
+
+        :param egos: ego per candidate lane
+        :param mapped: travelled distance of the ego on the candidate lane
+        :param neighbors: entry indices of back, front, back_c and front_c per candidate lane
+        :return: bumper distances and approaching velocities of the pairs ef, efc, be, bf, bcfc, bce,
+                 NaN for missing vehicles
+        """
+        missing = neighbors < 0
+        distance = np.where(missing, np.nan, index.distances[neighbors])
+        length = np.where(missing, np.nan, index.lengths[neighbors])
+        velocity = np.where(missing, np.nan, index.velocities[neighbors])
+        ego_distance = np.array([ego.travelled_distance for ego in egos], dtype=float)
+        ego_length = np.array([ego.length for ego in egos], dtype=float)
+        ego_velocity = np.array([ego.velocity for ego in egos], dtype=float)
+        (d_b, d_f, d_bc, d_fc), (l_b, l_f, l_bc, l_fc), (v_b, v_f, v_bc, v_fc) = distance, length, velocity
+        # same steps as 'Vehicle.frenet_bumper_distance' and 'Vehicle.frenet_approaching_velocity'
+        bumper_distance = (np.abs(ego_distance - d_f) - ego_length / 2.0 - l_f / 2.0,
+                           np.abs(mapped - d_fc) - ego_length / 2.0 - l_fc / 2.0,
+                           np.abs(d_b - ego_distance) - l_b / 2.0 - ego_length / 2.0,
+                           np.abs(d_b - d_f) - l_b / 2.0 - l_f / 2.0,
+                           np.abs(d_bc - d_fc) - l_bc / 2.0 - l_fc / 2.0,
+                           np.abs(d_bc - mapped) - l_bc / 2.0 - ego_length / 2.0)
+        approach_velocity = (ego_velocity - v_f, ego_velocity - v_fc, v_b - ego_velocity, v_b - v_f,
+                             v_bc - v_fc, v_bc - ego_velocity)
+        return np.concatenate(bumper_distance), np.concatenate(approach_velocity)
+
+    @staticmethod
+    def _mobil_gaps(index: LaneIndex, egos: [Vehicle], lanes: list,
+                    neighbors: np.ndarray) -> (np.ndarray, np.ndarray):
+        """Projected bumper distances and approaching velocities of 'Vehicle.observe_mobil'.
+
+        Each projection is computed once per batch, see '_Projections'.
+
+        :param egos: ego per candidate lane
+        :param lanes: candidate lanes
+        :param neighbors: entry indices of back, front, back_c and front_c per candidate lane
+        :return: like '_frenet_mobil_gaps'
+        """
+        projections = _Projections(egos)
+        back, front, back_c, front_c = ([None if i < 0 else index.entries[i] for i in role.tolist()]
+                                        for role in neighbors)
+        bumper_distance = [[] for _ in range(6)]
+        approach_velocity = [[] for _ in range(6)]
+        for row, (ego, lane) in enumerate(zip(egos, lanes)):
+            own = ego.lane
+            pairs = ((ego, front[row], own), (ego, front_c[row], lane), (back[row], ego, own),
+                     (back[row], front[row], own), (back_c[row], front_c[row], lane), (back_c[row], ego, lane))
+            for pair, (v1, v2, projected) in enumerate(pairs):
+                if v1 is None or v2 is None:
+                    bumper_distance[pair].append(np.nan)
+                    approach_velocity[pair].append(np.nan)
+                    continue
+                bumper_distance[pair].append(projections.bumper_distance(projected, v1, v2))
+                approach_velocity[pair].append(projections.approaching_velocity(own, v1, v2))
+        return np.concatenate(bumper_distance), np.concatenate(approach_velocity)
+
+    def _pair_accelerations(self, index: LaneIndex, egos: [Vehicle], neighbors: np.ndarray,
+                            bumper_distance: np.ndarray, approach_velocity: np.ndarray) -> np.ndarray:
+        """Accelerations of the pairs ef, efc, be, bf, bcfc, bce of 'Vehicle.apply_mobil', 0 without deciding vehicle.
+
+        Deciding vehicles with a slot are evaluated by the batched kernels, the others per object.
+        """
+        count = len(egos)
+        back, front, back_c, front_c = neighbors
+        none = np.full(count, -1, dtype=np.intp)
+        # entry index of the deciding and the front vehicle per pair, -2 for the ego
+        ego = np.full(count, -2, dtype=np.intp)
+        deciding = np.concatenate((ego, ego, back, back, back_c, back_c))
+        fronts = np.concatenate((front, front_c, ego, front, front_c, ego))
+        # slot of the deciding vehicle, reservations are driven like their vehicle
+        entry_slots = np.array([self.slots.get(getattr(entry, 'vehicle', entry), -1) for entry in index.entries] +
+                               [-1, -1], dtype=np.intp)
+        ego_slots = np.array([self.slots.get(vehicle, -1) for vehicle in egos], dtype=np.intp)
+        slots = np.where(deciding == -2, np.tile(ego_slots, 6), entry_slots[deciding])
+        has_front = fronts != -1
+        present = deciding != -1
+        acceleration = np.zeros(6 * count)
+        batched = present & (slots >= 0)
+        if np.any(batched):
+            acceleration[batched] = self.decide_accelerations(
+                slots[batched], has_front[batched], np.where(has_front, bumper_distance, 0.0)[batched],
+                np.where(has_front, approach_velocity, 0.0)[batched])
+        for i in np.flatnonzero(present & (slots < 0)).tolist():
+            row = i % count
+            vehicle = egos[row] if deciding[i] == -2 else index.entries[deciding[i]]
+            other = None if fronts[i] == -1 else egos[row] if fronts[i] == -2 else index.entries[fronts[i]]
+            if other is None:
+                acceleration[i] = vehicle.driver.decide_acceleration(vehicle, None, None, None)
+            else:
+                acceleration[i] = vehicle.driver.decide_acceleration(vehicle, other, bumper_distance[i],
+                                                                     approach_velocity[i])
+        return acceleration
+
+    def _update_frenet_vehicles(self, slots: np.ndarray, vehicles: [Vehicle], delta_time: float) -> None:
+        """Advance the travelled distances of the given slots like 'Vehicle.move_along_lane'.
+
+        Vehicles which stay on their lane are moved at once and the vehicle indices of their lanes are
+        written back sorted ('LaneIndex.store'). Vehicles which change lanes or leave their lane move per object.
+        """
+        self.velocity[slots] = np.minimum(self.max_velocity[slots],
+                                          np.maximum(0.0, self.velocity[slots] + delta_time * self.acceleration[slots]))
+        step = delta_time * self.velocity[slots]
+        lanes = [vehicle.lane for vehicle in vehicles]
+        distance = np.array([vehicle.travelled_distance for vehicle in vehicles], dtype=float) + step
+        ends = np.array([lane.accumulated_distance[-1] for lane in lanes], dtype=float)
+        changing = np.array([vehicle.lane_change_distance > 0.0 for vehicle in vehicles], dtype=bool)
+        moved = (distance <= ends) & ~changing
+        # the index of the IDM phase is reused if no vehicle was added, removed or moved since
+        index = self._index
+        if index is None or not all(lane in index.ranks for lane in lanes) or not index.current():
+            index = LaneIndex(lanes, frenet=True)
+        distances = index.distances.copy()
+        distances[index.entry_indices(vehicles)[moved]] = distance[moved]
+        index.store(distances)
+        for vehicle, velocity, travelled_distance, stays, vehicle_step in zip(
+                vehicles, self.velocity[slots].tolist(), distance.tolist(), moved.tolist(), step.tolist()):
+            vehicle.velocity = velocity
+            if stays:
+                vehicle.travelled_distance = travelled_distance
+                vehicle._world_state_dirty = True
+            else:
+                vehicle.move_along_lane(vehicle_step)
+
+    def _active_slots(self, vehicles: [Vehicle] = None):
+        if vehicles is None:
+            vehicles = [vehicle for vehicle in self.vehicles if vehicle.active]
+            if len(vehicles) == len(self.vehicles):
+                return np.arange(len(vehicles)), vehicles
+        else:
+            vehicles = [vehicle for vehicle in vehicles if vehicle.active and vehicle in self.slots]
+        slots = np.array([self.slots[vehicle] for vehicle in vehicles], dtype=np.intp)
+        return slots, vehicles
+
+    def _resize(self, capacity: int) -> None:
+        def grow(array, shape):
+            result = np.zeros(shape)
+            if array is not None:
+                result[:len(array)] = array
+            return result
+
+        self.position = grow(self.position, (capacity, 2))
+        self.orientation = grow(self.orientation, capacity)
+        self.velocity = grow(self.velocity, capacity)
+        self.acceleration = grow(self.acceleration, capacity)
+        self.max_velocity = grow(self.max_velocity, capacity)
+        self.max_acceleration = grow(self.max_acceleration, capacity)
+        self.length = grow(self.length, capacity)
+        for name, values in self.parameters.items():
+            self.parameters[name] = grow(values, capacity)
+        self.model_ids = grow(self.model_ids, capacity).astype(np.intp)
+        self.capacity = capacity
+
+
+class _Projections:
+    """Lane projections of one phase, each projection of a vehicle onto a lane is computed once.
+
+    The travelled distance of a vehicle on its own lane is the one in the vehicle index of the lane,
+    which was projected from its current position.
+    """
+
+    def __init__(self, vehicles: [Vehicle]):
+        self.distances = {(vehicle.lane, vehicle): vehicle.travelled_distance for vehicle in vehicles}
+        self.velocities = {}
+
+    def travelled_distance(self, lane: Lane, vehicle) -> float:
+        key = lane, vehicle
+        value = self.distances.get(key)
+        if value is None:
+            value = self.distances[key] = lane.projected_travelled_distance(vehicle.position)
+        return value
+
+    def velocity(self, lane: Lane, vehicle) -> float:
+        key = lane, vehicle
+        value = self.velocities.get(key)
+        if value is None:
+            value = self.velocities[key] = lane.projected_velocity(vehicle)
+        return value
+
+    def bumper_distance(self, lane: Lane, v1, v2) -> float:
+        # same steps as 'Lane.projected_bumper_distance'
+        return abs(self.travelled_distance(lane, v1) - self.travelled_distance(lane, v2)) - v1.length/2.0 - v2.length/2.0
+
+    def approaching_velocity(self, lane: Lane, v1, v2) -> float:
+        # same steps as 'Lane.approaching_velocity'
+        return self.velocity(lane, v1) - self.velocity(lane, v2)
@@ -0,0 +1,66 @@
+class VehiclePool:
+    """Vehicles of a world, split into the spawn pool and the set of active vehicles.
+
+    Both are lists with a position index, so acquiring, releasing, activating and deactivating a vehicle
+    are O(1) swap-removes and appends. The update loop of the world only iterates the active vehicles,
+    so the number of pooled vehicles does not affect the cost of a tick. The order of both lists changes
+    with every removal but only depends on the sequence of operations, so runs stay reproducible.
+
+    The pool behaves like a list of the vehicles that can be spawned.
+    """
+
+    def __init__(self):
+        self.vehicles = []  # type: list  # vehicles that can be spawned
+        self.active = []  # type: list  # active vehicles, see 'set_active'
+        self._vehicle_index = {}  # type: dict
+        self._active_index = {}  # type: dict
+
+    def __len__(self):
+        return len(self.vehicles)
+
+    def __iter__(self):
+        return iter(self.vehicles)
+
+    def __getitem__(self, index):
+        return self.vehicles[index]
+
+    def __contains__(self, vehicle):
+        return vehicle in self._vehicle_index
+
+    def append(self, vehicle) -> None:
+        """Release a vehicle into the pool, releasing a pooled vehicle again has no effect."""
+        if vehicle in self._vehicle_index:
+            return
+        self._vehicle_index[vehicle] = len(self.vehicles)
+        self.vehicles.append(vehicle)
+
+    def pop(self, index: int = -1):
+        """Acquire the vehicle at the given position of the pool."""
+        vehicle = self.vehicles[index]
+        self.remove(vehicle)
+        return vehicle
+
+    def remove(self, vehicle) -> None:
+        """Acquire the given vehicle from the pool."""
+        VehiclePool._swap_remove(self.vehicles, self._vehicle_index, vehicle)
+
+    def clear(self) -> None:
+        del self.vehicles[:]
+        self._vehicle_index.clear()
+
+    def set_active(self, vehicle, active: bool) -> None:
+        """Add a vehicle to or remove it from the active vehicles, called when 'Vehicle.active' changes."""
+        if active:
+            if vehicle not in self._active_index:
+                self._active_index[vehicle] = len(self.active)
+                self.active.append(vehicle)
+        elif vehicle in self._active_index:
+            VehiclePool._swap_remove(self.active, self._active_index, vehicle)
+
+    @staticmethod
+    def _swap_remove(items: list, index: dict, item) -> None:
+        position = index.pop(item)
+        last = items.pop()
+        if last is not item:
+            items[position] = last
+            index[last] = position
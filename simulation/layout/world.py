@@ -1,45 +1,134 @@
+import time
 from typing import List, Tuple
 
 from simulation.vector2 import Vector2
+from simulation.layout.projection_cache import ProjectionCache
 from simulation.layout.road import Road
 from simulation.layout.spawner import Spawner
+from simulation.layout.tick_profiler import TickProfiler
+from simulation.layout.vectorized_engine import VectorizedEngine
+from simulation.simulation_context import SimulationContext
 
 
 class World:
 
-    def __init__(self):
+    def __init__(self, vectorized: bool = False, frenet: bool = False, context: SimulationContext = None,
+                 profiler: TickProfiler = None):
         self.roads = []  # type: List[Road]
         self.vehicles = []  # type: List[Vehicle]
         self.spawners = []  # type: List[Spawner]
         self.camera_locations = [(Vector2(0, 0), 0)]  # type: List[Tuple[Vector2, float]]
+        self.frenet = frenet  # type: bool
+        self.context = SimulationContext() if context is None else context  # type: SimulationContext
+        self.projection_cache = self.context.projection_cache  # type: ProjectionCache
+        self.engine = VectorizedEngine(frenet=frenet) if vectorized else None  # type: VectorizedEngine
+        self.profiler = profiler  # type: TickProfiler
+        self.recorder = None  # type: TrajectoryRecorder  # records the vehicles after every update if set
+        # update phases in order, named like 'TickProfiler.PHASES'
+        self.phases = [('idm', self._update_idm),
+                       ('integration', self._update_vehicles),
+                       ('lane', self._update_lanes),
+                       ('mobil', self._update_mobil),
+                       ('events', self._update_events),
+                       ('spawners', self._update_spawners)]
 
     def update(self, delta_time: float) -> None:
-        for road in self.roads:
-            road.reset_hashes()
-        for vehicle in self.vehicles:
+        profiler = self.profiler
+        if profiler is None:
+            for _, phase in self.phases:
+                phase(delta_time)
+        else:
+            profiler.begin_tick(self)
+            for name, phase in self.phases:
+                start = time.perf_counter()
+                phase(delta_time)
+                profiler.record(name, time.perf_counter() - start)
+            profiler.end_tick(self)
+        if self.recorder is not None:
+            self.recorder.record(self, delta_time)
+
+    def active_vehicles(self) -> list:
+        """Snapshot of the active vehicles.
+
+        Vehicles that are deactivated while a phase iterates the snapshot stay in it, so phases check
+        'Vehicle.active' before stepping a vehicle.
+        """
+        return list(self.context.vehicle_pool.active)
+
+    def _update_idm(self, delta_time: float) -> None:
+        vehicles = self.active_vehicles()
+        if self.engine is None:
+            for vehicle in vehicles:
+                if vehicle.active:
+                    vehicle.update_idm()
+            return
+        self.engine.update_idm(vehicles)
+        for vehicle in self.engine.unmanaged:
             if vehicle.active:
                 vehicle.update_idm()
-        for vehicle in self.vehicles:
+
+    def _update_vehicles(self, delta_time: float) -> None:
+        vehicles = self.active_vehicles()
+        if self.engine is None:
+            for vehicle in vehicles:
+                if vehicle.active:
+                    vehicle.update_vehicle(delta_time)
+            return
+        self.engine.update_vehicles(delta_time, vehicles)
+        for vehicle in self.engine.unmanaged:
             if vehicle.active:
                 vehicle.update_vehicle(delta_time)
-        for vehicle in self.vehicles:
+
+    def _update_lanes(self, delta_time: float) -> None:
+        for vehicle in self.active_vehicles():
             if vehicle.active:
                 vehicle.update_lane()
-        for vehicle in self.vehicles:
+
+    def _update_mobil(self, delta_time: float) -> None:
+        if self.engine is not None:
+            self.engine.update_mobil(self.active_vehicles())
+            return
+        for vehicle in self.active_vehicles():
             if vehicle.active:
                 vehicle.update_mobil()
-        for vehicle in self.vehicles:
-            if vehicle.active:
-                vehicle.update_events(delta_time)
+
+    def _update_events(self, delta_time: float) -> None:
+        self.context.scheduler.update(delta_time)
+
+    def _update_spawners(self, delta_time: float) -> None:
         for spawner in self.spawners:
             spawner.update(delta_time)
 
     def add_road(self, road: Road) -> None:
         self.roads.append(road)
+        road.set_projection_cache(self.projection_cache)
 
     def add_spawner(self, spawner: Spawner) -> None:
+        spawner.context = self.context
         self.spawners.append(spawner)
 
     def add_vehicle(self, vehicle) -> None:
+        vehicle.frenet = self.frenet
+        vehicle.context = self.context
+        vehicle.id = self.context.next_id()
         self.vehicles.append(vehicle)
-        Spawner.add_vehicle(vehicle)
+        if self.engine is not None:
+            self.engine.add_vehicle(vehicle)
+        self.context.vehicle_pool.append(vehicle)
+        self.context.vehicle_pool.set_active(vehicle, vehicle.active)
+
+    def add_vehicles(self, vehicle_type, count: int) -> list:
+        """Preallocate vehicles of one type and put them into the vehicle pool.
+
+        The slots of the vectorized engine are reserved for all of them at once.
+
+        :param vehicle_type: vehicle class, created without arguments
+        :param count: number of vehicles
+        :return: the new vehicles
+        """
+        if self.engine is not None:
+            self.engine.reserve(len(self.engine.vehicles) + count)
+        vehicles = [vehicle_type() for _ in range(count)]
+        for vehicle in vehicles:
+            self.add_vehicle(vehicle)
+        return vehicles
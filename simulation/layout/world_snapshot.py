@@ -0,0 +1,114 @@
+import threading
+import time
+
+from simulation.vector2 import Vector2
+
+
+class VehicleSnapshot:
+    """Copy of the rendered state of a vehicle at one tick. Snapshots are never changed after their creation."""
+
+    __slots__ = ('id', 'position', 'orientation', 'velocity', 'acceleration', 'turn_signal', 'color', 'mesh')
+
+    TURN_SIGNAL_NONE = 0  # same as 'Vehicle.TURN_SIGNAL_NONE'
+    active = True
+
+    def __init__(self, vehicle_id: int, position: Vector2, orientation: float, velocity: float,
+                 acceleration: float, turn_signal: int, color: tuple, mesh: list):
+        self.id = vehicle_id  # type: int
+        self.position = position  # type: Vector2
+        self.orientation = orientation  # type: float
+        self.velocity = velocity  # type: float
+        self.acceleration = acceleration  # type: float
+        self.turn_signal = turn_signal  # type: int
+        self.color = color  # type: tuple
+        self.mesh = mesh  # type: list  # shared with the vehicle, meshes are static
+
+    @staticmethod
+    def capture(vehicle) -> 'VehicleSnapshot':
+        return VehicleSnapshot(vehicle.id, vehicle.position.copy(), vehicle.orientation, vehicle.velocity,
+                               vehicle.acceleration, vehicle.turn_signal, vehicle.color, vehicle.mesh)
+
+
+class WorldSnapshot:
+    """State of the active vehicles of a world at one tick, which can be rendered instead of the 'World'.
+
+    Roads are static and shared with the world, vehicles are copied into 'VehicleSnapshot's.
+    """
+
+    def __init__(self, roads: list, time: float, step: int, vehicles: list):
+        self.roads = roads  # type: list
+        self.time = time  # type: float
+        self.step = step  # type: int
+        self.vehicles = vehicles  # type: [VehicleSnapshot]
+
+    @staticmethod
+    def capture(world, time: float = 0.0, step: int = 0) -> 'WorldSnapshot':
+        return WorldSnapshot(world.roads, time, step,
+                             [VehicleSnapshot.capture(vehicle) for vehicle in world.active_vehicles()])
+
+    def active_vehicles(self) -> list:
+        return self.vehicles
+
+    @staticmethod
+    def interpolate(previous: 'WorldSnapshot', current: 'WorldSnapshot', alpha: float) -> 'WorldSnapshot':
+        """Blend two consecutive snapshots, alpha 0 gives the previous and alpha 1 the current state.
+
+        Vehicles which only exist in the current snapshot, or which moved further than their velocity allows
+        (e.g. a pooled vehicle which despawned and spawned again), are taken from the current snapshot.
+        """
+        if previous is None or alpha >= 1.0:
+            return current
+        before = {vehicle.id: vehicle for vehicle in previous.vehicles}
+        duration = current.time - previous.time
+        vehicles = []
+        for vehicle in current.vehicles:
+            old = before.get(vehicle.id)
+            if old is None or old.position.distance(vehicle.position) > \
+                    duration * max(old.velocity, vehicle.velocity) + 1.0:
+                vehicles.append(vehicle)
+                continue
+            position = old.position + (vehicle.position - old.position) * alpha
+            turn = (vehicle.orientation - old.orientation + 180.0) % 360.0 - 180.0
+            vehicles.append(VehicleSnapshot(vehicle.id, position, old.orientation + turn * alpha,
+                                            old.velocity + (vehicle.velocity - old.velocity) * alpha,
+                                            vehicle.acceleration, vehicle.turn_signal, vehicle.color, vehicle.mesh))
+        return WorldSnapshot(current.roads, previous.time + duration * alpha, current.step, vehicles)
+
+
+class SnapshotBuffer:
+    """Double buffer of the two latest snapshots, written by the simulation and read by the renderer.
+
+    The wall clock time of every 'publish' is recorded, so the renderer can show the state one tick behind
+    the simulation and interpolate towards the latest snapshot at its own frame rate (see 'interpolated').
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()  # type: threading.Lock
+        self.previous = None  # type: WorldSnapshot
+        self.current = None  # type: WorldSnapshot
+        self.published = None, None  # type: (float, float)  # wall clock times of both snapshots
+
+    def publish(self, snapshot: WorldSnapshot, now: float = None) -> None:
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            self.previous, self.current = self.current, snapshot
+            self.published = self.published[1], now
+
+    def read(self) -> (WorldSnapshot, WorldSnapshot):
+        """:return: previous and current snapshot, both None before the first 'publish'"""
+        with self.lock:
+            return self.previous, self.current
+
+    def interpolated(self, now: float = None) -> WorldSnapshot:
+        """Interpolate between both snapshots by the wall clock time passed since the latest 'publish'.
+
+        The interval between the two publishes is the duration of the blend, so the current snapshot is reached
+        when the next one would be due. Without a newer snapshot, e.g. while paused, the current one is kept.
+        """
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            previous, current = self.previous, self.current
+            before, after = self.published
+        if previous is None or after <= before:
+            return current
+        return WorldSnapshot.interpolate(previous, current, max(0.0, (now - after) / (after - before)))
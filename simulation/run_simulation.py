@@ -14,11 +14,29 @@ def main():
     logger.info('Started simulation.')
     from simulation.traffic_simulation import TrafficSimulation
     import simulation.config_reader as cr
+    from simulation.layout.tick_profiler import TickProfiler
+    from simulation.io.trajectory_recorder import TrajectoryRecorder
 
     cr.initialize()
-    world = example.create_world()
-    simulation = TrafficSimulation(world)
-    simulation.simulate()
+    world = example.create_world(vectorized=cr.CONFIG.getboolean('simulation', 'vectorized'),
+                                 frenet=cr.CONFIG.getboolean('simulation', 'frenet'))
+    profile = cr.CONFIG.get('simulation', 'profile', fallback='')
+    if profile:
+        world.profiler = TickProfiler(profile)
+    record = cr.CONFIG.get('simulation', 'record', fallback='')
+    if record:
+        world.recorder = TrajectoryRecorder(record, world,
+                                            compression=cr.CONFIG.getint('simulation', 'record_compression',
+                                                                         fallback=0))
+    simulation = TrafficSimulation(world, headless=cr.CONFIG.getboolean('simulation', 'headless'))
+    steps = cr.CONFIG.getint('simulation', 'steps')
+    simulation.run(steps=steps if steps > 0 else None)
+    if world.profiler is not None:
+        world.profiler.close()
+        logger.info('Profile (ms per tick): %s', world.profiler.summary())
+    if world.recorder is not None:
+        world.recorder.close()
+        logger.info('Recorded %d ticks to %s', world.recorder.ticks, record)
 
     logger.info('Finished simulation.')
 
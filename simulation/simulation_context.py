@@ -0,0 +1,40 @@
+import logging
+import random
+import sys
+from configparser import ConfigParser
+
+import simulation.config_reader as cr
+from simulation.agent.event_scheduler import EventScheduler
+from simulation.layout.projection_cache import ProjectionCache
+from simulation.layout.vehicle_pool import VehiclePool
+
+
+class SimulationContext:
+    """State shared by all objects of one world.
+
+    Each world owns its own context, so several worlds can be stepped in one process,
+    in threads or interleaved without sharing vehicles, caches or random streams.
+    """
+
+    def __init__(self, seed: int = None, config: ConfigParser = None):
+        """Create a context.
+
+        :param seed: seed for the random decisions of the vehicles, random if None
+        :param config: configuration of the world, the process configuration ('config_reader.CONFIG') if None
+        """
+        if seed is None:
+            seed = random.randint(0, sys.maxsize)
+        self.seed = seed  # type: int
+        self.rng = random.Random(seed)  # type: random.Random
+        self.config = cr.CONFIG if config is None else config  # type: ConfigParser
+        self.vehicle_pool = VehiclePool()  # type: VehiclePool
+        self.projection_cache = ProjectionCache()  # type: ProjectionCache
+        self.scheduler = EventScheduler()  # type: EventScheduler
+        self._next_id = 0  # type: int
+        logging.getLogger('simulation.agent').info('Seed for vehicles: ' + str(seed))
+
+    def next_id(self) -> int:
+        """Return a new object id, unique within this context."""
+        result = self._next_id
+        self._next_id += 1
+        return result
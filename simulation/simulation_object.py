@@ -4,8 +4,6 @@ from simulation.vector2 import Vector2
 
 class SimulationObject(object):
 
-    ID = 0  # type: int
-
     def __init__(self,
                  position: Vector2 = Vector2(0, 0),
                  orientation: float = 0.0,
@@ -26,15 +24,11 @@ class SimulationObject(object):
         self.max_acceleration = max_acceleration  # type: float
         self.__velocity = velocity  # type: float
         self.max_velocity = max_velocity  # type: float
-        self.id = SimulationObject.ID  # type: int
-        SimulationObject.ID += 1
+        self.id = None  # type: int  # assigned by the world
 
     def apply_world_transform(self, vector: Vector2) -> Vector2:
         """Transform a vector from the local coordinate system of this object to the world coordinate system"""
-        result = vector.copy()
-        result.rotate(self.orientation)
-        result += self.position
-        return result
+        return Vector2(*vector.rotate_translate(self.orientation, self.position.x, self.position.y))
 
     @property
     def velocity(self):
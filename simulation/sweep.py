@@ -0,0 +1,159 @@
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+import simulation.examples.highway as highway
+from simulation.layout.world import World
+
+DRIVER_PARAMETERS = ('min_spacing', 'time_headway', 'comf_break', 'delta', 'politeness', 'b_safe', 'thresh')
+METRICS = ('steps', 'wall_time', 'ticks_per_second', 'mean_active_vehicles', 'mean_velocity', 'despawned_vehicles')
+
+logger = logging.getLogger('simulation.sweep')
+
+
+def parameter_grid(grid: Dict[str, list]) -> List[dict]:
+    """Expand a dict of parameter value lists into the list of all combinations.
+
+    :param grid: parameter name -> list of values
+    :return: list of parameter dicts
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_id(parameters: dict, steps: int, time_step: float, factory: Callable[..., World]) -> str:
+    """Stable identifier of a run, used to resume sweeps.
+
+    Besides the parameters it covers the number of steps, the time step and the qualified name of the
+    world factory, so results of runs with other settings are not taken for results of this run.
+    """
+    key = {'parameters': parameters, 'steps': steps, 'time_step': time_step,
+           'factory': factory.__module__ + '.' + factory.__qualname__}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def seed_world(world: World, seed: int) -> None:
+    """Derive the seeds of all spawners and of the vehicle decisions from a single run seed."""
+    rng = random.Random(seed)
+    for spawner in world.spawners:
+        spawner.seed = rng.randint(0, sys.maxsize)
+        spawner.rng.seed(spawner.seed)
+    world.context.seed = rng.randint(0, sys.maxsize)
+    world.context.rng.seed(world.context.seed)
+
+
+def run_scenario(parameters: dict, steps: int, time_step: float = 0.125,
+                 factory: Callable[..., World] = highway.create_world) -> dict:
+    """Build a world from the given parameters, simulate it headless and collect metrics.
+
+    'seed' seeds the run, driver parameters (see DRIVER_PARAMETERS) are applied to every vehicle,
+    all other parameters are passed to the world factory.
+
+    :return: row of the result table
+    """
+    parameters = dict(parameters)
+    seed = parameters.pop('seed', 0)
+    driver_parameters = {name: parameters.pop(name) for name in DRIVER_PARAMETERS if name in parameters}
+    world = factory(**parameters)
+    for vehicle in world.vehicles:
+        for name, value in driver_parameters.items():
+            setattr(vehicle.driver, name, value)
+    if world.engine is not None:
+        world.engine.sync_parameters()
+    seed_world(world, seed)
+
+    active_sum, velocity_sum, despawned = 0, 0.0, 0
+    active = [vehicle.active for vehicle in world.vehicles]
+    wall_time = 0.0  # only 'World.update' is timed, not the metrics
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.update(time_step)
+        wall_time += time.perf_counter() - start
+        for i, vehicle in enumerate(world.vehicles):
+            if vehicle.active:
+                active_sum += 1
+                velocity_sum += vehicle.velocity
+            elif active[i]:
+                despawned += 1
+            active[i] = vehicle.active
+    return {'steps': steps,
+            'wall_time': wall_time,
+            'ticks_per_second': steps / wall_time if wall_time > 0 else float('inf'),
+            'mean_active_vehicles': active_sum / steps if steps else 0.0,
+            'mean_velocity': velocity_sum / active_sum if active_sum else 0.0,
+            'despawned_vehicles': despawned}
+
+
+def _run_task(task):
+    identifier, parameters, steps, time_step, factory = task
+    result = {'run_id': identifier}
+    result.update(parameters)
+    result.update(run_scenario(parameters, steps, time_step, factory))
+    return result
+
+
+class ParameterSweep:
+    """Run independent scenarios of a parameter grid in a process pool.
+
+    Every finished run is appended to the result file right away. Runs already present in
+    the result file are skipped, so an interrupted sweep continues where it stopped.
+    """
+
+    def __init__(self, grid: Dict[str, list], steps: int, results_path: str, time_step: float = 0.125,
+                 processes: int = None, factory: Callable[..., World] = highway.create_world):
+        self.runs = parameter_grid(grid)  # type: List[dict]
+        self.steps = steps  # type: int
+        self.results_path = results_path  # type: str
+        self.time_step = time_step  # type: float
+        self.processes = processes or os.cpu_count()  # type: int
+        self.factory = factory
+        self.fields = ['run_id'] + sorted(grid) + list(METRICS)  # type: List[str]
+
+    def header(self) -> List[str]:
+        """Read the header of the result file, None if there is no result file yet."""
+        if not os.path.exists(self.results_path) or os.path.getsize(self.results_path) == 0:
+            return None
+        with open(self.results_path, newline='') as f:
+            return next(csv.reader(f), None)
+
+    def completed(self) -> List[dict]:
+        """Read all results stored so far."""
+        if not os.path.exists(self.results_path):
+            return []
+        with open(self.results_path, newline='') as f:
+            return list(csv.DictReader(f))
+
+    def run(self) -> List[dict]:
+        """Run all pending scenarios.
+
+        :return: the complete result table, including results of earlier, interrupted sweeps
+        """
+        header = self.header()
+        if header is not None and header != self.fields:
+            raise ValueError('The columns of %s (%s) do not match the parameters of this sweep (%s), '
+                             'use a new result file.' % (self.results_path, ', '.join(header), ', '.join(self.fields)))
+        done = {row['run_id'] for row in self.completed()}
+        tasks = [(run_id(parameters, self.steps, self.time_step, self.factory), parameters, self.steps,
+                  self.time_step, self.factory) for parameters in self.runs]
+        tasks = [task for task in tasks if task[0] not in done]
+        logger.info('Sweep with %s runs, %s already done.', len(self.runs), len(self.runs) - len(tasks))
+        write_header = header is None
+        with open(self.results_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fields)
+            if write_header:
+                writer.writeheader()
+            if tasks:
+                with multiprocessing.Pool(min(self.processes, len(tasks))) as pool:
+                    for result in pool.imap_unordered(_run_task, tasks):
+                        writer.writerow(result)
+                        f.flush()
+                        logger.info('Finished run %s.', result['run_id'])
+        return self.completed()
@@ -0,0 +1,59 @@
+import random
+from unittest import TestCase
+
+from numpy.testing import assert_allclose
+
+import simulation.agent.driver as driver
+import simulation.examples.highway as highway
+from simulation.agent.dummy_driver import DummyDriver
+from simulation.agent.gipps_driver import GippsDriver
+from simulation.agent.intelligent_driver import IntelligentDriver
+from simulation.agent.krauss_driver import KraussDriver
+from simulation.agent.vehicle_types import Minivan, Sportscar, Truck
+
+
+def random_pairs(rng, count):
+    egos, fronts, distances, velocities = [], [], [], []
+    models = [lambda: IntelligentDriver(), lambda: GippsDriver(), lambda: KraussDriver(), lambda: DummyDriver()]
+    for _ in range(count):
+        ego = rng.choice((Minivan, Sportscar, Truck))()
+        ego.driver = rng.choice(models)()
+        ego.velocity = rng.uniform(0.0, ego.max_velocity)
+        front = None if rng.random() < 0.2 else Minivan()
+        egos.append(None if rng.random() < 0.1 else ego)
+        fronts.append(front)
+        distances.append(None if front is None else rng.uniform(-1.0, 80.0))
+        velocities.append(None if front is None else rng.uniform(-10.0, 10.0))
+    return egos, fronts, distances, velocities
+
+
+class TestDriver(TestCase):
+
+    def test_batched_models_match_scalar(self):
+        egos, fronts, distances, velocities = random_pairs(random.Random(5), 400)
+        result = driver.decide_accelerations(egos, fronts, distances, velocities)
+        expected = [0.0 if ego is None else ego.driver.decide_acceleration(ego, front, distance, velocity)
+                    for ego, front, distance, velocity in zip(egos, fronts, distances, velocities)]
+        assert_allclose(result, expected, rtol=1e-12, atol=1e-12)
+
+    def test_mixed_fleet_in_vectorized_engine(self):
+        def run(vectorized):
+            world = highway.create_world(vectorized=vectorized)
+            for i, vehicle in enumerate(world.vehicles):
+                if i % 3 == 1:
+                    vehicle.driver = GippsDriver()
+                elif i % 3 == 2:
+                    vehicle.driver = KraussDriver()
+            if world.engine is not None:
+                world.engine.sync_parameters()
+            for i, spawner in enumerate(world.spawners):
+                spawner.rng.seed(i + 1)
+            world.context.rng.seed(7)
+            for _ in range(160):
+                world.update(0.125)
+            return [(v.active, v.position.x, v.position.y, v.velocity) for v in world.vehicles]
+
+        for expected, result in zip(run(False), run(True)):
+            self.assertEqual(expected[0], result[0])
+            for a, b in zip(expected[1:], result[1:]):
+                self.assertAlmostEqual(a, b, places=9)
@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+import simulation.examples.highway as highway
+from simulation.agent.event_scheduler import EventScheduler
+from simulation.agent.events import ChangePermitEvent, Event
+from simulation.layout.spawner import Spawner
+
+
+class RecordingEvent(Event):
+
+    def __init__(self, log, name, timer=None, trigger=None):
+        super(RecordingEvent, self).__init__(timer=timer, trigger=trigger)
+        self.log = log
+        self.name = name
+
+    def process(self):
+        self.log.append(self.name)
+
+
+class TestEventScheduler(TestCase):
+
+    def setUp(self):
+        self.log = []
+        self.scheduler = EventScheduler()
+
+    def test_timed_events_fire_in_order(self):
+        self.scheduler.schedule(RecordingEvent(self.log, 'late', timer=0.5))
+        self.scheduler.schedule(RecordingEvent(self.log, 'early', timer=0.2))
+        self.scheduler.update(0.125)
+        self.assertEqual(self.log, [])
+        self.scheduler.update(0.125)
+        self.assertEqual(self.log, ['early'])
+        for _ in range(2):
+            self.scheduler.update(0.125)
+        self.assertEqual(self.log, ['early', 'late'])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_trigger_chain_resolved_by_dependency(self):
+        first = RecordingEvent(self.log, 'first', timer=0.1)
+        third = RecordingEvent(self.log, 'third')
+        second = RecordingEvent(self.log, 'second', trigger=first)
+        third.trigger = second
+        self.scheduler.schedule(third)
+        self.scheduler.schedule(second)
+        self.scheduler.schedule(first)
+        self.scheduler.update(0.125)
+        self.assertEqual(self.log, ['first', 'second', 'third'])
+
+    def test_triggered_events_are_skipped(self):
+        event = RecordingEvent(self.log, 'cancelled', timer=0.1)
+        self.scheduler.schedule(event)
+        event.triggered = True
+        self.scheduler.update(0.125)
+        self.assertEqual(self.log, [])
+
+    def test_despawned_vehicle_events_are_cancelled(self):
+        world = highway.create_world()
+        for _ in range(40):
+            world.update(0.125)
+        vehicle = world.active_vehicles()[0]
+        vehicle.change_permit = False
+        event = ChangePermitEvent(vehicle, timer=0.5)
+        vehicle.add_event(event)
+        lane = vehicle.lane
+        lane.remove_vehicle(vehicle)
+        self.assertFalse(vehicle.active)
+        self.assertEqual(vehicle.events, [])
+        self.assertIn(vehicle, world.context.vehicle_pool)
+        for _ in range(8):
+            world.context.scheduler.update(0.125)
+        self.assertFalse(vehicle.change_permit)
+        vehicle.change_permit = True
+        Spawner._reinit_vehicle(lane, vehicle, lane.center[0], lane.center[1])
+        self.assertFalse(vehicle.change_permit)
@@ -0,0 +1,183 @@
+import random
+from unittest import TestCase
+
+from simulation.agent.vehicle_types import Minivan
+from simulation.layout.lane_reservation import LaneReservation
+from simulation.layout.road import Road
+from simulation.vector2 import Vector2
+
+
+def create_corridor(roads=3, num_lanes=2):
+    result = []
+    for r in range(roads):
+        offset = r * 120.0
+        path = [Vector2(offset - 10.0, 0.0), Vector2(offset, 0.0), Vector2(offset + 50.0, 5.0),
+                Vector2(offset + 100.0, 0.0), Vector2(offset + 110.0, 0.0)]
+        result.append(Road(path, num_lanes))
+    for pred, succ in zip(result, result[1:]):
+        pred.connect(succ, [(i, i) for i in range(num_lanes)])
+    return result
+
+
+def place_vehicle(lane, node):
+    vehicle = Minivan()
+    vehicle.position = lane.center[node].copy()
+    vehicle.target = lane.center[node + 1]
+    vehicle.active = True
+    vehicle.lane = lane
+    lane.add_vehicle(vehicle)
+    return vehicle
+
+
+def brute_force_closest_node(lane, position):
+    closest = None, None
+    dist = float("inf")
+    for step in ('front_connection', 'back_connection'):
+        current = lane
+        while current is not None:
+            for i, node in enumerate(current.center):
+                if position.distance(node) < dist:
+                    dist = position.distance(node)
+                    closest = i, current
+            current = getattr(current, step)
+    return closest
+
+
+class TestLane(TestCase):
+
+    def setUp(self):
+        self.roads = create_corridor()
+        self.lane = self.roads[1].lanes[0]
+
+    def test_vehicles_sorted_by_travelled_distance(self):
+        back = place_vehicle(self.lane, 0)
+        front = place_vehicle(self.lane, 2)
+        middle = place_vehicle(self.lane, 1)
+        self.assertEqual(self.lane.vehicles, [back, middle, front])
+        self.assertEqual(self.lane.vehicle_distances, sorted(self.lane.vehicle_distances))
+
+    def test_front_and_back_vehicle(self):
+        back = place_vehicle(self.lane, 0)
+        front = place_vehicle(self.lane, 2)
+        ego = place_vehicle(self.lane, 1)
+        self.assertIs(self.lane.find_front_vehicle(ego.position), front)
+        self.assertIs(self.lane.find_back_vehicle(ego.position), back)
+        self.assertIsNone(self.lane.find_front_vehicle(front.position))
+        self.assertIsNone(self.lane.find_back_vehicle(back.position))
+
+    def test_queries_follow_connections(self):
+        ego = place_vehicle(self.lane, 1)
+        front = place_vehicle(self.roads[2].lanes[0], 1)
+        back = place_vehicle(self.roads[0].lanes[0], 1)
+        self.assertIs(self.lane.find_front_vehicle(ego.position), front)
+        self.assertIs(self.lane.find_back_vehicle(ego.position), back)
+
+    def test_index_follows_movement(self):
+        first = place_vehicle(self.lane, 1)
+        second = place_vehicle(self.lane, 2)
+        first.position = self.lane.center[3].copy()
+        self.lane.update_vehicle_distance(first)
+        self.assertEqual(self.lane.vehicles, [second, first])
+        self.assertTrue(self.lane.detach_vehicle(second))
+        self.assertFalse(self.lane.detach_vehicle(second))
+        self.assertEqual(self.lane.vehicles, [first])
+
+    def test_closest_node_matches_brute_force(self):
+        rng = random.Random(3)
+        for road in self.roads:
+            for lane in road.lanes:
+                positions = [node.copy() for node in lane.center]
+                positions += [Vector2(rng.uniform(-50.0, 400.0), rng.uniform(-30.0, 30.0)) for _ in range(50)]
+                for position in positions:
+                    self.assertEqual(lane.find_closest_node(position), brute_force_closest_node(lane, position))
+
+    def test_closest_node_with_merging_lanes(self):
+        main = Road([Vector2(-110.0, 0.0), Vector2(-100.0, 0.0), Vector2(-50.0, 0.0), Vector2(-10.0, 0.0),
+                     Vector2(-5.0, 0.0)], 1)
+        ramp = Road([Vector2(-110.0, -9.0), Vector2(-100.0, -8.0), Vector2(-50.0, -6.0), Vector2(-10.0, -2.0),
+                     Vector2(-5.0, -1.0)], 1)
+        merged = Road([Vector2(-2.0, 0.0), Vector2(0.0, 0.0), Vector2(50.0, 0.0), Vector2(100.0, 0.0),
+                       Vector2(105.0, 0.0)], 1)
+        after = Road([Vector2(108.0, 0.0), Vector2(110.0, 0.0), Vector2(160.0, 0.0), Vector2(165.0, 0.0)], 1)
+        main.connect(merged, [(0, 0)])
+        ramp.connect(merged, [(0, 0)])
+        merged.connect(after, [(0, 0)])
+        rng = random.Random(4)
+        positions = [Vector2(rng.uniform(-110.0, 170.0), rng.uniform(-15.0, 15.0)) for _ in range(200)]
+        for road in (main, ramp, merged, after):
+            lane = road.lanes[0]
+            for position in positions:
+                self.assertEqual(lane.find_closest_node(position), brute_force_closest_node(lane, position))
+        _, lane = main.lanes[0].find_closest_node(Vector2(-50.0, -6.0))
+        self.assertIs(lane, main.lanes[0])
+
+    def test_position_at_follows_connections(self):
+        end = self.lane.accumulated_distance[-1]
+        position, direction = self.lane.position_at(end + 1.0)
+        front = self.roads[2].lanes[0]
+        self.assertAlmostEqual(front.projected_travelled_distance(position), end + 1.0)
+        self.assertAlmostEqual(direction.length(), 1.0)
+        self.assertIsNone(self.lane.position_at(self.roads[2].lanes[0].accumulated_distance[-1] + 1.0))
+
+    def test_map_distance_to_neighbor(self):
+        left = self.lane.left_neighbor
+        for node in range(len(self.lane.center)):
+            distance = self.lane.map_distance(self.lane.accumulated_distance[node], left)
+            self.assertAlmostEqual(distance, left.accumulated_distance[node])
+
+    def test_geometry(self):
+        lane = self.lane
+        self.assertEqual(len(lane.tangents), len(lane.center) - 1)
+        for i, (x, y) in enumerate(lane.tangents):
+            direction = lane.center[i + 1] - lane.center[i]
+            self.assertAlmostEqual(lane.segment_lengths[i], direction.length())
+            direction.normalize()
+            self.assertAlmostEqual(x, direction.x)
+            self.assertAlmostEqual(y, direction.y)
+            self.assertAlmostEqual(lane.headings[i], Vector2(0, 1).distance_angular_signed(direction))
+        # the corridor bends to the right at its second node
+        self.assertLess(lane.curvature[1], 0.0)
+        self.assertEqual(lane.curvature[0], 0.0)
+
+    def test_traverse_distance_follows_connections(self):
+        start = self.lane.accumulated_distance[1]
+        position, lane, first = self.lane.traverse_distance(start, self.lane.accumulated_distance[-1] - start + 1.0)
+        front = self.roads[2].lanes[0]
+        self.assertIs(lane, front)
+        self.assertEqual(first, 0)
+        self.assertAlmostEqual(position.distance(front.center[0]), 1.0)
+        position, lane, first = self.lane.traverse_distance(self.lane.accumulated_distance[0], 0.0)
+        self.assertEqual((lane, first), (self.lane, 0))
+        self.assertIsNone(self.lane.traverse_distance(start, front.accumulated_distance[-1]))
+
+    def test_traverse_distance_and_locate_agree_at_nodes(self):
+        start = self.lane.accumulated_distance[0]
+        for lane in (self.lane, self.roads[2].lanes[0]):
+            for node in lane.accumulated_distance:
+                position, reached, first = self.lane.traverse_distance(start, node - start)
+                self.assertEqual((reached, first), self.lane.locate(node))
+        end = self.roads[2].lanes[0].accumulated_distance[-1]
+        self.assertIsNotNone(self.lane.traverse_distance(start, end - start))
+        self.assertIsNone(self.lane.locate(end + 1e-9))
+
+    def test_fix_vehicle_position_removes_vehicles_at_the_end_of_the_chain(self):
+        lane = create_corridor(roads=1)[0].lanes[0]
+        vehicle = place_vehicle(lane, len(lane.center) - 2)
+        vehicle.position = lane.center[-1].copy()
+        lane.fix_vehicle_position(vehicle)
+        self.assertFalse(vehicle.active)
+        self.assertNotIn(vehicle, lane.vehicles)
+
+    def test_reservation_is_seen_by_queries(self):
+        back = place_vehicle(self.lane, 0)
+        front = place_vehicle(self.lane, 2)
+        changing = place_vehicle(self.lane.left_neighbor, 1)
+        reservation = LaneReservation(changing, self.lane, self.lane.accumulated_distance[1])
+        self.assertIs(self.lane.find_front_vehicle(back.position), reservation)
+        self.assertIs(self.lane.find_back_vehicle_at(front.travelled_distance, front), reservation)
+        self.assertAlmostEqual(reservation.position.distance(self.lane.center[1]), 0.0)
+        reservation.advance(1000.0)
+        self.assertLess(reservation.travelled_distance, front.travelled_distance)
+        reservation.release()
+        self.assertIs(self.lane.find_front_vehicle(back.position), front)
+        self.assertFalse(reservation.active)
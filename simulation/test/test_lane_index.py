@@ -0,0 +1,60 @@
+import random
+from unittest import TestCase
+
+from simulation.layout.lane_index import LaneIndex
+from simulation.test.test_lane import create_corridor, place_vehicle
+
+
+class TestLaneIndex(TestCase):
+
+    def setUp(self):
+        self.roads = create_corridor()
+        rng = random.Random(3)
+        self.vehicles = []
+        for road in self.roads:
+            for lane in road.lanes:
+                for node in rng.sample(range(len(lane.center) - 1), 2):
+                    self.vehicles.append(place_vehicle(lane, node))
+        # an empty lane in the middle of a chain
+        for vehicle in list(self.roads[1].lanes[1].vehicles):
+            self.roads[1].lanes[1].detach_vehicle(vehicle)
+            self.vehicles.remove(vehicle)
+
+    def test_neighbors_match_lane_queries(self):
+        rng = random.Random(5)
+        queries = []
+        for vehicle in self.vehicles:
+            queries.append((vehicle.lane, vehicle.travelled_distance, vehicle))
+            for lane in vehicle.lane.neighboring_lanes:
+                queries.append((lane, vehicle.lane.map_distance(vehicle.travelled_distance, lane), vehicle))
+        for road in self.roads:
+            for lane in road.lanes:
+                queries.append((lane, rng.uniform(0.0, lane.accumulated_distance[-1]), self.vehicles[0]))
+        lanes, distances, asking = zip(*queries)
+        index = LaneIndex(lanes, frenet=True)
+        back, front, searched = index.neighbors(lanes, distances, asking)
+        for i, (lane, distance, vehicle) in enumerate(queries):
+            for found, expected in ((back[i], lane.find_back_vehicle_at(distance, vehicle)),
+                                    (front[i], lane.find_front_vehicle_at(distance, vehicle))):
+                self.assertIs(None if found < 0 else index.entries[found], expected)
+        self.assertTrue(searched)
+
+    def test_neighbors_skip_vehicles_at_the_asking_position(self):
+        lane = self.roads[0].lanes[0]
+        vehicle = lane.vehicles[0]
+        index = LaneIndex([lane])
+        self.assertEqual(len(index.lanes), len(self.roads))
+        back, front, _ = index.neighbors([lane], [vehicle.travelled_distance], [vehicle])
+        self.assertIs(index.entries[front[0]], lane.find_front_vehicle(vehicle.position))
+        self.assertEqual(back[0], -1)
+
+    def test_successors_match_front_queries(self):
+        # a second vehicle at the travelled distance of another one
+        lane = self.roads[0].lanes[0]
+        self.vehicles.append(place_vehicle(lane, lane.center.index(lane.vehicles[0].position)))
+        index = LaneIndex([vehicle.lane for vehicle in self.vehicles], frenet=True)
+        entries = index.entry_indices(self.vehicles)
+        for vehicle, entry, found in zip(self.vehicles, entries, index.successors(entries)):
+            self.assertIs(index.entries[entry], vehicle)
+            self.assertIs(None if found < 0 else index.entries[found],
+                          vehicle.lane.find_front_vehicle_at(vehicle.travelled_distance, vehicle))
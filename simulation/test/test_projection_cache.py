@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from simulation.layout.projection_cache import ProjectionCache
+from simulation.vector2 import Vector2
+
+
+class TestProjectionCache(TestCase):
+
+    def test_hits_and_misses(self):
+        cache = ProjectionCache()
+        key = cache.key('node', None, Vector2(1.0, 2.0))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, (3, None))
+        self.assertEqual(cache.get(cache.key('node', None, Vector2(1.0, 2.0))), (3, None))
+        self.assertIsNone(cache.get(cache.key('segment', None, Vector2(1.0, 2.0))))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.hit_rate, 1 / 3)
+
+    def test_keys_do_not_follow_mutated_positions(self):
+        cache = ProjectionCache()
+        position = Vector2(1.0, 2.0)
+        cache.put(cache.key('node', None, position), 1)
+        position += Vector2(1.0, 0.0)
+        self.assertIsNone(cache.get(cache.key('node', None, position)))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ProjectionCache(capacity=2)
+        keys = [cache.key('node', None, Vector2(i, 0)) for i in range(3)]
+        cache.put(keys[0], 0)
+        cache.put(keys[1], 1)
+        cache.get(keys[0])
+        cache.put(keys[2], 2)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), 0)
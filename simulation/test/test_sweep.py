@@ -0,0 +1,44 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from simulation.sweep import ParameterSweep, parameter_grid, run_id, run_scenario
+
+
+class TestSweep(TestCase):
+
+    def test_parameter_grid(self):
+        runs = parameter_grid({'seed': [1, 2], 'trucks': [0, 6, 12]})
+        self.assertEqual(len(runs), 6)
+        self.assertIn({'seed': 2, 'trucks': 6}, runs)
+        self.assertEqual(run_id({'seed': 1, 'trucks': 0}, 20, 0.125, run_scenario),
+                         run_id({'trucks': 0, 'seed': 1}, 20, 0.125, run_scenario))
+
+    def test_runs_are_reproducible(self):
+        parameters = {'seed': 3, 'politeness': 0.2}
+        first = run_scenario(parameters, 60)
+        second = run_scenario(parameters, 60)
+        for metric in ('mean_active_vehicles', 'mean_velocity', 'despawned_vehicles'):
+            self.assertEqual(first[metric], second[metric])
+
+    def test_sweep_resumes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            results = ParameterSweep({'seed': [1]}, 20, path, processes=1).run()
+            self.assertEqual(len(results), 1)
+            results = ParameterSweep({'seed': [1, 2]}, 20, path, processes=1).run()
+            self.assertEqual(sorted(row['seed'] for row in results), ['1', '2'])
+
+    def test_resume_with_other_parameters_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            ParameterSweep({'seed': [1]}, 20, path, processes=1).run()
+            with self.assertRaises(ValueError):
+                ParameterSweep({'seed': [1], 'trucks': [0]}, 20, path, processes=1).run()
+
+    def test_resume_with_other_steps_runs_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            ParameterSweep({'seed': [1]}, 20, path, processes=1).run()
+            results = ParameterSweep({'seed': [1]}, 30, path, processes=1).run()
+            self.assertEqual(sorted(row['steps'] for row in results), ['20', '30'])
@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import simulation.examples.highway as highway
+from simulation.layout.tick_profiler import TickProfiler
+
+
+class TestTickProfiler(TestCase):
+
+    def test_records_phases_and_counters(self):
+        world = highway.create_world()
+        world.profiler = TickProfiler(keep=5)
+        for _ in range(50):
+            world.update(0.125)
+        self.assertEqual(world.profiler.ticks, 50)
+        self.assertEqual(len(world.profiler.records), 5)
+        record = world.profiler.last
+        self.assertEqual(record['tick'], 49)
+        self.assertGreater(record['active_vehicles'], 0)
+        self.assertGreater(record['segment_lookups'], 0)
+        self.assertEqual(record['cache_hits'] + record['cache_misses'],
+                         record['node_lookups'] + record['segment_lookups'])
+        self.assertAlmostEqual(record['total'], sum(record[phase] for phase in TickProfiler.PHASES))
+        self.assertGreater(world.profiler.summary()['ticks_per_second'], 0.0)
+        self.assertFalse(world.projection_cache.count_lookups)
+
+    def test_stream_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.jsonl')
+            world = highway.create_world()
+            world.profiler = TickProfiler(path)
+            for _ in range(10):
+                world.update(0.125)
+            world.profiler.close()
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([record['tick'] for record in records], list(range(10)))
@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import simulation.examples.highway as highway
+from simulation.io.null_renderer import NullRenderer
+from simulation.layout.world_snapshot import SnapshotBuffer, WorldSnapshot
+from simulation.traffic_simulation import TrafficSimulation
+
+
+class RecordingRenderer(NullRenderer):
+
+    def __init__(self):
+        super(RecordingRenderer, self).__init__()
+        self.frames = []
+
+    def render(self, world) -> None:
+        self.frames.append(world)
+
+
+class TestTrafficSimulation(TestCase):
+
+    def setUp(self):
+        self.simulation = TrafficSimulation(highway.create_world(), headless=True, time_step=0.125)
+
+    def test_run_steps(self):
+        self.simulation.run(steps=10)
+        self.simulation.run(steps=5)
+        self.assertEqual(self.simulation.step, 15)
+        self.assertAlmostEqual(self.simulation.time, 15 * 0.125)
+        self.assertTrue(any(vehicle.active for vehicle in self.simulation.world.vehicles))
+
+    def test_run_until(self):
+        self.simulation.run(until=2.0)
+        self.assertEqual(self.simulation.step, 16)
+
+    def test_headless_needs_fixed_time_step(self):
+        with self.assertRaises(ValueError):
+            TrafficSimulation(highway.create_world(), headless=True, time_step=0.0)
+
+    def test_threaded_run_renders_snapshots(self):
+        simulation = TrafficSimulation(highway.create_world(), headless=True, time_step=0.125, threaded=True,
+                                       frame_rate=1000.0)
+        simulation.headless = False  # render without OpenCV
+        simulation.renderer = simulation.input_controller = RecordingRenderer()
+        simulation.run(steps=200)
+        self.assertEqual(simulation.step, 200)
+        self.assertTrue(simulation.renderer.frames)
+        for frame in simulation.renderer.frames:
+            self.assertIsInstance(frame, WorldSnapshot)
+            self.assertIs(frame.roads, simulation.world.roads)
+
+    def test_snapshot_interpolation(self):
+        world = highway.create_world()
+        buffer = SnapshotBuffer()
+        buffer.publish(WorldSnapshot.capture(world, 0.0, 0), now=10.0)
+        for _ in range(40):
+            world.update(0.125)
+        previous = WorldSnapshot.capture(world, 5.0, 40)
+        world.update(0.125)
+        current = WorldSnapshot.capture(world, 5.125, 41)
+        buffer.publish(previous, now=10.0)
+        buffer.publish(current, now=10.5)
+        self.assertIs(buffer.interpolated(11.0), current)
+        half = buffer.interpolated(10.75)
+        self.assertAlmostEqual(half.time, 5.0625)
+        before = {vehicle.id: vehicle for vehicle in previous.vehicles}
+        blended = 0
+        for vehicle, result in zip(current.vehicles, half.vehicles):
+            old = before.get(vehicle.id)
+            if old is not None and result is not vehicle:
+                middle = (old.position + vehicle.position) * 0.5
+                self.assertAlmostEqual(result.position.distance(middle), 0.0)
+                blended += 1
+        self.assertGreater(blended, 0)
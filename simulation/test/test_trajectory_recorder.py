@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import simulation.examples.highway as highway
+from simulation.io.trajectory_recorder import TrajectoryRecorder, TrajectoryReplay, lane_table
+
+
+def create_world():
+    world = highway.create_world()
+    for i, spawner in enumerate(world.spawners):
+        spawner.rng.seed(i + 1)
+    world.context.rng = random.Random(7)
+    return world
+
+
+class TestTrajectoryRecorder(TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.trj')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def record(self, ticks, **kwargs):
+        world = create_world()
+        states = []
+        with TrajectoryRecorder(self.path, world, chunk_ticks=16, **kwargs) as recorder:
+            world.recorder = recorder
+            for _ in range(ticks):
+                world.update(0.125)
+                states.append([(vehicle.id, vehicle.position.x, vehicle.velocity, vehicle.lane)
+                               for vehicle in world.active_vehicles()])
+        return world, states
+
+    def assertReplayMatches(self, world, states):
+        lanes = lane_table(world.roads)
+        with TrajectoryReplay(self.path) as replay:
+            self.assertEqual(len(replay), len(states))
+            np.testing.assert_allclose(replay.times(), 0.125 * np.arange(1, len(states) + 1))
+            rows = replay.read(10, 40)
+            self.assertEqual(rows['tick'].tolist(), [tick for tick in range(10, 40) for _ in states[tick]])
+            self.assertEqual(rows['id'].tolist(), [state[0] for tick in range(10, 40) for state in states[tick]])
+            np.testing.assert_allclose(rows['x'], [state[1] for tick in range(10, 40) for state in states[tick]],
+                                       rtol=1e-6)
+            self.assertEqual([lanes[lane] for lane in rows['lane'].tolist()],
+                             [state[3] for tick in range(10, 40) for state in states[tick]])
+            snapshot = replay.snapshot(len(states) - 1, world.roads)
+            self.assertEqual([vehicle.id for vehicle in snapshot.active_vehicles()],
+                             [state[0] for state in states[-1]])
+            self.assertIs(snapshot.roads, world.roads)
+            self.assertEqual(len(list(replay.snapshots(world.roads, 5, 8))), 3)
+
+    def test_replay_matches_recording(self):
+        self.assertReplayMatches(*self.record(50))
+
+    def test_compressed_replay_matches_recording(self):
+        self.assertReplayMatches(*self.record(50, compression=6))
+
+    def test_replay_of_aborted_recording(self):
+        self.record(50)
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 10)
+        with TrajectoryReplay(self.path) as replay:
+            self.assertEqual(len(replay), 48)
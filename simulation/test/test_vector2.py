@@ -160,4 +160,22 @@ class TestVector2(TestCase):
         self.assertTrue(abs(u.distance_angular_unsigned(v)) - 90 < eps and u.distance_angular_unsigned(v) > 0)
         self.assertTrue(abs(v.distance_angular_unsigned(w)) - 180 < eps and v.distance_angular_unsigned(w) > 0)
         self.assertTrue(abs(v.distance_angular_unsigned(t)) - 178.0908 < eps and v.distance_angular_unsigned(t) > 0)
-        self.assertTrue(abs(v.distance_angular_unsigned(s)) - 178.0908 < eps and v.distance_angular_unsigned(s) > 0)
\ No newline at end of file
+        self.assertTrue(abs(v.distance_angular_unsigned(s)) - 178.0908 < eps and v.distance_angular_unsigned(s) > 0)
+
+    def test_slots(self):
+        v = Vector2(1, 2)
+        self.assertFalse(hasattr(v, '__dict__'))
+        u = v.copy()
+        u.x = 3
+        self.assertEqual(v.x, 1)
+
+    def test_fused_operations(self):
+        v = Vector2(1.5, -2.25)
+        u = v.copy()
+        u.rotate(33.0)
+        u += Vector2(4.0, 5.0)
+        self.assertEqual(v.rotate_translate(33.0, 4.0, 5.0), (u.x, u.y))
+        self.assertEqual(Vector2.angle(v.x, v.y), Vector2(0, 1).distance_angular_signed(v))
+        v1, v2 = Vector2(0.5, 1.0), Vector2(3.0, -2.0)
+        p = v.projection(v1, v2)
+        self.assertEqual(v.projection_tuple(v1, v2), (p.x, p.y))
@@ -0,0 +1,106 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+import simulation.vector_array as vector_array
+from simulation.io.camera2d import Camera2D
+from simulation.layout.road import Road
+from simulation.simulation_object import SimulationObject
+from simulation.vector2 import Vector2
+
+
+def random_vectors(rng, count):
+    return [Vector2(rng.uniform(-10.0, 10.0), rng.uniform(-10.0, 10.0)) for _ in range(count)]
+
+
+class TestVectorArray(TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.a = random_vectors(rng, 100)
+        self.b = random_vectors(rng, 100)
+        self.c = random_vectors(rng, 100)
+        self.degrees = [rng.uniform(-360.0, 360.0) for _ in range(100)]
+
+    def assertVectorsAlmostEqual(self, array, vectors):
+        np.testing.assert_allclose(array, vector_array.to_array(vectors), atol=1e-9)
+
+    def test_rotate(self):
+        expected = []
+        for v, degrees in zip(self.a, self.degrees):
+            v = v.copy()
+            v.rotate(degrees)
+            expected.append(v)
+        self.assertVectorsAlmostEqual(vector_array.rotate(vector_array.to_array(self.a), self.degrees), expected)
+
+    def test_angles(self):
+        a, b = vector_array.to_array(self.a), vector_array.to_array(self.b)
+        np.testing.assert_allclose(vector_array.distance_angular_signed(a, b),
+                                   [u.distance_angular_signed(v) for u, v in zip(self.a, self.b)], atol=1e-9)
+        np.testing.assert_allclose(vector_array.angle(a), [Vector2.angle(v.x, v.y) for v in self.a], atol=1e-9)
+
+    def test_projection(self):
+        a, b, c = (vector_array.to_array(v) for v in (self.a, self.b, self.c))
+        self.assertVectorsAlmostEqual(vector_array.projection(a, b, c),
+                                      [p.projection(v1, v2) for p, v1, v2 in zip(self.a, self.b, self.c)])
+        self.assertEqual(vector_array.check_projection(a, b, c).tolist(),
+                         [p.check_projection(v1, v2) for p, v1, v2 in zip(self.a, self.b, self.c)])
+
+    def test_road_normals(self):
+        path = [Vector2(0, 0), Vector2(10, 0), Vector2(20, 5), Vector2(25, 15), Vector2(20, 25)]
+        nodes = vector_array.to_array(path)
+        self.assertVectorsAlmostEqual(vector_array.road_normals(nodes[:-2], nodes[1:-1], nodes[2:]),
+                                      [Road.calc_road_normal(*path[i - 1:i + 2]) for i in range(1, len(path) - 1)])
+
+    def test_camera_batch_matches_scalar_path(self):
+        camera = Camera2D()
+        camera.position = Vector2(3.0, -4.0)
+        camera.orientation = 20.0
+        obj = SimulationObject(position=Vector2(10.0, 5.0), orientation=33.0, mesh=self.a)
+        expected = camera.apply_transform(SimulationObject(position=obj.position, orientation=33.0, mesh=self.a[:4]))
+        self.assertEqual(camera.apply_transform(obj)[:4].tolist(), expected.tolist())
+
+    def test_camera_meshes_match_scalar_path(self):
+        camera = Camera2D()
+        camera.position = Vector2(3.0, -4.0)
+        camera.orientation = 20.0
+        objects = [SimulationObject(position=Vector2(10.0 * i, 5.0 - i), orientation=33.0 * i, mesh=self.a[:4])
+                   for i in range(5)]
+        vertices = np.stack([vector_array.to_array(obj.mesh) for obj in objects])
+        polys = camera.transform_meshes(vertices, [obj.orientation for obj in objects],
+                                        [(obj.position.x, obj.position.y) for obj in objects])
+        for obj, poly in zip(objects, polys):
+            self.assertEqual(poly.tolist(), camera.apply_transform(obj).tolist())
+        shared = camera.transform_meshes(vertices[0], [obj.orientation for obj in objects],
+                                         [(obj.position.x, obj.position.y) for obj in objects])
+        self.assertEqual(shared.tolist(), polys.tolist())
+        position = camera.transform_points([(objects[1].position.x, objects[1].position.y)])[0]
+        view = camera.apply_view_transform(objects[1].position)
+        self.assertEqual(position.tolist(), [int(view.x), int(view.y)])
+
+    def test_simplify_keeps_error_below_tolerance(self):
+        x = np.linspace(0.0, 100.0, 201)
+        points = np.stack((x, 5.0 * np.sin(x / 10.0)), axis=-1)
+        for tolerance in (0.01, 0.1, 1.0):
+            kept = vector_array.simplify(points, tolerance)
+            self.assertEqual((kept[0], kept[-1]), (0, len(points) - 1))
+            self.assertLess(len(kept), len(points))
+            for first, last in zip(kept, kept[1:]):
+                u = points[last] - points[first]
+                inner = points[first + 1:last]
+                distances = np.abs(vector_array.perp(u, inner - points[first])) / vector_array.length(u)
+                self.assertTrue(np.all(distances <= tolerance))
+        line = np.array([(0.0, 0.0), (1.0, 0.0), (2.0, 0.0), (3.0, 0.0)])
+        self.assertEqual(vector_array.simplify(line, 0.0).tolist(), [0, 3])
+
+    def test_camera_world_bounds_contain_viewport(self):
+        camera = Camera2D()
+        camera.position = Vector2(3.0, -4.0)
+        camera.orientation = 20.0
+        xmin, ymin, xmax, ymax = camera.world_bounds()
+        rng = random.Random(7)
+        for _ in range(100):
+            pixel = Vector2(rng.uniform(0.0, camera.viewport.x), rng.uniform(0.0, camera.viewport.y))
+            point = camera.apply_inverse_view_transform(pixel)
+            self.assertTrue(xmin <= point.x <= xmax and ymin <= point.y <= ymax)
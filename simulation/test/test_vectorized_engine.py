@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+import simulation.agent.vehicle_types as vehicle_types
+import simulation.examples.highway as highway
+from simulation.layout.vectorized_engine import VectorizedEngine
+
+
+def run_highway(vectorized, steps, frenet=False):
+    world = highway.create_world(vectorized=vectorized, frenet=frenet)
+    for i, spawner in enumerate(world.spawners):
+        spawner.rng.seed(i + 1)
+    world.context.rng.seed(7)
+    for _ in range(steps):
+        world.update(0.125)
+    return [(v.active, v.position.x, v.position.y, v.velocity, v.acceleration) for v in world.vehicles]
+
+
+class TestVectorizedEngine(TestCase):
+
+    def test_same_trajectories(self):
+        self.compare(run_highway(False, 120), run_highway(True, 120))
+
+    def test_same_frenet_trajectories(self):
+        self.compare(run_highway(False, 240, frenet=True), run_highway(True, 240, frenet=True))
+
+    def compare(self, expected, result):
+        self.assertEqual(len(expected), len(result))
+        for e, r in zip(expected, result):
+            self.assertEqual(e[0], r[0])
+            for a, b in zip(e[1:], r[1:]):
+                self.assertAlmostEqual(a, b, places=9)
+
+    def test_batched_mobil_matches_scalar(self):
+        for frenet in (False, True):
+            world = highway.create_world(frenet=frenet)
+            for i, spawner in enumerate(world.spawners):
+                spawner.rng.seed(i + 1)
+            world.context.rng.seed(7)
+            engine = VectorizedEngine(frenet=frenet)
+            for step in range(240):
+                world.update(0.125)
+                if step % 40:
+                    continue
+                vehicles = world.active_vehicles()
+                for vehicle, decision in zip(vehicles, engine.evaluate_mobil(vehicles)):
+                    if not vehicle.considers_lane_change():
+                        continue
+                    expected = (0.0, None)
+                    for lane in vehicle.lane.neighboring_lanes:
+                        value = vehicle.apply_mobil(lane)
+                        if expected[0] < value < float('infinity'):
+                            expected = (value, lane)
+                    self.assertIs(decision[1], expected[1])
+                    self.assertAlmostEqual(decision[0], expected[0], places=9)
+
+    def test_lane_changes_only_renew_affected_decisions(self):
+        world = highway.create_world(vectorized=True)
+        for i, spawner in enumerate(world.spawners):
+            spawner.rng.seed(i + 1)
+        world.context.rng.seed(7)
+        evaluate = world.engine._evaluate_mobil
+        evaluated = []
+
+        def record(vehicles):
+            evaluated[-1].append(len(vehicles))
+            return evaluate(vehicles)
+
+        world.engine._evaluate_mobil = record
+        for _ in range(240):
+            evaluated.append([])
+            world.update(0.125)
+        renewals = [(counts[0], renewed) for counts in evaluated for renewed in counts[1:]]
+        self.assertTrue(renewals)
+        for count, renewed in renewals:
+            self.assertLess(renewed, count)
+
+    def test_unsupported_vehicles_stay_on_object_path(self):
+        engine = VectorizedEngine(capacity=1)
+        self.assertTrue(engine.add_vehicle(vehicle_types.Truck()))
+        self.assertTrue(engine.add_vehicle(vehicle_types.Minivan()))
+        self.assertFalse(engine.add_vehicle(vehicle_types.Obstacle()))
+        self.assertEqual(len(engine.vehicles), 2)
+        self.assertEqual(len(engine.unmanaged), 1)
+        self.assertEqual(list(engine.max_velocity[:2]), [22, 30])
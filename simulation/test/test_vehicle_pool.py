@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import simulation.examples.highway as highway
+from simulation.agent.vehicle_types import Minivan
+from simulation.layout.vehicle_pool import VehiclePool
+
+
+class TestVehiclePool(TestCase):
+
+    def test_swap_remove(self):
+        pool = VehiclePool()
+        vehicles = [Minivan() for _ in range(4)]
+        for vehicle in vehicles:
+            pool.append(vehicle)
+        pool.append(vehicles[0])
+        self.assertEqual(len(pool), 4)
+        self.assertIs(pool.pop(1), vehicles[1])
+        self.assertEqual(list(pool), [vehicles[0], vehicles[3], vehicles[2]])
+        pool.remove(vehicles[0])
+        self.assertNotIn(vehicles[0], pool)
+        self.assertEqual(sorted(map(id, pool)), sorted(map(id, vehicles[2:])))
+
+    def test_active_vehicles_follow_flag(self):
+        world = highway.create_world()
+        world.context.rng.seed(7)
+        for i, spawner in enumerate(world.spawners):
+            spawner.rng.seed(i + 1)
+        for _ in range(200):
+            world.update(0.125)
+            active = [vehicle for vehicle in world.vehicles if vehicle.active]
+            self.assertEqual(sorted(map(id, world.active_vehicles())), sorted(map(id, active)))
+            self.assertEqual(len(world.context.vehicle_pool) + len(active), len(world.vehicles))
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+
+from simulation.io.view_culling import ViewCulling
+from simulation.layout.lane_reservation import LaneReservation
+from simulation.layout.spatial_grid import SpatialGrid
+from simulation.test.test_lane import create_corridor, place_vehicle
+
+
+class TestViewCulling(TestCase):
+
+    def setUp(self):
+        self.roads = create_corridor()
+        self.culling = ViewCulling(self.roads, cell_size=20.0)
+
+    def test_grid_query_finds_boxes(self):
+        grid = SpatialGrid(10.0)
+        grid.insert_box(0.0, 0.0, 35.0, 5.0, 'wide')
+        grid.insert_box(50.0, 50.0, 51.0, 51.0, 'small')
+        self.assertEqual(grid.query(30.0, -5.0, 40.0, 1.0), ['wide'])
+        self.assertEqual(grid.query(-100.0, -100.0, 100.0, 100.0), ['wide', 'small'])
+        self.assertEqual(grid.query(60.0, 0.0, 100.0, 40.0), [])
+        grid.remove_owner(None)
+        self.assertEqual(grid.query(-100.0, -100.0, 100.0, 100.0), [])
+
+    def test_visible_lanes_match_brute_force(self):
+        lanes = [lane for road in self.roads for lane in road.lanes]
+        for bounds in ((-20.0, -20.0, 400.0, 20.0), (115.0, -1.0, 125.0, 1.0), (0.0, 50.0, 10.0, 60.0)):
+            xmin, ymin, xmax, ymax = bounds
+            expected = [lane for lane in lanes
+                        if any(xmin <= node.x <= xmax and ymin <= node.y <= ymax for node in lane.mesh)]
+            visible = self.culling.visible_lanes(bounds)
+            self.assertEqual([lane for lane in visible if lane in expected], expected)
+            self.assertEqual(visible, sorted(visible, key=lanes.index))
+
+    def test_visible_vehicles(self):
+        lane = self.roads[1].lanes[0]
+        inside = place_vehicle(lane, 1)
+        outside = place_vehicle(self.roads[2].lanes[0], 1)
+        LaneReservation(inside, lane.left_neighbor, lane.left_neighbor.accumulated_distance[1])
+        bounds = inside.position.x - 1.0, inside.position.y - 1.0, inside.position.x + 1.0, inside.position.y + 1.0
+        self.assertEqual(self.culling.visible_vehicles(bounds), [inside])
+        outside.active = False
+        self.assertEqual(self.culling.visible_vehicles((-100.0, -100.0, 500.0, 100.0)), [inside])
+
+    def test_lane_mesh_levels(self):
+        lane = self.roads[0].lanes[0]
+        full = np.array([(node.x, node.y) for node in lane.mesh])
+        close = self.culling.lane_mesh(lane, 64.0)
+        far = self.culling.lane_mesh(lane, 0.01)
+        self.assertEqual(close.tolist(), full.tolist())
+        self.assertLess(len(far), len(full))
+        self.assertIs(self.culling.lane_mesh(lane, 0.011), far)
@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+import simulation.examples.highway as highway
+
+
+def create_seeded_world():
+    world = highway.create_world()
+    for i, spawner in enumerate(world.spawners):
+        spawner.rng.seed(i + 1)
+    world.context.rng.seed(7)
+    return world
+
+
+def state(world):
+    return [(v.id, v.active, v.position.x, v.position.y, v.velocity) for v in world.vehicles]
+
+
+class TestWorld(TestCase):
+
+    def test_interleaved_worlds_do_not_interfere(self):
+        alone = create_seeded_world()
+        for _ in range(200):
+            alone.update(0.125)
+        first, second = create_seeded_world(), create_seeded_world()
+        for _ in range(200):
+            first.update(0.125)
+            second.update(0.125)
+        self.assertEqual(state(first), state(alone))
+        self.assertEqual(state(second), state(alone))
+        self.assertEqual([v.id for v in first.vehicles], list(range(len(first.vehicles))))
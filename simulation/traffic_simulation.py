@@ -1,33 +1,87 @@
+import threading
+import time
 from datetime import datetime
-import simulation.config_reader as cr
 from simulation.io.camera2d import Camera2D
 from simulation.io.input_controller import InputController
-from simulation.io.simple_renderer import SimpleRenderer
+from simulation.io.null_renderer import NullRenderer
 from simulation.io.renderer import Renderer
 from simulation.vector2 import Vector2
 from simulation.layout.world import World
+from simulation.layout.world_snapshot import SnapshotBuffer, WorldSnapshot
 
 
 class TrafficSimulation:
 
-    def __init__(self, world: World):
-        self.time_step = cr.CONFIG.getfloat('simulation', 'time_step')
+    REAL_TIME_STEP = 1.0 / 60.0  # fixed time step of threaded real time simulations
+
+    def __init__(self, world: World, headless: bool = False, time_step: float = None, threaded: bool = None,
+                 frame_rate: float = None):
+        """Set up a simulation of the given world.
+
+        :param world: world to simulate
+        :param headless: if 'True', no window is opened and nothing is rendered
+        :param time_step: fixed time step in seconds, read from the world config if None. 0 steps in real time
+        :param threaded: if 'True', the world is stepped on its own thread and rendered from snapshots,
+                         read from the world config if None
+        :param frame_rate: frames per second of threaded rendering, read from the world config if None
+        """
+        config = world.context.config
+        if time_step is None:
+            time_step = config.getfloat('simulation', 'time_step')
+        if threaded is None:
+            threaded = config.getboolean('simulation', 'threaded', fallback=False)
+        if frame_rate is None:
+            frame_rate = config.getfloat('renderer', 'frame_rate', fallback=30.0)
+        self.time_step = time_step
         if self.time_step == 0.0:
             self.time_step = None
-        self.camera = Camera2D()  # type: Camera2D
+        if headless and self.time_step is None:
+            raise ValueError('Headless simulations need a fixed time step.')
+        self.headless = headless  # type: bool
+        self.threaded = threaded  # type: bool
+        self.frame_rate = frame_rate  # type: float
         self.step = 0  # type: int
-        self.renderer = SimpleRenderer(self.camera)  # type: Renderer
+        self.time = 0.0  # type: float
+        if headless:
+            self.camera = None  # type: Camera2D
+            self.renderer = NullRenderer()  # type: Renderer
+        else:
+            # OpenCV is only needed when rendering
+            from simulation.io.simple_renderer import SimpleRenderer
+            self.camera = Camera2D()
+            self.renderer = SimpleRenderer(self.camera)
         self.input_controller = self.renderer  # type: InputController
         self.world = world  # type: World
         self.renderer.locations = self.world.camera_locations  # type: [Vector2]
 
     def simulate(self):
+        self.run()
+
+    def run(self, steps: int = None, until: float = None) -> None:
+        """Run the simulation until one of the limits is reached or the input controller asks to quit.
+
+        :param steps: maximum number of steps to perform in this call
+        :param until: simulation time in seconds at which to stop
+        :return: None
+        """
+        if self.headless:
+            self._run_headless(steps, until)
+            return
+        if self.threaded:
+            self._run_threaded(steps, until)
+            return
         delta_time = 0.0
+        start = self.step
         while not self.input_controller.quit:
+            if steps is not None and self.step - start >= steps:
+                break
+            if until is not None and self.time >= until:
+                break
             before = datetime.now()
             self.input_controller.handle_input()
             if not self.input_controller.pause:
                 self.world.update(delta_time)
+                self.time += delta_time
             self.renderer.update(delta_time)
             self.renderer.render(self.world)
             after = datetime.now()
@@ -35,3 +89,75 @@ class TrafficSimulation:
             if self.time_step is None:
                 delta_time = (after - before).total_seconds()
             self.step += 1
+
+    def _run_headless(self, steps: int, until: float) -> None:
+        world, time_step = self.world, self.time_step
+        remaining = steps
+        while remaining is None or remaining > 0:
+            if until is not None and self.time >= until:
+                break
+            world.update(time_step)
+            self.time += time_step
+            self.step += 1
+            if remaining is not None:
+                remaining -= 1
+
+    def _run_threaded(self, steps: int, until: float) -> None:
+        """Step the world on a simulation thread and render snapshots of it at 'frame_rate' on this thread.
+
+        The simulation thread publishes a 'WorldSnapshot' after every fixed time step into a 'SnapshotBuffer'.
+        Fixed time steps run as fast as possible, real time simulations step with 'REAL_TIME_STEP' and wait for
+        the wall clock. Rendering and input handling stay on the calling thread, OpenCV windows need that.
+        """
+        buffer = SnapshotBuffer()
+        buffer.publish(WorldSnapshot.capture(self.world, self.time, self.step))
+        stop = threading.Event()
+        errors = []
+        thread = threading.Thread(target=self._simulate, args=(buffer, stop, errors, steps, until), daemon=True)
+        thread.start()
+        frame_time = 1.0 / self.frame_rate
+        last = time.perf_counter()
+        try:
+            while thread.is_alive() and not self.input_controller.quit:
+                now = time.perf_counter()
+                self.input_controller.handle_input()
+                self.renderer.update(now - last)
+                self.renderer.render(buffer.interpolated(now))
+                last = now
+                remaining = frame_time - (time.perf_counter() - now)
+                if remaining > 0.0:
+                    thread.join(remaining)
+        finally:
+            stop.set()
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def _simulate(self, buffer: SnapshotBuffer, stop: threading.Event, errors: list, steps: int,
+                  until: float) -> None:
+        time_step = self.time_step or TrafficSimulation.REAL_TIME_STEP
+        start = self.step
+        origin = None  # wall clock time of simulation time 0 in real time simulations
+        try:
+            while not stop.is_set():
+                if steps is not None and self.step - start >= steps:
+                    break
+                if until is not None and self.time >= until:
+                    break
+                if self.input_controller.pause:
+                    origin = None
+                    stop.wait(0.01)
+                    continue
+                if self.time_step is None:
+                    now = time.perf_counter()
+                    if origin is None:
+                        origin = now - self.time
+                    wait = origin + self.time + time_step - now
+                    if wait > 0.0 and stop.wait(wait):
+                        break
+                self.world.update(time_step)
+                self.time += time_step
+                self.step += 1
+                buffer.publish(WorldSnapshot.capture(self.world, self.time, self.step))
+        except Exception as error:
+            errors.append(error)
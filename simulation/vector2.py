@@ -1,9 +1,10 @@
 import math
-import copy
 
 
 class Vector2:
 
+    __slots__ = ('x', 'y')
+
     DEG_2_RAD = math.pi / 180.0
     RAD_2_DEG = 180.0 / math.pi
     EPSILON = 0.001
@@ -13,7 +14,13 @@ class Vector2:
         self.y = y
 
     def copy(self):
-        return copy.deepcopy(self)
+        return Vector2(self.x, self.y)
+
+    def __copy__(self):
+        return Vector2(self.x, self.y)
+
+    def __deepcopy__(self, memo):
+        return Vector2(self.x, self.y)
 
     def __add__(self, other):
         return Vector2(self.x + other.x, self.y + other.y)
@@ -62,6 +69,8 @@ class Vector2:
         return self.length()
 
     def __eq__(self, other):
+        if not isinstance(other, Vector2):
+            return NotImplemented
         return (self.x == other.x) and (self.y == other.y)
 
     def __getitem__(self, key):
@@ -90,7 +99,7 @@ class Vector2:
         return "({0}, {1})".format(self.x, self.y)
 
     def __iter__(self):
-        return (x for x in [self.x, self.y])
+        return iter((self.x, self.y))
 
     def length(self):
         return math.sqrt(self.length_squared())
@@ -139,9 +148,27 @@ class Vector2:
         :param degrees:
         :return:
         """
+        self.x, self.y = Vector2.rotated(self.x, self.y, degrees)
+
+    @staticmethod
+    def rotated(x, y, degrees):
+        """Rotate the vector (x, y) like 'rotate' without creating a Vector2.
+
+        :return: rotated x, y
+        """
         radians = degrees * Vector2.DEG_2_RAD
         c, s = math.cos(radians), math.sin(radians)
-        self.x, self.y = c * self.x + s * self.y, -s * self.x + c * self.y
+        return c * x + s * y, -s * x + c * y
+
+    def rotate_translate(self, degrees, x, y):
+        """Rotate a copy of this vector according to 'degrees' and translate it by (x, y).
+
+        Same result as copy, 'rotate' and add, without the temporary vectors.
+
+        :return: transformed x, y
+        """
+        rx, ry = Vector2.rotated(self.x, self.y, degrees)
+        return rx + x, ry + y
 
     def distance(self, other):
         return math.sqrt(self.distance_squared(other))
@@ -165,6 +192,19 @@ class Vector2:
             angle = -angle
         return angle
 
+    @staticmethod
+    def angle(x, y):
+        """Calculate the orientation of the direction (x, y), same as Vector2(0, 1).distance_angular_signed.
+
+        :raises ZeroDivisionError: if the direction is (0, 0)
+        :return: signed angular difference to (0, 1) in degrees
+        """
+        value = (0 * x + 1 * y) / (1.0 * math.sqrt(x * x + y * y))
+        angle = Vector2.RAD_2_DEG * math.acos(min(1, max(-1, value)))
+        if 0 * y - 1 * x > 0:
+            angle = -angle
+        return angle
+
     def distance_angular_unsigned(self, other):
         """Calculate the unsigned angular distance between two vectors in [0, 180] degrees.
 
@@ -183,8 +223,16 @@ class Vector2:
         :param v2: second vector on line
         :return: vector projected on given line
         """
-        u = v2 - v1
-        return v1 + ((self - v1).dot(u) / u.dot(u)) * u
+        return Vector2(*self.projection_tuple(v1, v2))
+
+    def projection_tuple(self, v1, v2):
+        """Same as 'projection', without creating vectors.
+
+        :return: x, y of the projected vector
+        """
+        ux, uy = v2.x - v1.x, v2.y - v1.y
+        t = ((self.x - v1.x) * ux + (self.y - v1.y) * uy) / (ux * ux + uy * uy)
+        return v1.x + t * ux, v1.y + t * uy
 
     def projection_restricted(self, v1, v2):
         """Calculate the projection of this vector onto the given line segment.
@@ -205,6 +253,5 @@ class Vector2:
         :param v2: second vector on line
         :return: 'True' if projection falls on the line segment, 'False' if it would be outside
         """
-        s = v2 - v1
-        u = self - v1
-        return 0 <= s.dot(u) <= s.dot(s)
+        sx, sy = v2.x - v1.x, v2.y - v1.y
+        return 0 <= sx * (self.x - v1.x) + sy * (self.y - v1.y) <= sx * sx + sy * sy
@@ -0,0 +1,123 @@
+"""Batched counterparts of the 'Vector2' operations.
+
+Vectors are stored as N x 2 float arrays. Angles are given in degrees and follow the conventions of 'Vector2':
+positive angles rotate clockwise, negative angles anti-clockwise. Arguments broadcast like NumPy arrays,
+so a single vector or angle can be combined with many.
+"""
+from typing import List
+
+import numpy as np
+
+from simulation.vector2 import Vector2
+
+UP = np.array([0.0, 1.0])
+
+
+def to_array(vectors: List[Vector2]) -> np.ndarray:
+    return np.array([(vector.x, vector.y) for vector in vectors], dtype=float).reshape(-1, 2)
+
+
+def to_vectors(array: np.ndarray) -> List[Vector2]:
+    return [Vector2(x, y) for x, y in array.tolist()]
+
+
+def dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1]
+
+
+def perp(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def length(vectors: np.ndarray) -> np.ndarray:
+    return np.sqrt(dot(vectors, vectors))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return the normalized vectors, see 'Vector2.normalize'."""
+    return vectors / length(vectors)[..., None]
+
+
+def rotate(vectors: np.ndarray, degrees) -> np.ndarray:
+    """Rotate vectors by one or many angles, see 'Vector2.rotate'."""
+    radians = np.asarray(degrees) * Vector2.DEG_2_RAD
+    c, s = np.cos(radians), np.sin(radians)
+    x, y = vectors[..., 0], vectors[..., 1]
+    return np.stack((c * x + s * y, -s * x + c * y), axis=-1)
+
+
+def rotate_translate(vectors: np.ndarray, degrees, offsets: np.ndarray) -> np.ndarray:
+    """Rotate vectors and translate them afterwards, see 'Vector2.rotate_translate'."""
+    return rotate(vectors, degrees) + offsets
+
+
+def distance_angular_unsigned(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Unsigned angles between vectors in [0, 180] degrees, see 'Vector2.distance_angular_unsigned'."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = dot(a, b) / (length(a) * length(b))
+    return Vector2.RAD_2_DEG * np.arccos(np.clip(value, -1, 1))
+
+
+def distance_angular_signed(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Signed angles between vectors in (-180, 180] degrees, see 'Vector2.distance_angular_signed'."""
+    angle = distance_angular_unsigned(a, b)
+    return np.where(perp(a, b) > 0, -angle, angle)
+
+
+def angle(directions: np.ndarray) -> np.ndarray:
+    """Orientations of the given directions, see 'Vector2.angle'."""
+    return distance_angular_signed(UP, directions)
+
+
+def projection(points: np.ndarray, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """Project points onto the lines through v1 and v2, see 'Vector2.projection'."""
+    u = v2 - v1
+    return v1 + (dot(points - v1, u) / dot(u, u))[..., None] * u
+
+
+def check_projection(points: np.ndarray, v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """Check which projections fall between v1 and v2, see 'Vector2.check_projection'."""
+    s = v2 - v1
+    value = dot(s, points - v1)
+    return (0 <= value) & (value <= dot(s, s))
+
+
+def road_normals(pred: np.ndarray, current: np.ndarray, succ: np.ndarray) -> np.ndarray:
+    """Normalized left facing normals of a path at 'current', see 'Road.calc_road_normal'."""
+    ahead = succ - current
+    half = distance_angular_signed(ahead, pred - current)
+    half = np.where(half > 0, half - 360.0, half) / 2.0
+    return normalize(rotate(ahead, half))
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify a polyline with the Douglas-Peucker algorithm.
+
+    :param points: N x 2 array of polyline nodes
+    :param tolerance: maximal distance of a dropped node to the simplified polyline
+    :return: sorted indices of the kept nodes, always including the first and the last node
+    """
+    count = len(points)
+    if count < 3:
+        return np.arange(count)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        inner = points[first + 1:last]
+        u = points[last] - points[first]
+        norm = length(u)
+        if norm > 0.0:
+            distances = np.abs(perp(u, inner - points[first])) / norm
+        else:
+            distances = length(inner - points[first])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            index += first + 1
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return np.flatnonzero(keep)